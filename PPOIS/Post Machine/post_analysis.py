@@ -0,0 +1,244 @@
+# post_analysis.py
+# Статический анализ программы машины Поста по графу переходов между
+# номерами правил: действия V/X/R/L ведут на следующее правило, ?N - на
+# правило N, ! и неизвестные действия останавливают машину, переход на
+# отсутствующее правило - тоже. Анализ находит недостижимые правила,
+# переходы на отсутствующие правила, "холостые" циклы из одних переходов
+# (машина в них крутится вечно, лента не меняется) и доказывает, что
+# программа не может остановиться, если из начального правила не
+# достижимо ни одно место остановки.
+# Оптимизация: переходы ?N сквозь правила без действия над лентой
+# (оба исхода - переходы) заменяются переходом сразу в конец цепочки,
+# недостижимые правила удаляются. Лента и место остановки те же, шагов
+# меньше.
+import json
+import sys
+
+from post_machine import (Post_machine, Program, Rule, decode_action, OP_MARK, OP_ERASE, OP_JUMP,
+                          OP_STOP, OP_INVALID)
+
+
+# Известное о клетке под головкой: (символ, True) - клетка равна
+# символу, (символ, False) - не равна; None - ничего не известно
+
+# Исход правила с условием condition при знании known: True/False или
+# None, если по знанию он не определён
+def _branch(condition, known):
+    if known is None:
+        return None
+    symbol, equal = known
+    if equal:
+        return symbol == condition
+    return False if symbol == condition else None
+
+
+# Знание о клетке после исхода branch правила rule: переход клетку не
+# трогает, V и X её записывают, после сдвига клетка неизвестна
+def _known_after(rule, branch):
+    op = decode_action(rule.action_true if branch else rule.action_false)[0]
+    if op == OP_JUMP:
+        return _after(rule.condition, branch, None)
+    if op == OP_MARK:
+        return '1', True
+    if op == OP_ERASE:
+        return '0', True
+    return None
+
+
+# Знание о клетке после исхода branch правила с условием condition
+def _after(condition, branch, known):
+    if branch:
+        return condition, True
+    if known is not None and known[1]:
+        return known
+    return condition, False
+
+
+class ProgramAnalysis:
+    # program - анализируемая программа, start - начальное правило
+    # (по умолчанию program.current_rule)
+    def __init__(self, program, start=None):
+        self.program = program
+        self.start = program.current_rule if start is None else start
+        self.graph = {}            # номер -> (переход истина, переход ложь), None - остановка
+        self.missing_targets = {}  # номер -> отсутствующие правила, на которые он переходит
+        self.invalid_actions = {}  # номер -> неизвестные действия
+        for number, rule in sorted(program.rules.items()):
+            targets = []
+            for action in (rule.action_true, rule.action_false):
+                target = self._target(number, action)
+                targets.append(target)
+                if target is not None and target not in program.rules:
+                    self.missing_targets.setdefault(number, [])
+                    if target not in self.missing_targets[number]:
+                        self.missing_targets[number].append(target)
+                if decode_action(action)[0] == OP_INVALID:
+                    self.invalid_actions.setdefault(number, []).append(action)
+            self.graph[number] = tuple(targets)
+
+        self.reachable = self._reachable(self.graph, self.start)
+        self.unreachable = sorted(set(program.rules) - self.reachable)
+        # номер -> исходы (True/False), после которых машина вечно
+        # крутится в холостом цикле переходов; cycles - сами циклы
+        self.spin_loops = {}
+        self.cycles = []
+        for number, rule in sorted(program.rules.items()):
+            for index, branch in enumerate((True, False)):
+                if self.graph[number][index] is None:
+                    continue
+                cycle = self._chain(self.graph[number][index], _known_after(rule, branch))[1]
+                if cycle is not None:
+                    self.spin_loops.setdefault(number, []).append(branch)
+                    if set(cycle) not in [set(c) for c in self.cycles]:
+                        self.cycles.append(cycle)
+        self.threaded = 0  # число переходов, заменённых в optimized()
+        # Машина останавливается только на !, неизвестном действии или
+        # отсутствующем правиле - если ничего такого не достижимо,
+        # остановка невозможна
+        self.can_halt = self.start not in program.rules or any(
+            None in self.graph[number] or number in self.missing_targets
+            for number in self.reachable)
+
+    # Номер правила, куда ведёт действие, или None для остановки
+    @staticmethod
+    def _target(number, action):
+        op, target = decode_action(action)
+        if op == OP_JUMP:
+            return target
+        if op in (OP_STOP, OP_INVALID):
+            return None
+        return number + 1
+
+    @staticmethod
+    def _reachable(graph, start):
+        reachable = set()
+        stack = [start]
+        while stack:
+            number = stack.pop()
+            if number in reachable or number not in graph:
+                continue
+            reachable.add(number)
+            stack.extend(target for target in graph[number] if target is not None)
+        return reachable
+
+    # Правило без действия над лентой: оба исхода - переходы
+    def _jump_only(self, number):
+        rule = self.program.rules.get(number)
+        return rule is not None and \
+            decode_action(rule.action_true)[0] == decode_action(rule.action_false)[0] == OP_JUMP
+
+    # Проход по цепочке правил без действия над лентой от правила target
+    # при знании known о клетке. Возвращает (конец цепочки, цикл): конец -
+    # первое правило, исход которого знанием не определён или которое
+    # что-то делает с лентой (или отсутствующий номер); цикл - номера
+    # холостого цикла, если цепочка в него попала
+    def _chain(self, target, known):
+        rules = self.program.rules
+        seen = {}
+        path = []
+        while self._jump_only(target):
+            rule = rules[target]
+            branch = _branch(rule.condition, known)
+            if branch is None:
+                break
+            if (target, known) in seen:
+                return target, path[seen[(target, known)]:]
+            seen[(target, known)] = len(path)
+            path.append(target)
+            known = _after(rule.condition, branch, known)
+            target = self.graph[target][0 if branch else 1]
+        return target, None
+
+    # Оптимизированная копия программы: сквозные переходы и без
+    # недостижимых правил; threaded - число заменённых переходов
+    def optimized(self):
+        graph = dict(self.graph)
+        rules = {}
+        self.threaded = 0
+        for number, rule in sorted(self.program.rules.items()):
+            actions = [rule.action_true, rule.action_false]
+            for index, branch in enumerate((True, False)):
+                if decode_action(actions[index])[0] != OP_JUMP:
+                    continue
+                target, cycle = self._chain(self.graph[number][index], _known_after(rule, branch))
+                if cycle is None and target != self.graph[number][index]:
+                    actions[index] = f"?{target}"
+                    self.threaded += 1
+            rules[number] = Rule(number, rule.condition, *actions)
+            graph[number] = tuple(self._target(number, action) for action in actions)
+
+        program = Program()
+        program.current_rule = self.program.current_rule
+        for number in sorted(self._reachable(graph, self.start)):
+            program.add_rule(rules[number])
+        return program
+
+    def to_dict(self):
+        return {
+            'start': self.start,
+            'rules': len(self.program.rules),
+            'reachable': sorted(self.reachable),
+            'unreachable': self.unreachable,
+            'missing_targets': {str(k): v for k, v in self.missing_targets.items()},
+            'invalid_actions': {str(k): v for k, v in self.invalid_actions.items()},
+            'spin_loops': {str(k): v for k, v in self.spin_loops.items()},
+            'cycles': self.cycles,
+            'can_halt': self.can_halt,
+        }
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    # Текстовый отчёт по анализу
+    def report(self):
+        lines = [f"Правил: {len(self.program.rules)}, начальное: {self.start}, "
+                 f"достижимо: {len(self.reachable)}"]
+        if self.unreachable:
+            lines.append("Недостижимые правила: " + ", ".join(map(str, self.unreachable)))
+        for number, targets in self.missing_targets.items():
+            lines.append(f"Правило {number}: переход на отсутствующее правило "
+                         + ", ".join(map(str, targets)) + " (остановка)")
+        for number, actions in self.invalid_actions.items():
+            lines.append(f"Правило {number}: неизвестное действие " + ", ".join(actions))
+        for number, branches in self.spin_loops.items():
+            if len(branches) == 2:
+                outcome = "при любой клетке"
+            else:
+                outcome = "при истине" if branches[0] else "при лжи"
+            lines.append(f"Правило {number}: вечный холостой цикл {outcome}")
+        for cycle in self.cycles:
+            lines.append("Холостой цикл: " + " -> ".join(map(str, cycle + cycle[:1])))
+        if not self.can_halt:
+            lines.append("Программа не может остановиться: остановки недостижимы")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def analyze(program, start=None):
+    return ProgramAnalysis(program, start)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python post_analysis.py <файл> [отчёт.json]")
+        sys.exit(1)
+    filename = sys.argv[1]
+    try:
+        machine = Post_machine()
+        machine.load_file(filename)
+        analysis = analyze(machine.program)
+        print(analysis.report())
+        optimized = analysis.optimized()
+        print(f"\nОптимизированная программа (заменено переходов: {analysis.threaded}):")
+        print(optimized.view_rules())
+        if len(sys.argv) > 2:
+            analysis.dump(sys.argv[2])
+    except FileNotFoundError:
+        print(f"Файл {filename} не найден")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from post_machine import Post_machine
+
+
+# Список файлов заданий: каталог (все файлы в нём), glob-шаблон или файл
+def collect_files(patterns):
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            names = sorted(os.listdir(pattern))
+            files.extend(os.path.join(pattern, name) for name in names
+                         if os.path.isfile(os.path.join(pattern, name)))
+        else:
+            files.extend(sorted(glob.glob(pattern)))
+    return files
+
+
+# Прогон одного файла с ограничениями; вызывается в процессе пула
+def run_file(filename, max_steps=None, max_time=None, compact=True):
+    start = time.perf_counter()
+    result = {'file': filename}
+    try:
+        machine = Post_machine(compact=compact)
+        machine.load_file(filename)
+        if machine.program.diagnostics:
+            result['diagnostics'] = [str(d) for d in machine.program.diagnostics]
+        run = machine.execute_all(max_steps=max_steps, max_time=max_time,
+                                  detect_cycles=True)
+        result.update({
+            'tape': machine.tape.region(0, len(machine.tape)),
+            'position': machine.tape.position,
+            'steps': run['steps'],
+            'halted': run['halted'],
+            'reason': run['reason'],
+        })
+    except Exception as e:
+        # Любая ошибка файла (нет файла, кодировка, символ, который лента
+        # не хранит, ...) - запись 'error' в результате, пакет идёт дальше
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['wall_time'] = time.perf_counter() - start
+    return result
+
+
+# Прогон всех файлов в пуле процессов. Результаты отдаются по мере
+# готовности, но в порядке файлов - вывод не зависит от планировщика
+def run_batch(files, max_steps=None, max_time=None, compact=True, workers=None):
+    files = list(files)
+    if not files:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = len(files)
+        chunksize = max(1, jobs // ((workers or os.cpu_count() or 1) * 8))
+        yield from executor.map(run_file, files, [max_steps] * jobs,
+                                [max_time] * jobs, [compact] * jobs,
+                                chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Пакетный прогон файлов машины Поста, результат - JSON lines")
+    parser.add_argument('paths', nargs='+', help="файлы, каталоги или glob-шаблоны")
+    parser.add_argument('--max-steps', type=int, default=None, help="бюджет шагов на файл")
+    parser.add_argument('--max-time', type=float, default=None, help="бюджет секунд на файл")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("Файлы не найдены", file=sys.stderr)
+        return 1
+    for result in run_batch(files, args.max_steps, args.max_time, workers=args.workers):
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,754 @@
 import sys
+import os
+import io
+import re
+import json
+import mmap
+import struct
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import MutableSequence
+
+# Размер куска при потоковой загрузке ленты (в символах)
+TAPE_CHUNK_SIZE = 1 << 20
+
+class TapeCells(MutableSequence):
+    # Клетки ленты слева направо - вид на ленту, а не копия: tape.cells[i] = x,
+    # append, insert и del меняют саму ленту (как старый список cells).
+    # Индекс головки (position) при вставке и удалении не сдвигается.
+    # Срез - обычный список (копия)
+    __slots__ = ('_tape',)
+
+    def __init__(self, tape):
+        self._tape = tape
+
+    def __len__(self):
+        return len(self._tape)
+
+    def _index(self, index):
+        size = len(self._tape)
+        if not -size <= index < size:
+            raise IndexError("клетка вне ленты")
+        return index % size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._tape.region(0, len(self._tape)))[index]
+        index = self._index(index)
+        return self._tape.region(index, index + 1)
+
+    # Запись одной клетки (или дописывание справа при index == len) через
+    # set_current, головка возвращается на место
+    def _write(self, index, value):
+        tape = self._tape
+        position = tape.position
+        tape.position = index
+        tape.set_current(value)
+        tape.position = position
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            cells = self[:]
+            cells[index] = value
+            self._tape.cells = cells
+        else:
+            self._write(self._index(index), value)
+
+    def __delitem__(self, index):
+        cells = self[:]
+        del cells[index]
+        self._tape.cells = cells or ['0']
+
+    def insert(self, index, value):
+        if index >= len(self):
+            self._write(len(self), value)
+        else:
+            cells = self[:]
+            cells.insert(index, value)
+            self._tape.cells = cells
+
+    def __iter__(self):
+        return iter(self._tape.region(0, len(self._tape)))
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, TapeCells)):
+            return self[:] == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self[:])
+
 
 class Tape:
     # Лента Машины Поста
+    # Клетки хранятся двумя массивами: _right - от начала ленты вправо,
+    # _left - левее начала в обратном порядке. Лента растёт в обе стороны
+    # через append, поэтому движение влево стоит O(1), а не O(n)
+    BLANK = '0'  # пустая клетка в формате буфера
+    MARK = '1'   # метка в формате буфера
+
     def __init__(self, initial_data=""):
-        self.cells = list(initial_data) if initial_data else ['0']
-        self.position = 0
+        self._left = self._new_buffer("")
+        self._right = self._new_buffer(initial_data or '0')
+        self._offset = 0  # позиция головки относительно начала _right
+
+    # Буфер клеток из строки и обратно - переопределяются в других бэкендах
+    def _new_buffer(self, data):
+        return list(data)
+
+    def _to_str(self, buffer):
+        return "".join(buffer)
+
+    # Позиция головки от левого края ленты (как раньше в cells)
+    @property
+    def position(self):
+        return self._offset + len(self._left)
+
+    @position.setter
+    def position(self, value):
+        self._offset = value - len(self._left)
+
+    # Все клетки ленты слева направо (TapeCells - запись идёт в ленту)
+    @property
+    def cells(self):
+        return TapeCells(self)
+
+    @cells.setter
+    def cells(self, value):
+        position = self.position
+        self._left = self._new_buffer("")
+        self._right = self._new_buffer("".join(value))
+        self._offset = position
+
+    def __len__(self):
+        return len(self._left) + len(self._right)
         
     # ПОлучение значния
     def get_current(self):
-        if 0 <= self.position < len(self.cells):
-            return self.cells[self.position]
+        offset = self._offset
+        if offset >= 0:
+            if offset < len(self._right):
+                return self._right[offset]
+        elif -offset <= len(self._left):
+            return self._left[-offset - 1]
         return '0'
     
     # Проверяем на диапазон
     def set_current(self, value):
-        if 0 <= self.position < len(self.cells):
-            self.cells[self.position] = value
+        offset = self._offset
+        if offset >= 0:
+            if offset >= len(self._right):
+                # Расширяем ленту вправо
+                self._right.extend([self.BLANK] * (offset - len(self._right) + 1))
+            self._right[offset] = value
         else:
-            # Расширяем ленту если нужно
-            if self.position < 0:
-                self.cells = ['0'] * (-self.position) + self.cells
-                self.position = 0
-            else:
-                self.cells.extend(['0'] * (self.position - len(self.cells) + 1))
-            self.cells[self.position] = value
+            if -offset > len(self._left):
+                # Расширяем ленту влево
+                self._left.extend([self.BLANK] * (-offset - len(self._left)))
+            self._left[-offset - 1] = value
     
     
     # Функции передвижение
     def move_left(self):
-        self.position -= 1
-        if self.position < 0:
-            self.cells.insert(0, '0')
-            self.position = 0
+        self._offset -= 1
+        if -self._offset > len(self._left):
+            self._left.append(self.BLANK)
     
     def move_right(self):
-        self.position += 1
-        if self.position >= len(self.cells):
-            self.cells.append('0')
+        self._offset += 1
+        if self._offset >= len(self._right):
+            self._right.append(self.BLANK)
     
-    def load_from_stream(self, stream):
-        data = stream.readline().strip()
-        self.cells = list(data) if data else ['0']
-        self.position = 0
+    # Загрузка ленты из первой строки потока (текстового или двоичного).
+    # Строка читается кусками по chunk_size символов и дописывается прямо в
+    # буфер, так что целиком она в памяти не держится. Пробелы по краям
+    # строки отбрасываются, как у strip(): хвостовые пробелы куска
+    # откладываются до следующего куска. Поток остаётся на начале следующей
+    # строки - там программа
+    def load_from_stream(self, stream, chunk_size=TAPE_CHUNK_SIZE):
+        self._begin_load()
+        pending = None
+        started = False
+        while True:
+            raw = stream.readline(chunk_size)
+            if not raw:
+                break
+            chunk = raw if pending is None else pending + raw
+            if not started:
+                chunk = chunk.lstrip()
+            body = chunk.rstrip()
+            pending = chunk[len(body):]
+            if body:
+                self._append_chunk(body)
+                started = True
+            if raw.endswith(b'\n' if isinstance(raw, bytes) else '\n'):
+                break
+        self._end_load()
+
+    # Загрузка кусками: начало, очередной кусок строки (str или bytes
+    # latin-1), конец
+    def _begin_load(self):
+        self._left = self._new_buffer("")
+        self._right = self._new_buffer("")
+        self._offset = 0
+
+    def _append_chunk(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('latin-1')
+        self._right.extend(self._new_buffer(chunk))
+
+    def _end_load(self):
+        if not self._right:
+            self._right = self._new_buffer('0')
+
+    # Клетки [start, stop) в формате буфера, без поклеточных строк
+    def _raw_region(self, start, stop):
+        split = len(self._left)
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if stop <= start:
+            return self._right[:0]
+        part = self._right[max(start - split, 0):max(stop - split, 0)]
+        if start < split:
+            part = self._left[split - min(stop, split):split - start][::-1] + part
+        return part
+
+    # Участок ленты [start, stop) строкой
+    def region(self, start, stop):
+        return self._to_str(self._raw_region(start, stop))
+
+    # Сдвиг головки сразу на count клеток (вправо при count > 0)
+    # с тем же ростом ленты, что у count шагов move_left/move_right
+    def move(self, count):
+        self._offset += count
+        offset = self._offset
+        if offset >= len(self._right):
+            self._right.extend([self.BLANK] * (offset - len(self._right) + 1))
+        elif -offset > len(self._left):
+            self._left.extend([self.BLANK] * (-offset - len(self._left)))
+
+    # Длина серии клеток буфера от start в направлении direction, для которых
+    # (клетка == symbol) == while_equal. Просмотр идёт окнами растущего
+    # размера, чтобы короткая серия не копировала весь буфер
+    def _run_length(self, buffer, start, direction, symbol, while_equal):
+        run = 0
+        width = 16
+        while True:
+            if direction > 0:
+                window = self._to_str(buffer[start:start + width])
+            else:
+                window = self._to_str(buffer[max(start - width + 1, 0):start + 1])[::-1]
+            if while_equal:
+                found = len(window) - len(window.lstrip(symbol))
+            else:
+                found = window.find(symbol)
+                if found < 0:
+                    found = len(window)
+            run += found
+            if found < len(window) or len(window) < width:
+                return run
+            start += direction * width
+            width *= 2
+
+    # Движение головки на шаг step (+1/-1), пока (клетка == symbol) == while_equal.
+    # Останавливается на первой неподходящей клетке или сразу за краем
+    # ленты (край растёт, как при move_right/move_left). limit - не больше
+    # стольких шагов. Возвращает число шагов
+    def scan(self, step, symbol, while_equal, limit=None):
+        moved = 0
+        while True:
+            offset = self._offset
+            if offset >= 0:
+                buffer, start, direction = self._right, offset, step
+            else:
+                buffer, start, direction = self._left, -offset - 1, -step
+            if not 0 <= start < len(buffer):
+                break
+            run = self._run_length(buffer, start, direction, symbol, while_equal)
+            if limit is not None and moved + run >= limit:
+                self._offset += (limit - moved) * step
+                moved = limit
+                break
+            moved += run
+            self._offset += run * step
+            available = len(buffer) - start if direction > 0 else start + 1
+            if run < available:
+                break
+            # Серия дошла до конца буфера: у начала ленты продолжаем
+            # в другом буфере, у края ленты - останавливаемся
+            if self._offset >= len(self._right) or -self._offset > len(self._left):
+                break
+        if self._offset >= len(self._right):
+            self._right.append(self.BLANK)
+        elif -self._offset > len(self._left):
+            self._left.append(self.BLANK)
+        return moved
+
+    # Все клетки ленты байтами (latin-1) - для сохранения на диск
+    def to_bytes(self):
+        return self.region(0, len(self)).encode('latin-1')
+
+    # Замена содержимого ленты байтами клеток и позицией головки
+    def load_bytes(self, data, position):
+        self._left = self._new_buffer("")
+        self._right = self._new_buffer(bytes(data).decode('latin-1') or '0')
+        self._offset = position
+
+    # Количество меток на ленте
+    def count_marks(self):
+        return self._left.count(self.MARK) + self._right.count(self.MARK)
+
+    # Ленты равны, если совпадают клетки и позиция головки
+    def __eq__(self, other):
+        if not isinstance(other, Tape):
+            return NotImplemented
+        if self.position != other.position or len(self) != len(other):
+            return False
+        if type(self) is type(other):
+            return (self._raw_region(0, len(self)) ==
+                    other._raw_region(0, len(other)))
+        return self.region(0, len(self)) == other.region(0, len(other))
+
+    __hash__ = None
+
+    # Клетки [start, stop) в формате __str__: " c " на клетку, "[c]" под
+    # головкой. Строится из участка ленты одним join, без f-строки на клетку
+    def render(self, start=0, stop=None):
+        start = max(start, 0)
+        stop = len(self) if stop is None else min(stop, len(self))
+        cells = self.region(start, stop)
+        if not cells:
+            return ""
+        text = " " + "  ".join(cells) + " "
+        head = self.position - start
+        if 0 <= head < len(cells):
+            text = f"{text[:3 * head]}[{cells[head]}]{text[3 * head + 3:]}"
+        return text
     
+    # Вся лента; для длинных лент - TapeViewport
     def __str__(self):
-        result = []
-        for i, cell in enumerate(self.cells):
-            if i == self.position:
-                result.append(f"[{cell}]")
+        return self.render()
+
+class CompactTape(Tape):
+    # Компактная лента: один байт на клетку в bytearray вместо списка
+    # односимвольных строк. Подсчёт меток, участки и сравнение лент
+    # работают прямо по буферу
+    BLANK = ord('0')
+    MARK = ord('1')
+
+    def _new_buffer(self, data):
+        return bytearray(data.encode('latin-1'))
+
+    def _to_str(self, buffer):
+        return buffer.decode('latin-1')
+
+    def get_current(self):
+        offset = self._offset
+        if offset >= 0:
+            if offset < len(self._right):
+                return chr(self._right[offset])
+        elif -offset <= len(self._left):
+            return chr(self._left[-offset - 1])
+        return '0'
+
+    def set_current(self, value):
+        Tape.set_current(self, ord(value))
+
+    # Двоичный кусок копируется в буфер как есть, без декодирования
+    def _append_chunk(self, chunk):
+        if isinstance(chunk, str):
+            chunk = chunk.encode('latin-1')
+        self._right += chunk
+
+    def to_bytes(self):
+        return self._raw_region(0, len(self))
+
+    def load_bytes(self, data, position):
+        self._left = bytearray()
+        self._right = bytearray(data) or bytearray(b'0')
+        self._offset = position
+
+# Максимальные серии одинаковых клеток в строке
+_RUN_RE = re.compile(r'(.)\1*', re.S)
+
+class RunLengthTape(Tape):
+    # Лента из серий: клетки хранятся отрезками (символ, длина) в двух
+    # списках _symbols/_lengths, соседние отрезки всегда с разными
+    # символами. Головка - номер отрезка _segment и начало этого отрезка
+    # _seg_start (смещение внутри отрезка - _position - _seg_start).
+    # Память пропорциональна числу серий, а не клеток, ход головки - O(1),
+    # запись клетки делит или сливает отрезки, scan проходит серию целиком.
+    # Головка вне ленты (после присваивания position) - _segment = -1;
+    # такая клетка читается как пустая, а при записи или движении лента
+    # сначала дорастает до головки
+    def __init__(self, initial_data=""):
+        self._load(initial_data or '0', 0)
+
+    def _load(self, data, position):
+        self._symbols = []
+        self._lengths = []
+        for match in _RUN_RE.finditer(data):
+            self._symbols.append(match.group(1))
+            self._lengths.append(match.end() - match.start())
+        self._length = len(data)
+        self._segment = -1
+        self._seg_start = 0
+        self.position = position
+
+    # Лента из серий [(символ, длина), ...] без построения строки клеток
+    @classmethod
+    def from_runs(cls, runs, position=0):
+        tape = cls()
+        tape._symbols = []
+        tape._lengths = []
+        tape._length = 0
+        for symbol, length in runs:
+            if length <= 0:
+                continue
+            if tape._symbols and tape._symbols[-1] == symbol:
+                tape._lengths[-1] += length
+            else:
+                tape._symbols.append(symbol)
+                tape._lengths.append(length)
+            tape._length += length
+        if not tape._symbols:
+            tape._symbols, tape._lengths, tape._length = [cls.BLANK], [1], 1
+        tape._segment = -1
+        tape.position = position
+        return tape
+
+    def runs(self):
+        return list(zip(self._symbols, self._lengths))
+
+    # Отрезок с клеткой position и его начало; поиск идёт от текущего
+    # отрезка, так что близкие позиции находятся быстро
+    def _find(self, position):
+        lengths = self._lengths
+        if self._segment >= 0:
+            seg, start = self._segment, self._seg_start
+        else:
+            seg, start = 0, 0
+        while position < start:
+            seg -= 1
+            start -= lengths[seg]
+        while position >= start + lengths[seg]:
+            start += lengths[seg]
+            seg += 1
+        return seg, start
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        if 0 <= value < self._length:
+            self._segment, self._seg_start = self._find(value)
+        else:
+            self._segment = -1
+
+    @property
+    def cells(self):
+        return TapeCells(self)
+
+    @cells.setter
+    def cells(self, value):
+        self._load("".join(value), self._position)
+
+    def __len__(self):
+        return self._length
+
+    # count пустых клеток слева / справа с объединением с крайним отрезком.
+    # Отрезок головки после этого надо искать заново
+    def _prepend_blanks(self, count):
+        if self._symbols[0] == self.BLANK:
+            self._lengths[0] += count
+        else:
+            self._symbols.insert(0, self.BLANK)
+            self._lengths.insert(0, count)
+        self._length += count
+        self._segment = -1
+
+    def _append_blanks(self, count):
+        if self._symbols[-1] == self.BLANK:
+            self._lengths[-1] += count
+        else:
+            self._symbols.append(self.BLANK)
+            self._lengths.append(count)
+        self._length += count
+        self._segment = -1
+
+    # Головка вне ленты: лента дорастает до неё, как при set_current
+    def _ensure_inside(self):
+        if self._segment >= 0:
+            return
+        if self._position < 0:
+            self._prepend_blanks(-self._position)
+            self._position = 0
+            self._segment, self._seg_start = 0, 0
+        elif self._position >= self._length:
+            self._append_blanks(self._position - self._length + 1)
+            self._segment = len(self._lengths) - 1
+            self._seg_start = self._length - self._lengths[-1]
+        else:
+            self._segment, self._seg_start = self._find(self._position)
+
+    def get_current(self):
+        if self._segment < 0:
+            return '0'
+        return self._symbols[self._segment]
+
+    def set_current(self, value):
+        self._ensure_inside()
+        symbols, lengths = self._symbols, self._lengths
+        s = self._segment
+        symbol = symbols[s]
+        if symbol == value:
+            return
+        length = lengths[s]
+        within = self._position - self._seg_start
+        same_prev = s > 0 and symbols[s - 1] == value
+        same_next = s + 1 < len(symbols) and symbols[s + 1] == value
+        if length == 1:
+            if same_prev:
+                # Клетка присоединяется к левому отрезку (и, может быть, правому)
+                previous = lengths[s - 1]
+                if same_next:
+                    lengths[s - 1] += 1 + lengths[s + 1]
+                    del symbols[s:s + 2], lengths[s:s + 2]
+                else:
+                    lengths[s - 1] += 1
+                    del symbols[s], lengths[s]
+                self._segment = s - 1
+                self._seg_start -= previous
+            elif same_next:
+                lengths[s + 1] += 1
+                del symbols[s], lengths[s]
+            else:
+                symbols[s] = value
+        elif within == 0:
+            lengths[s] -= 1
+            if same_prev:
+                self._segment = s - 1
+                self._seg_start -= lengths[s - 1]
+                lengths[s - 1] += 1
+            else:
+                symbols.insert(s, value)
+                lengths.insert(s, 1)
+        elif within == length - 1:
+            lengths[s] -= 1
+            self._segment = s + 1
+            self._seg_start += length - 1
+            if same_next:
+                lengths[s + 1] += 1
+            else:
+                symbols.insert(s + 1, value)
+                lengths.insert(s + 1, 1)
+        else:
+            # Запись в середину серии: отрезок делится на три
+            lengths[s] = within
+            symbols[s + 1:s + 1] = [value, symbol]
+            lengths[s + 1:s + 1] = [1, length - within - 1]
+            self._segment = s + 1
+            self._seg_start += within
+
+    def move_left(self):
+        self._ensure_inside()
+        position = self._position - 1
+        if position >= self._seg_start:
+            self._position = position
+        elif self._segment > 0:
+            self._segment -= 1
+            self._seg_start -= self._lengths[self._segment]
+            self._position = position
+        else:
+            # Левый край: новая пустая клетка становится клеткой 0
+            self._prepend_blanks(1)
+            self._segment, self._seg_start = 0, 0
+
+    def move_right(self):
+        self._ensure_inside()
+        position = self._position + 1
+        self._position = position
+        segment = self._segment
+        if position < self._seg_start + self._lengths[segment]:
+            return
+        if segment + 1 < len(self._lengths):
+            self._segment = segment + 1
+            self._seg_start = position
+        else:
+            self._append_blanks(1)
+            self._segment = len(self._lengths) - 1
+            self._seg_start = self._length - self._lengths[-1]
+
+    # Кусок строки сразу сворачивается в серии; серия на стыке кусков
+    # сливается с последней
+    def _begin_load(self):
+        self._load("", 0)
+
+    def _append_chunk(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('latin-1')
+        symbols, lengths = self._symbols, self._lengths
+        for match in _RUN_RE.finditer(chunk):
+            symbol = match.group(1)
+            length = match.end() - match.start()
+            if symbols and symbols[-1] == symbol:
+                lengths[-1] += length
+            else:
+                symbols.append(symbol)
+                lengths.append(length)
+        self._length += len(chunk)
+
+    def _end_load(self):
+        if not self._symbols:
+            self._load('0', 0)
+        else:
+            self.position = 0
+
+    def _raw_region(self, start, stop):
+        start = max(start, 0)
+        stop = min(stop, self._length)
+        if stop <= start:
+            return ""
+        symbols, lengths = self._symbols, self._lengths
+        seg, seg_start = self._find(start)
+        parts = []
+        position = start
+        while position < stop:
+            end = min(seg_start + lengths[seg], stop)
+            parts.append(symbols[seg] * (end - position))
+            position = end
+            seg_start += lengths[seg]
+            seg += 1
+        return "".join(parts)
+
+    def region(self, start, stop):
+        return self._raw_region(start, stop)
+
+    def move(self, count):
+        self._ensure_inside()
+        target = self._position + count
+        if target < 0:
+            self._prepend_blanks(-target)
+            self._position = 0
+            self._segment, self._seg_start = 0, 0
+        elif target >= self._length:
+            self._append_blanks(target - self._length + 1)
+            self._position = target
+            self._segment = len(self._lengths) - 1
+            self._seg_start = self._length - self._lengths[-1]
+        else:
+            self._segment, self._seg_start = self._find(target)
+            self._position = target
+
+    # Сколько клеток серии головки от головки (включительно) до конца
+    # серии в направлении step
+    def run_length(self, step=1):
+        if self._segment < 0:
+            return 0
+        if step > 0:
+            return self._seg_start + self._lengths[self._segment] - self._position
+        return self._position - self._seg_start + 1
+
+    # Тот же поиск, что Tape.scan, но серия проходится за один шаг цикла
+    def scan(self, step, symbol, while_equal, limit=None):
+        self._ensure_inside()
+        symbols, lengths = self._symbols, self._lengths
+        moved = 0
+        while (symbols[self._segment] == symbol) == while_equal:
+            run = self.run_length(step)
+            if limit is not None and limit - moved < run:
+                # Бюджет кончается внутри серии
+                self._position += (limit - moved) * step
+                return limit
+            segment = self._segment
+            if step > 0 and segment + 1 < len(lengths):
+                self._seg_start += lengths[segment]
+                self._segment = segment + 1
+                self._position += run
+            elif step < 0 and segment > 0:
+                self._segment = segment - 1
+                self._seg_start -= lengths[segment - 1]
+                self._position -= run
             else:
-                result.append(f" {cell} ")
-        return "".join(result)
+                # Серия доходит до края ленты: шаг за край и остановка
+                self._position += (run - 1) * step
+                if step > 0:
+                    self.move_right()
+                else:
+                    self.move_left()
+                return moved + run
+            moved += run
+            if limit is not None and moved >= limit:
+                return moved
+        return moved
+
+    def load_bytes(self, data, position):
+        self._load(bytes(data).decode('latin-1') or '0', position)
+
+    def count_marks(self):
+        return sum(length for symbol, length in zip(self._symbols, self._lengths)
+                   if symbol == self.MARK)
+
+VIEWPORT_RADIUS = 30
+
+class TapeViewport:
+    # Окно отображения ленты: только клетки вокруг головки, скрытые
+    # клетки по краям заменяются счётчиками "...(N) " и " (N)...".
+    # Окно не сдвигается, пока головка остаётся в нём, а отрисовка
+    # кэшируется по клеткам: при следующем вызове перерисовываются только
+    # изменившиеся клетки и клетки со старой и новой позицией головки
+    def __init__(self, radius=VIEWPORT_RADIUS):
+        self.radius = radius
+        self._tape = None
+        self._start = 0
+        self._cells = ""
+        self._pieces = []
+        self._head = -1
+
+    def render(self, tape):
+        length = len(tape)
+        position = tape.position
+        width = 2 * self.radius + 1
+        start = self._start
+        if tape is not self._tape or not start <= position < start + width \
+                or start + width > length and start > 0:
+            start = max(0, min(position - self.radius, length - width))
+        stop = min(start + width, length)
+        cells = tape.region(start, stop)
+        head = position - start if 0 <= position - start < len(cells) else -1
+
+        if tape is self._tape and start == self._start and len(cells) == len(self._cells):
+            # Обновление кэша: только изменившиеся клетки и головка
+            pieces = self._pieces
+            if cells != self._cells:
+                old = self._cells
+                for i in range(len(cells)):
+                    if cells[i] != old[i]:
+                        pieces[i] = f" {cells[i]} "
+            if 0 <= self._head < len(cells):
+                pieces[self._head] = f" {cells[self._head]} "
+        else:
+            pieces = [f" {cell} " for cell in cells]
+        if head >= 0:
+            pieces[head] = f"[{cells[head]}]"
+
+        self._tape = tape
+        self._start = start
+        self._cells = cells
+        self._pieces = pieces
+        self._head = head
+        text = "".join(pieces)
+        if start > 0:
+            text = f"...({start}) " + text
+        if stop < length:
+            text += f" ({length - stop})..."
+        return text
 
 class Rule:
     def __init__(self, number, condition, action_true, action_false):
@@ -70,10 +768,315 @@ class Rule:
     def __str__(self):
         return f"{self.number}: {self.condition} -> {self.action_true}; !{self.condition} -> {self.action_false}"
 
+# Коды операций скомпилированной программы
+OP_MARK = 0     # V - поставить метку
+OP_ERASE = 1    # X - стереть метку
+OP_RIGHT = 2    # R - вправо
+OP_LEFT = 3     # L - влево
+OP_JUMP = 4     # ?N или N - переход на правило N
+OP_STOP = 5     # ! - остановка
+OP_INVALID = 6  # неизвестное действие - остановка после шага
+OP_RUN = 7      # слитая цепочка одинаковых безусловных R/L
+OP_SCAN = 8     # слитый цикл "двигаться, пока клетка подходит"
+
+
+# Разбор строки действия в (код операции, номер правила перехода или None)
+def decode_action(action):
+    if action == 'V':
+        return OP_MARK, None
+    if action == 'X':
+        return OP_ERASE, None
+    if action == 'R':
+        return OP_RIGHT, None
+    if action == 'L':
+        return OP_LEFT, None
+    if action == '!':
+        return OP_STOP, None
+    try:
+        return OP_JUMP, int(action[1:] if action.startswith('?') else action)
+    except ValueError:
+        return OP_INVALID, None
+
+
+class CompiledProgram:
+    # Программа в виде плоского массива заранее разобранных команд.
+    # code[i] = (условие, операция_истина, следующий_индекс_истина,
+    #            операция_ложь, следующий_индекс_ложь),
+    # numbers[i] - номер правила для индекса i. Переходы на несуществующие
+    # правила ведут на записи с условием None - там машина останавливается.
+    # macros[i] - аргументы слитых операций OP_RUN/OP_SCAN (см. fuse)
+    def __init__(self, program):
+        self.macros = {}
+        self.numbers = sorted(program.rules)
+        self.index = {number: i for i, number in enumerate(self.numbers)}
+        self.code = [None] * len(self.numbers)
+        for i, number in enumerate(self.numbers[:len(self.code)]):
+            rule = program.rules[number]
+            op_true, next_true = self._decode(i, number, rule.action_true)
+            op_false, next_false = self._decode(i, number, rule.action_false)
+            self.code[i] = (rule.condition, op_true, next_true, op_false, next_false)
+
+    # Индекс записи для номера правила, с заглушкой для отсутствующих
+    def _target(self, number):
+        if number not in self.index:
+            self.index[number] = len(self.numbers)
+            self.numbers.append(number)
+            self.code.append((None, OP_STOP, self.index[number], OP_STOP, self.index[number]))
+        return self.index[number]
+
+    def _decode(self, i, number, action):
+        op, target = decode_action(action)
+        if op == OP_JUMP:
+            return op, self._target(target)
+        if op in (OP_STOP, OP_INVALID):
+            return op, i
+        return op, self._target(number + 1)
+
+    # Безусловный переход: обе ветви ведут на одно правило
+    def _jump_target(self, i):
+        condition, op_true, next_true, op_false, next_false = self.code[i]
+        if condition is not None and op_true == op_false == OP_JUMP and next_true == next_false:
+            return next_true
+        return None
+
+    # Безусловное движение: обе ветви делают один и тот же R или L
+    def _move_step(self, i):
+        condition, op_true, next_true, op_false, next_false = self.code[i]
+        if condition is not None and op_true == op_false and op_true in (OP_RIGHT, OP_LEFT):
+            return op_true, next_true
+        return None
+
+    # Слияние типичных цепочек в макрооперации. Число шагов при этом
+    # считается логическое - как при поштучном выполнении правил:
+    # OP_RUN   - подряд идущие правила "R; R" (или "L; L") -> один сдвиг
+    #            на k клеток, macros[i] = (сдвиг со знаком, шагов). Цепочка
+    #            сливается только в одну сторону: "R; R; L" - это run
+    #            "R; R" и отдельный L
+    # OP_SCAN  - при одном исходе условия правило через безусловные
+    #            переходы и ровно один сдвиг возвращается к себе -> один
+    #            поиск конца серии по ленте, macros[i] = (направление,
+    #            символ, двигаться_пока_равно, шагов_за_виток)
+    def fuse(self):
+        moves = {OP_RIGHT: 1, OP_LEFT: -1}
+        scans = {}
+        for i, (condition, op_true, next_true, op_false, next_false) in enumerate(self.code):
+            if condition is None or len(condition) != 1:
+                continue
+            for while_equal, op, next_i in ((True, op_true, next_true), (False, op_false, next_false)):
+                loop = self._scan_loop(i, op, next_i)
+                if loop is not None:
+                    scans[i] = (loop[0], condition, while_equal, loop[1])
+                    break
+
+        runs = {}
+        for i in reversed(range(len(self.code))):
+            move = self._move_step(i)
+            if move is None:
+                continue
+            direction, count, end = moves[move[0]], 1, move[1]
+            if end in runs and runs[end][0] == direction:
+                count, end = 1 + runs[end][1], runs[end][2]
+            runs[i] = (direction, count, end)
+        for i, (direction, count, end) in runs.items():
+            if count > 1:
+                self.code[i] = (self.code[i][0], OP_RUN, end, OP_RUN, end)
+                self.macros[i] = (direction * count, count)
+
+        for i, macro in scans.items():
+            condition, op_true, next_true, op_false, next_false = self.code[i]
+            if macro[2]:
+                self.code[i] = (condition, OP_SCAN, i, op_false, next_false)
+            else:
+                self.code[i] = (condition, op_true, next_true, OP_SCAN, i)
+            self.macros[i] = macro
+        return self
+
+    # Путь из правила i по ветви (op, next_i): если он через безусловные
+    # переходы и ровно один сдвиг возвращается в i - (направление, длина)
+    def _scan_loop(self, i, op, next_i):
+        moves = {OP_RIGHT: 1, OP_LEFT: -1}
+        if op in moves:
+            direction = moves[op]
+        elif op == OP_JUMP:
+            direction = None
+        else:
+            return None
+        length = 1
+        while next_i != i:
+            if length > len(self.code):
+                return None
+            target = self._jump_target(next_i)
+            if target is None:
+                move = self._move_step(next_i)
+                if move is None or direction is not None:
+                    return None
+                direction, target = moves[move[0]], move[1]
+            next_i = target
+            length += 1
+        if direction is None:
+            return None
+        return direction, length
+
+
+# Сообщение парсера программы с местом в исходном тексте
+class Diagnostic:
+    ERROR = 'error'      # правило отброшено
+    WARNING = 'warning'  # правило загружено, но выглядит подозрительно
+    
+    def __init__(self, line, column, severity, message):
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.message = message
+    
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and \
+            (self.line, self.column, self.severity, self.message) == \
+            (other.line, other.column, other.severity, other.message)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"Diagnostic({self.line}, {self.column}, {self.severity!r}, {self.message!r})"
+    
+    def __str__(self):
+        kind = "ошибка" if self.severity == Diagnostic.ERROR else "предупреждение"
+        return f"строка {self.line}, столбец {self.column}: {kind}: {self.message}"
+
+
+# Ошибка разбора программы в строгом режиме
+class ProgramSyntaxError(ValueError):
+    def __init__(self, diagnostics):
+        self.diagnostics = diagnostics
+        super().__init__("\n".join(str(d) for d in diagnostics))
+
+
+# Лексемы строки правила: номер, ':', условие, '->', действие, ';', ...
+# '#' начинает комментарий до конца строки
+_TOKEN_RE = re.compile(r"(?P<space>\s+)|(?P<comment>#.*)|(?P<arrow>->)|(?P<colon>:)"
+                       r"|(?P<semi>;)|(?P<word>(?:[^\s:;#-]|-(?!>))+)")
+
+# Ожидаемая последовательность лексем правила
+_RULE_GRAMMAR = (
+    ('word', "номер правила"), ('colon', "':'"),
+    ('word', "условие"), ('arrow', "'->'"), ('word', "действие"), ('semi', "';'"),
+    ('word', "условие ложной ветви"), ('arrow', "'->'"), ('word', "действие"),
+)
+
+
+def _tokenize(line):
+    tokens = []
+    for match in _TOKEN_RE.finditer(line):
+        kind = match.lastgroup
+        if kind not in ('space', 'comment'):
+            tokens.append((kind, match.group(), match.start() + 1))
+    return tokens
+
+
+# Условия, противоположные condition
+def _complements(condition):
+    if condition == '1':
+        return ('0', '!1')
+    if condition == '0':
+        return ('1', '!0')
+    return ('!' + condition,)
+
+
+# Разбор текста программы. Возвращает (правила, сообщения), где правило -
+# (номер, условие, действие_истина, действие_ложь) в порядке появления.
+# first_line - номер первой строки текста в исходном файле
+def parse_program(text, first_line=1):
+    rules = []
+    diagnostics = []
+    defined = {}     # номер правила -> строка определения
+    jumps = []       # (цель, строка, столбец) явных переходов
+    for line_no, line in enumerate(text.splitlines(), first_line):
+        tokens = _tokenize(line)
+        if not tokens:
+            continue
+        
+        values = []
+        for i, (kind, expected) in enumerate(_RULE_GRAMMAR):
+            if i >= len(tokens):
+                column = len(line.rstrip()) + 1
+                diagnostics.append(Diagnostic(line_no, column, Diagnostic.ERROR,
+                                              f"ожидалось {expected}, а строка закончилась"))
+                break
+            if tokens[i][0] != kind:
+                diagnostics.append(Diagnostic(line_no, tokens[i][2], Diagnostic.ERROR,
+                                              f"ожидалось {expected}, найдено '{tokens[i][1]}'"))
+                break
+            values.append(tokens[i])
+        else:
+            if len(tokens) > len(_RULE_GRAMMAR):
+                extra = tokens[len(_RULE_GRAMMAR)]
+                diagnostics.append(Diagnostic(line_no, extra[2], Diagnostic.ERROR,
+                                              f"лишний текст '{extra[1]}' после правила"))
+                continue
+        if len(values) != len(_RULE_GRAMMAR):
+            continue
+        
+        number_token, condition, action_true, false_condition, action_false = \
+            (values[i] for i in (0, 2, 4, 6, 8))
+        try:
+            number = int(number_token[1])
+        except ValueError:
+            diagnostics.append(Diagnostic(line_no, number_token[2], Diagnostic.ERROR,
+                                          f"номер правила '{number_token[1]}' не целое число"))
+            continue
+        
+        if number in defined:
+            diagnostics.append(Diagnostic(line_no, number_token[2], Diagnostic.WARNING,
+                                          f"правило {number} уже определено в строке "
+                                          f"{defined[number]}, используется последнее"))
+        defined[number] = line_no
+        if false_condition[1] not in _complements(condition[1]):
+            diagnostics.append(Diagnostic(line_no, false_condition[2], Diagnostic.WARNING,
+                                          f"условие '{false_condition[1]}' не противоположно "
+                                          f"'{condition[1]}', ветвь выполняется при "
+                                          f"любом значении, кроме '{condition[1]}'"))
+        for action in (action_true, action_false):
+            op, target = decode_action(action[1])
+            if op == OP_INVALID:
+                diagnostics.append(Diagnostic(line_no, action[2], Diagnostic.WARNING,
+                                              f"неизвестное действие '{action[1]}', "
+                                              f"машина на нём остановится"))
+            elif op == OP_JUMP:
+                jumps.append((target, line_no, action[2]))
+        rules.append((number, condition[1], action_true[1], action_false[1]))
+    
+    for target, line_no, column in jumps:
+        if target not in defined:
+            diagnostics.append(Diagnostic(line_no, column, Diagnostic.WARNING,
+                                          f"переход на несуществующее правило {target}"))
+    diagnostics.sort(key=lambda d: (d.line, d.column))
+    return rules, diagnostics
+
+
+# Кэш разобранных программ по хэшу текста - повторные загрузки
+# одной программы (например, в пакетных прогонах) не разбирают её заново
+PARSE_CACHE_SIZE = 256
+_parse_cache = OrderedDict()
+
+
+def parse_program_cached(text, first_line=1):
+    key = (hashlib.sha256(text.encode('utf-8')).digest(), first_line)
+    cached = _parse_cache.get(key)
+    if cached is None:
+        rules, diagnostics = parse_program(text, first_line)
+        cached = _parse_cache[key] = (tuple(rules), tuple(diagnostics))
+        if len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    else:
+        _parse_cache.move_to_end(key)
+    return cached
+
+
 class Program:
     def __init__(self):
         self.rules = {} 
         self.current_rule = 1  
+        self.diagnostics = []  # сообщения последней загрузки из потока
     
     def add_rule(self, rule):
         self.rules[rule.number] = rule
@@ -88,48 +1091,128 @@ class Program:
     def view_rules(self):
         return "\n".join(str(rule) for num, rule in sorted(self.rules.items()))
     
-    def load_from_stream(self, stream):
-        for line in stream:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            try:
-                # Формат: номер: условие -> действие_истина; действие_ложь
-                parts = line.split(':')
-                number = int(parts[0].strip())
-                
-                actions_part = parts[1].split(';')
-                condition_action = actions_part[0].split('->')
-                condition = condition_action[0].strip()
-                action_true = condition_action[1].strip()
-                
-                action_false = actions_part[1].split('->')[1].strip()
-                
-                rule = Rule(number, condition, action_true, action_false)
-                self.add_rule(rule)
-                
-            except (ValueError, IndexError) as e:
-                print(f"Ошибка parsing правила: {line}")
-                continue
+    # Загрузка правил из потока; сообщения парсера - в self.diagnostics.
+    # Формат: номер: условие -> действие_истина; !условие -> действие_ложь.
+    # Правила с ошибками отбрасываются, strict=True - вместо этого
+    # ProgramSyntaxError. first_line - номер первой строки потока в файле
+    def load_from_stream(self, stream, first_line=1, strict=False):
+        rules, diagnostics = parse_program_cached("".join(stream), first_line)
+        self.diagnostics = list(diagnostics)
+        if strict and any(d.severity == Diagnostic.ERROR for d in diagnostics):
+            raise ProgramSyntaxError(self.diagnostics)
+        for number, condition, action_true, action_false in rules:
+            self.add_rule(Rule(number, condition, action_true, action_false))
+    
+    # Компиляция правил в таблицу команд для быстрого выполнения;
+    # fuse=True - со слиянием циклов и цепочек в макрооперации
+    def compile(self, fuse=False):
+        compiled = CompiledProgram(self)
+        return compiled.fuse() if fuse else compiled
     
     def __str__(self):
         return self.view_rules()
 
+# Формат контрольной точки: CHECKPOINT_MAGIC, заголовок CHECKPOINT_HEADER
+# (флаги, шаг, правило, позиция головки, длина ленты, длина программы),
+# программа в JSON, затем клетки ленты по байту на клетку (latin-1).
+# Лента с символами вне latin-1 пишется в UTF-8 с флагом CHECKPOINT_UTF8,
+# длина ленты в заголовке - тогда в байтах
+CHECKPOINT_MAGIC = b'PMCKPT01'
+CHECKPOINT_HEADER = struct.Struct('<Bqqqqi')
+CHECKPOINT_HALTED = 1
+CHECKPOINT_UTF8 = 2
+# Ленты от этого размера читаются через mmap, без промежуточной копии
+CHECKPOINT_MMAP_SIZE = 1 << 20
+# Файлы заданий от этого размера загружаются через mmap (load_file)
+TASK_MMAP_SIZE = 1 << 20
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+
+class CycleDetector:
+    # Поиск зацикливания методом Брента по состояниям машины, снятым
+    # раз в N итераций. Ключ состояния - (правило, позиция головки,
+    # длина ленты, окно клеток вокруг головки); при совпадении ключа
+    # лента сверяется целиком, так что цикл доказан, а не угадан.
+    # Полная копия ленты снимается только при переносе "черепахи" -
+    # O(log) раз за прогон
+    def __init__(self, window=32):
+        self.window = window
+        self.power = 1
+        self.length = 0
+        self.saved = None  # (ключ, вся лента, шаг)
+
+    # Очередная проверка; возвращает длину цикла в шагах или None
+    def check(self, rule, tape, steps):
+        position = tape.position
+        key = (rule, position, len(tape),
+               tape.region(position - self.window, position + self.window + 1))
+        if self.saved is not None and self.saved[0] == key \
+                and self.saved[1] == tape.region(0, len(tape)):
+            return steps - self.saved[2]
+        if self.saved is None or self.length == self.power:
+            self.saved = (key, tape.region(0, len(tape)), steps)
+            if self.length == self.power:
+                self.power *= 2
+            self.length = 0
+        self.length += 1
+        return None
+
+
 class Post_machine:
-    def __init__(self):
-        self.tape = Tape()
+    # tape_factory - класс ленты (бэкенд хранения), по умолчанию Tape;
+    # compact=True - компактная лента CompactTape для длинных прогонов
+    def __init__(self, tape_factory=Tape, compact=False):
+        if compact:
+            tape_factory = CompactTape
+        self.tape_factory = tape_factory
+        self.tape = tape_factory()
         self.program = Program()
         self.halted = False
         self.step_count = 0
+        self.trace = None  # приёмник трассы шагов (post_trace.TraceWriter)
+        self.viewport = TapeViewport()  # окно ленты для __str__
     
     # потокавая ленты загрузка
     def load_tape_from_stream(self, stream):
         self.tape.load_from_stream(stream)
     
     # потоковая загрузка программы и правил
-    def load_program_from_stream(self, stream):
-        self.program.load_from_stream(stream)
+    def load_program_from_stream(self, stream, first_line=1, strict=False):
+        self.program.load_from_stream(stream, first_line, strict)
+
+    # загрузка файла задания: первая строка - лента, остальное - программа.
+    # Большой файл отображается через mmap, и лента копируется в буфер
+    # прямо из отображения, без промежуточной строки
+    def load_file(self, path, strict=False):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < TASK_MMAP_SIZE:
+                stream = io.TextIOWrapper(f, encoding='utf-8')
+                self.load_tape_from_stream(stream)
+                self.load_program_from_stream(stream, first_line=2, strict=strict)
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.find(b'\n')
+                if end < 0:
+                    end = size
+                start, stop = 0, end
+                while start < stop and mm[start] in _WHITESPACE:
+                    start += 1
+                while stop > start and mm[stop - 1] in _WHITESPACE:
+                    stop -= 1
+                view = memoryview(mm)[start:stop]
+                try:
+                    if _NON_ASCII_RE.search(view) is None:
+                        self.tape.load_bytes(view, 0)
+                    else:
+                        # Лента не из ASCII - декодируется как UTF-8, как у
+                        # маленьких файлов (байты latin-1 разбили бы символы)
+                        self.tape.load_from_stream(io.StringIO(str(view, 'utf-8')))
+                finally:
+                    view.release()
+                program = mm[end + 1:].decode('utf-8')
+        self.load_program_from_stream(io.StringIO(program), first_line=2, strict=strict)
     
     # один шаг
     def execute_step(self):
@@ -170,12 +1253,219 @@ class Post_machine:
             except ValueError:
                 self.halted = True
         
+        if self.trace is not None:
+            self.trace.record(current_rule.number, action,
+                              self.program.current_rule, self.tape.position)
         return True
     
-    # выполнение всех возможных шагов
-    def execute_all(self):
-        while self.execute_step():
-            pass
+    # выполнение всех возможных шагов по скомпилированной программе;
+    # результат и число шагов те же, что у цикла по execute_step.
+    # fuse=False отключает макрооперации (для сверки).
+    # Ограничения (по умолчанию выключены) проверяются раз в check_every
+    # итераций: max_steps - бюджет шагов, max_time - бюджет секунд,
+    # detect_cycles - поиск зацикливания (CycleDetector). Возвращает
+    # словарь с причиной остановки: 'halt', 'step_limit', 'time_limit'
+    # или 'cycle'; при досрочной остановке машину можно запустить дальше
+    def execute_all(self, fuse=True, max_steps=None, max_time=None,
+                    detect_cycles=False, check_every=4096):
+        if self.halted:
+            return self._run_result('halt')
+        compiled = self.program.compile(fuse)
+        i = compiled.index.get(self.program.current_rule)
+        if i is None:
+            self.halted = True
+            return self._run_result('halt')
+        
+        limited = max_steps is not None or max_time is not None or detect_cycles
+        detector = CycleDetector() if detect_cycles else None
+        deadline = time.perf_counter() + max_time if max_time is not None else None
+        reason = 'halt'
+        extra = {}
+        
+        code = compiled.code
+        macros = compiled.macros
+        # Неслитая программа - для шагов, на которые не хватает бюджета
+        # целой макрооперации
+        plain = self.program.compile().code if fuse and max_steps is not None else None
+        tape = self.tape
+        get_current = tape.get_current
+        set_current = tape.set_current
+        move_left = tape.move_left
+        move_right = tape.move_right
+        steps = self.step_count
+        try:
+            while True:
+                chunk = check_every if limited else sys.maxsize
+                if max_steps is not None:
+                    if steps >= max_steps:
+                        reason = 'step_limit'
+                        break
+                    chunk = min(chunk, max_steps - steps)
+                over = False
+                # left - сколько итераций куска осталось, включая текущую
+                for left in range(chunk, 0, -1):
+                    condition, op, next_i, op_false, next_false = code[i]
+                    if condition is None:
+                        break
+                    if get_current() != condition:
+                        op, next_i = op_false, next_false
+                    steps += 1
+                    if op == OP_RIGHT:
+                        move_right()
+                    elif op == OP_LEFT:
+                        move_left()
+                    elif op == OP_MARK:
+                        set_current('1')
+                    elif op == OP_ERASE:
+                        set_current('0')
+                    elif op == OP_SCAN:
+                        step, symbol, while_equal, weight = macros[i]
+                        if max_steps is None:
+                            steps += weight * tape.scan(step, symbol, while_equal) - 1
+                        else:
+                            # Не больше витков, чем осталось в бюджете шагов;
+                            # на неполный виток - поштучный шаг
+                            loops = (max_steps - steps + 1) // weight
+                            if loops:
+                                steps += weight * tape.scan(step, symbol, while_equal, loops) - 1
+                            else:
+                                next_i = self._plain_step(plain, i)
+                            if steps + left - 1 > max_steps:
+                                i = next_i
+                                over = True
+                                break
+                    elif op == OP_RUN:
+                        shift, count = macros[i]
+                        if max_steps is not None and count > max_steps - steps + 1:
+                            next_i = self._plain_step(plain, i)
+                        else:
+                            tape.move(shift)
+                            steps += count - 1
+                        if max_steps is not None and steps + left - 1 > max_steps:
+                            i = next_i
+                            over = True
+                            break
+                    elif op != OP_JUMP:
+                        break
+                    i = next_i
+                else:
+                    # Проверки раз в chunk итераций
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        reason = 'time_limit'
+                        break
+                    if detector is not None:
+                        cycle_steps = detector.check(compiled.numbers[i], tape, steps)
+                        if cycle_steps is not None:
+                            reason = 'cycle'
+                            extra['cycle_steps'] = cycle_steps
+                            break
+                    continue
+                if over:
+                    # Макрооперация съела больше шагов, чем итераций: остаток
+                    # куска мог бы превысить бюджет - кусок пересчитывается
+                    continue
+                break
+        finally:
+            self.step_count = steps
+            self.program.current_rule = compiled.numbers[i]
+        if reason == 'halt':
+            self.halted = True
+        return self._run_result(reason, **extra)
+
+    # Один шаг правила i по неслитой программе plain (ветви слитых правил -
+    # сдвиги и переходы); возвращает индекс следующего правила
+    def _plain_step(self, plain, i):
+        condition, op, next_i, op_false, next_false = plain[i]
+        if self.tape.get_current() != condition:
+            op, next_i = op_false, next_false
+        if op == OP_RIGHT:
+            self.tape.move_right()
+        elif op == OP_LEFT:
+            self.tape.move_left()
+        return next_i
+
+    # структурированный результат execute_all
+    def _run_result(self, reason, **extra):
+        result = {
+            'reason': reason,
+            'halted': self.halted,
+            'steps': self.step_count,
+        }
+        result.update(extra)
+        return result
+    
+    # сохранение полного состояния машины в файл. Запись идёт во временный
+    # файл с последующей заменой, так что оборванная запись не портит
+    # предыдущую контрольную точку
+    def save_checkpoint(self, path):
+        program = json.dumps([[rule.number, rule.condition, rule.action_true, rule.action_false]
+                              for num, rule in sorted(self.program.rules.items())],
+                             ensure_ascii=False).encode('utf-8')
+        flags = CHECKPOINT_HALTED if self.halted else 0
+        try:
+            cells = self.tape.to_bytes()
+        except UnicodeEncodeError:
+            cells = self.tape.region(0, len(self.tape)).encode('utf-8')
+            flags |= CHECKPOINT_UTF8
+        header = CHECKPOINT_HEADER.pack(
+            flags, self.step_count,
+            self.program.current_rule, self.tape.position, len(cells), len(program))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(CHECKPOINT_MAGIC + header)
+            f.write(program)
+            f.write(cells)
+        os.replace(tmp_path, path)
+    
+    # восстановление состояния из файла save_checkpoint; лента создаётся
+    # через tape_factory этой машины
+    def load_checkpoint(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+                raise ValueError(f"{path}: не контрольная точка машины Поста")
+            flags, step, rule, position, tape_size, program_size = \
+                CHECKPOINT_HEADER.unpack(f.read(CHECKPOINT_HEADER.size))
+            rules = json.loads(f.read(program_size).decode('utf-8'))
+            if flags & CHECKPOINT_UTF8:
+                tape = self._utf8_tape(path, f.read(tape_size), position)
+            elif tape_size >= CHECKPOINT_MMAP_SIZE:
+                tape = self.tape_factory()
+                start = f.tell()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)[start:start + tape_size]
+                    tape.load_bytes(view, position)
+                    view.release()
+            else:
+                tape = self.tape_factory()
+                tape.load_bytes(f.read(tape_size), position)
+        
+        self.program = Program()
+        for number, condition, action_true, action_false in rules:
+            self.program.add_rule(Rule(number, condition, action_true, action_false))
+        self.program.current_rule = rule
+        self.tape = tape
+        self.step_count = step
+        self.halted = bool(flags & CHECKPOINT_HALTED)
+    
+    # Лента контрольной точки с флагом CHECKPOINT_UTF8; бэкенд, который
+    # хранит только latin-1 (CompactTape), - ValueError
+    def _utf8_tape(self, path, data, position):
+        try:
+            tape = self.tape_factory(data.decode('utf-8'))
+        except UnicodeError:
+            raise ValueError(f"{path}: на ленте символы вне latin-1, "
+                             f"{self.tape_factory.__name__} их не хранит") from None
+        tape.position = position
+        return tape
+    
+    # прогон с контрольной точкой каждые every шагов; после перезапуска
+    # можно вызвать load_checkpoint(path) и продолжить с того же места
+    def run_with_checkpoints(self, path, every, **limits):
+        while True:
+            result = self.execute_all(max_steps=self.step_count + every, **limits)
+            self.save_checkpoint(path)
+            if result['reason'] != 'step_limit':
+                return result
     
     # возвращение текующего состояния машины
     def get_state(self):
@@ -186,31 +1476,37 @@ class Post_machine:
             'halted': self.halted
         }
     
-    # строковый формат предствавления состояния
+    # строковый формат предствавления состояния; лента показывается
+    # окном вокруг головки, full=True - вся лента
+    def describe(self, full=False):
+        tape = str(self.tape) if full else self.viewport.render(self.tape)
+        return (f"Шаг: {self.step_count}, "
+                f"Правило: {self.program.current_rule}, "
+                f"Лента: {tape}, "
+                f"Остановлена: {self.halted}")
+
     def __str__(self):
-        state = self.get_state()
-        return (f"Шаг: {state['step']}, "
-                f"Правило: {state['current_rule']}, "
-                f"Лента: {state['tape']}, "
-                f"Остановлена: {state['halted']}")
+        return self.describe()
 
 def main():
     if len(sys.argv) < 2:
-        print("Использование: python post_machine.py <файл> [-log]")
+        print("Использование: python post_machine.py <файл> [-log [файл_трассы]]")
         sys.exit(1)
     
     filename = sys.argv[1]
     log_mode = len(sys.argv) > 2 and sys.argv[2] == '-log'
+    trace_file = sys.argv[3] if len(sys.argv) > 3 else filename + '.trace'
     
     try:
         # Создаем и инициализируем машину Поста
         machine = Post_machine()
         
-        with open(filename, 'r', encoding='utf-8') as f:
-            # Первая строка - начальное состояние ленты
-            machine.load_tape_from_stream(f)
-            # Остальные строки - программа (набор правил)
-            machine.load_program_from_stream(f)
+        # Первая строка - начальное состояние ленты,
+        # остальные строки - программа (набор правил)
+        machine.load_file(filename)
+        
+        for diagnostic in machine.program.diagnostics:
+            print(f"{filename}: {diagnostic}")
         
         print("Начальное состояние:")
         print(machine)
@@ -219,13 +1515,15 @@ def main():
         print()
         
         if log_mode:
-            # Пошаговое выполнение с выводом после каждого шага
-            step = 1
-            while machine.execute_step():
-                print(f"После шага {step}:")
-                print(machine)
-                step += 1
-                print()
+            # Пошаговое выполнение с записью дельт шагов в трассу;
+            # состояние на любом шаге: python post_trace.py <трасса> <шаг>
+            from post_trace import TraceWriter
+            with TraceWriter(trace_file, machine) as trace:
+                machine.trace = trace
+                while machine.execute_step():
+                    pass
+                machine.trace = None
+            print(f"Трасса {trace.records} шагов записана в {trace_file}")
         else:
             # Выполнение всей программы
             machine.execute_all()
@@ -0,0 +1,216 @@
+# post_memo.py
+# Ускоренное выполнение машины Поста мемоизацией блоков шагов (в духе
+# Hashlife): результат работы программы в окне ленты вокруг головки
+# зависит только от правила и клеток окна, пока головка из окна не
+# выходит. Блок "правило + окно" -> (шаги, правило выхода, план записи
+# клеток и сдвигов головки) считается один раз и дальше применяется к
+# ленте целиком. Блоки образуют уровни: блок широкого окна собирается из
+# блоков узкого, так что и промахи верхнего уровня обходятся дёшево.
+# Повторяющиеся участки (проходы по однородной ленте, циклы на месте)
+# выполняются по блоку за поиск в кэше.
+import sys
+from collections import OrderedDict
+
+from post_machine import OP_MARK, OP_ERASE, OP_RIGHT, OP_LEFT, OP_JUMP
+
+DEFAULT_RADIUS = 16
+DEFAULT_LEVELS = 3
+LEVEL_FACTOR = 4
+DEFAULT_BLOCK_STEPS = 4096
+DEFAULT_CACHE_SIZE = 1 << 16
+
+
+class MacroStepEngine:
+    # radius - окно блока нижнего уровня: radius клеток по обе стороны от
+    # головки; у каждого следующего уровня окно в LEVEL_FACTOR раз шире,
+    # и его блоки считаются из блоков предыдущего уровня. Прогон идёт
+    # блоками верхнего уровня (levels - число уровней);
+    # max_block_steps - предел шагов одного блока (циклы внутри окна);
+    # max_size - предел записей кэша, лишние вытесняются (LRU)
+    def __init__(self, radius=DEFAULT_RADIUS, levels=DEFAULT_LEVELS,
+                 max_block_steps=DEFAULT_BLOCK_STEPS, max_size=DEFAULT_CACHE_SIZE):
+        if radius < 1 or levels < 1 or max_block_steps < 1 or max_size < 1:
+            raise ValueError("radius, levels, max_block_steps и max_size должны быть положительными")
+        self.radii = [radius * LEVEL_FACTOR ** level for level in range(levels)]
+        self.max_block_steps = max_block_steps
+        self.max_size = max_size
+        # (индекс правила, окно) -> блок; уровень задаётся длиной окна
+        self._cache = OrderedDict()
+        self._code = None  # программа, для которой заполнен кэш
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+        self._code = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    # Блок уровня level из правила i на окне window, из кэша или расчётом
+    def _lookup(self, level, code, i, window):
+        key = (i, window)
+        block = self._cache.get(key)
+        if block is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return block
+        self.misses += 1
+        block = self._block(level, code, i, window)
+        self._cache[key] = block
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return block
+
+    # Расчёт блока: шаги от головки в центре окна до её выхода из окна,
+    # остановки или предела шагов. Вдали от краёв окна шаги делаются
+    # блоками уровня ниже, у краёв и на нижнем уровне - по одному.
+    # Возвращает (шаги, индекс правила выхода, остановлена, крайние
+    # посещённые клетки low/high и клетка выхода относительно начальной,
+    # план), план - пары (сдвиг головки, символ или None): сначала сдвиги
+    # к low и high (лента растёт ровно как при поштучных шагах), затем
+    # записи изменённых клеток, затем сдвиг на клетку выхода
+    def _block(self, level, code, i, window):
+        radius = self.radii[level]
+        sub = self.radii[level - 1] if level else 0
+        limit = self.max_block_steps
+        cells = list(window)
+        width = len(cells)
+        head = low = high = radius
+        steps = 0
+        halted = False
+        while steps < limit:
+            if level and sub <= head < width - sub:
+                block = self._lookup(level - 1, code, i,
+                                     "".join(cells[head - sub:head + sub + 1]))
+                if steps + block[0] <= limit:
+                    block_steps, i, halted, block_low, block_high, block_exit, plan = block
+                    steps += block_steps
+                    position = head
+                    for shift, symbol in plan:
+                        position += shift
+                        if symbol is not None:
+                            cells[position] = symbol
+                    low = min(low, head + block_low)
+                    high = max(high, head + block_high)
+                    head += block_exit
+                    if halted or head < 0 or head >= width:
+                        break
+                    continue
+            condition, op, next_i, op_false, next_false = code[i]
+            if condition is None:
+                halted = True
+                break
+            if cells[head] != condition:
+                op, next_i = op_false, next_false
+            steps += 1
+            if op == OP_RIGHT:
+                head += 1
+            elif op == OP_LEFT:
+                head -= 1
+            elif op == OP_MARK:
+                cells[head] = '1'
+            elif op == OP_ERASE:
+                cells[head] = '0'
+            elif op != OP_JUMP:
+                halted = True
+                break
+            i = next_i
+            if head < low:
+                low = head
+            elif head > high:
+                high = head
+            if head < 0 or head >= width:
+                break
+
+        plan = []
+        position = radius
+        for target in (low, high):
+            if target != position:
+                plan.append((target - position, None))
+                position = target
+        for k in range(width):
+            if cells[k] != window[k]:
+                plan.append((k - position, cells[k]))
+                position = k
+        if head != position:
+            plan.append((head - position, None))
+        return steps, i, halted, low - radius, high - radius, head - radius, tuple(plan)
+
+    # Перенос состояния в машину и прогон эталонным execute_all без
+    # макроопераций (хвост перед пределом шагов, головка вне ленты)
+    @staticmethod
+    def _reference(machine, compiled, i, steps, max_steps):
+        machine.step_count = steps
+        machine.program.current_rule = compiled.numbers[i]
+        return machine.execute_all(fuse=False, max_steps=max_steps)
+
+    # Прогон машины; результат и состояние (лента, step_count, правило)
+    # те же, что у execute_all / цикла по execute_step
+    def run(self, machine, max_steps=None):
+        if machine.halted:
+            return machine._run_result('halt')
+        compiled = machine.program.compile()
+        i = compiled.index.get(machine.program.current_rule)
+        if i is None:
+            machine.halted = True
+            return machine._run_result('halt')
+        if self._code != compiled.code:
+            self._cache.clear()
+            self._code = compiled.code
+
+        code = compiled.code
+        top = len(self.radii) - 1
+        radius = self.radii[top]
+        tape = machine.tape
+        move = tape.move
+        set_current = tape.set_current
+        # Последние max_block_steps шагов до предела - эталонным прогоном
+        tail = self.max_block_steps if max_steps is not None else -1
+        limit = max_steps if max_steps is not None else sys.maxsize
+        steps = machine.step_count
+        while True:
+            if code[i][0] is None:
+                break
+            position = tape.position
+            length = len(tape)
+            if limit - steps <= tail or not 0 <= position < length:
+                target = limit if limit - steps <= tail else steps + 1
+                result = self._reference(machine, compiled, i, steps, target)
+                if machine.halted or machine.step_count >= limit:
+                    return result
+                steps = machine.step_count
+                i = compiled.index[machine.program.current_rule]
+                continue
+
+            start = position - radius
+            window = tape.region(start, position + radius + 1)
+            if start < 0 or position + radius >= length:
+                window = ('0' * max(-start, 0) + window +
+                          '0' * max(position + radius + 1 - length, 0))
+            block_steps, i, halted, _, _, _, plan = self._lookup(top, code, i, window)
+            for shift, symbol in plan:
+                if shift:
+                    move(shift)
+                if symbol is not None:
+                    set_current(symbol)
+            steps += block_steps
+            if halted:
+                break
+
+        machine.step_count = steps
+        machine.program.current_rule = compiled.numbers[i]
+        machine.halted = True
+        return machine._run_result('halt')
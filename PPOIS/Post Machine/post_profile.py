@@ -0,0 +1,142 @@
+import json
+import sys
+
+from post_machine import (Post_machine, OP_MARK, OP_ERASE, OP_RIGHT, OP_LEFT, OP_JUMP)
+
+
+class RuleProfiler:
+    # Профилировщик прогона: сколько раз сработало каждое правило
+    # (отдельно по истинной и ложной ветви), сколько раз лента росла
+    # влево/вправо и её наибольшая длина. Выполняет программу своим
+    # циклом без макроопераций, поэтому обычный execute_all ничего
+    # не платит за профилирование
+    def __init__(self):
+        self.steps = 0
+        self.true_counts = {}   # номер правила -> срабатывания истинной ветви
+        self.false_counts = {}  # номер правила -> срабатывания ложной ветви
+        self.extended_left = 0
+        self.extended_right = 0
+        self.peak_tape_length = 0
+
+    # Прогон машины с подсчётом; результат как у Post_machine.execute_all
+    def run(self, machine, max_steps=None):
+        if machine.halted:
+            return machine._run_result('halt')
+        compiled = machine.program.compile()
+        i = compiled.index.get(machine.program.current_rule)
+        if i is None:
+            machine.halted = True
+            return machine._run_result('halt')
+
+        code = compiled.code
+        true_counts = [0] * len(code)
+        false_counts = [0] * len(code)
+        tape = machine.tape
+        peak = len(tape)
+        steps = 0
+        reason = 'halt'
+        try:
+            while True:
+                if max_steps is not None and machine.step_count + steps >= max_steps:
+                    reason = 'step_limit'
+                    break
+                condition, op, next_i, op_false, next_false = code[i]
+                if condition is None:
+                    break
+                if tape.get_current() == condition:
+                    true_counts[i] += 1
+                else:
+                    false_counts[i] += 1
+                    op, next_i = op_false, next_false
+                steps += 1
+                if op == OP_RIGHT or op == OP_LEFT:
+                    before = len(tape)
+                    if op == OP_RIGHT:
+                        tape.move_right()
+                    else:
+                        tape.move_left()
+                    if len(tape) != before:
+                        if op == OP_RIGHT:
+                            self.extended_right += 1
+                        else:
+                            self.extended_left += 1
+                        peak = max(peak, len(tape))
+                elif op == OP_MARK:
+                    tape.set_current('1')
+                elif op == OP_ERASE:
+                    tape.set_current('0')
+                elif op != OP_JUMP:
+                    break
+                i = next_i
+        finally:
+            machine.step_count += steps
+            machine.program.current_rule = compiled.numbers[i]
+            self.steps += steps
+            self.peak_tape_length = max(self.peak_tape_length, peak, len(tape))
+            for index, number in enumerate(compiled.numbers):
+                if true_counts[index]:
+                    self.true_counts[number] = self.true_counts.get(number, 0) + true_counts[index]
+                if false_counts[index]:
+                    self.false_counts[number] = self.false_counts.get(number, 0) + false_counts[index]
+        if reason == 'halt':
+            machine.halted = True
+        return machine._run_result(reason)
+
+    # Правила по убыванию числа срабатываний: (номер, всего, истина, ложь)
+    def hot_rules(self):
+        numbers = set(self.true_counts) | set(self.false_counts)
+        rows = [(number, self.true_counts.get(number, 0) + self.false_counts.get(number, 0),
+                 self.true_counts.get(number, 0), self.false_counts.get(number, 0))
+                for number in numbers]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows
+
+    # Данные профиля для сохранения в JSON
+    def to_dict(self):
+        return {
+            'steps': self.steps,
+            'rules': [{'rule': number, 'total': total, 'true': true, 'false': false}
+                      for number, total, true, false in self.hot_rules()],
+            'extended_left': self.extended_left,
+            'extended_right': self.extended_right,
+            'peak_tape_length': self.peak_tape_length,
+        }
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    # Текстовый отчёт: горячие правила сверху
+    def report(self):
+        lines = [f"Шагов: {self.steps}"]
+        for number, total, true, false in self.hot_rules():
+            share = 100.0 * total / self.steps if self.steps else 0.0
+            lines.append(f"Правило {number}: {total} ({share:.1f}%), "
+                         f"истина {true}, ложь {false}")
+        lines.append(f"Рост ленты: влево {self.extended_left}, вправо {self.extended_right}")
+        lines.append(f"Наибольшая длина ленты: {self.peak_tape_length}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python post_profile.py <файл> [профиль.json]")
+        sys.exit(1)
+    filename = sys.argv[1]
+    try:
+        machine = Post_machine()
+        machine.load_file(filename)
+        profiler = RuleProfiler()
+        profiler.run(machine)
+        print(profiler.report())
+        if len(sys.argv) > 2:
+            profiler.dump(sys.argv[2])
+    except FileNotFoundError:
+        print(f"Файл {filename} не найден")
+
+
+if __name__ == "__main__":
+    main()
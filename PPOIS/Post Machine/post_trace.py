@@ -0,0 +1,152 @@
+import json
+import struct
+import sys
+
+from post_machine import (Tape, Post_machine, decode_action,
+                          OP_MARK, OP_ERASE, OP_RIGHT, OP_LEFT, OP_STOP, OP_INVALID)
+
+# Формат трассы: MAGIC, длина заголовка (uint32), заголовок JSON с начальным
+# состоянием машины, затем записи фиксированного размера на каждый шаг:
+# правило, код операции, следующее правило, позиция головки после шага,
+# записанный символ (0 - клетка не менялась). Если машина остановилась
+# на переходе к отсутствующему правилу (шага нет), трасса кончается
+# записью-маркером с кодом END
+# Номера правил - 64-битные: парсер принимает любые целые номера
+MAGIC = b'PMTRACE2'
+RECORD = struct.Struct('<qBqqB')
+HEADER = struct.Struct('<I')
+END = 0xFF
+BLOCK_RECORDS = 4096  # записей за одно чтение при разборе трассы
+
+
+class TraceWriter:
+    # Буферизованная запись дельт шагов в двоичный файл.
+    # Подключается к машине через machine.trace = TraceWriter(...)
+    def __init__(self, path, machine, buffer_records=4096):
+        self.file = open(path, 'wb')
+        header = json.dumps({
+            'tape': machine.tape.region(0, len(machine.tape)),
+            'position': machine.tape.position,
+            'rule': machine.program.current_rule,
+            'step': machine.step_count,
+        }, ensure_ascii=False).encode('utf-8')
+        self.file.write(MAGIC + HEADER.pack(len(header)) + header)
+        self.machine = machine
+        self.decoded = {}  # действие -> (код операции, записанный символ)
+        self.buffer = bytearray()
+        self.flush_size = buffer_records * RECORD.size
+        self.records = 0
+
+    # Запись шага: правило, действие, следующее правило, позиция после шага
+    def record(self, rule, action, next_rule, position):
+        decoded = self.decoded.get(action)
+        if decoded is None:
+            op = decode_action(action)[0]
+            cell = {OP_MARK: ord('1'), OP_ERASE: ord('0')}.get(op, 0)
+            decoded = self.decoded[action] = (op, cell)
+        self.buffer += RECORD.pack(rule, decoded[0], next_rule, position, decoded[1])
+        self.records += 1
+        if len(self.buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    # Закрытие трассы; остановка без шага (правила нет) отмечается маркером
+    def close(self):
+        if not self.file.closed:
+            machine = self.machine
+            if machine.halted and machine.program.get_rule(machine.program.current_rule) is None:
+                rule = machine.program.current_rule
+                self.buffer += RECORD.pack(rule, END, rule, machine.tape.position, 0)
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Чтение трассы: (заголовок, итератор записей). Записи читаются блоками
+# по BLOCK_RECORDS, так что трасса целиком в память не загружается, а
+# прерванный перебор дальше файл не читает
+def read_trace(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: не файл трассы")
+        (size,) = HEADER.unpack(f.read(HEADER.size))
+        header = json.loads(f.read(size).decode('utf-8'))
+        offset = f.tell()
+    return header, _iter_records(path, offset)
+
+
+def _iter_records(path, offset):
+    block = BLOCK_RECORDS * RECORD.size
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            data = f.read(block)
+            # неполная запись в конце файла (оборванная трасса) отбрасывается
+            data = data[:len(data) - len(data) % RECORD.size]
+            if not data:
+                return
+            yield from RECORD.iter_unpack(data)
+
+
+# Восстановление машины на шаге step (по умолчанию - на последнем).
+# Правил в трассе нет, поэтому программа у машины пустая
+def replay(path, step=None):
+    header, records = read_trace(path)
+    machine = Post_machine()
+    machine.tape = Tape(header['tape'])
+    machine.tape.position = header['position']
+    machine.program.current_rule = header['rule']
+    machine.step_count = header['step']
+    try:
+        _replay_records(machine, records, step)
+    finally:
+        records.close()
+    return machine
+
+
+def _replay_records(machine, records, step):
+    tape = machine.tape
+    for rule, op, next_rule, position, cell in records:
+        if op == END:
+            # Остановка на отсутствующем правиле - после последнего шага
+            if step is None or machine.step_count < step:
+                machine.halted = True
+            break
+        if step is not None and machine.step_count >= step:
+            break
+        if op == OP_RIGHT:
+            tape.move_right()
+        elif op == OP_LEFT:
+            tape.move_left()
+        elif cell:
+            tape.set_current(chr(cell))
+        machine.step_count += 1
+        machine.program.current_rule = next_rule
+        machine.halted = op in (OP_STOP, OP_INVALID)
+        if tape.position != position:
+            raise ValueError(f"Трасса повреждена на шаге {machine.step_count}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python post_trace.py <трасса> [шаг]")
+        sys.exit(1)
+    step = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    try:
+        print(replay(sys.argv[1], step))
+    except FileNotFoundError:
+        print(f"Файл {sys.argv[1]} не найден")
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+
+
+if __name__ == "__main__":
+    main()
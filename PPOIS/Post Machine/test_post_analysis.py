@@ -0,0 +1,138 @@
+import unittest
+import io
+import json
+import os
+import random
+import tempfile
+from post_machine import Post_machine, Program
+from post_analysis import analyze
+
+
+def make_program(text, start=1):
+    program = Program()
+    program.load_from_stream(io.StringIO(text))
+    program.current_rule = start
+    return program
+
+
+def run(program, tape, max_steps=3000):
+    machine = Post_machine()
+    machine.load_tape_from_stream(io.StringIO(tape + "\n"))
+    machine.program = program
+    for _ in range(max_steps):
+        if not machine.execute_step():
+            break
+    return machine
+
+
+class TestProgramAnalysis(unittest.TestCase):
+
+    def test_graph_and_reachability(self):
+        """Тест графа переходов и поиска недостижимых правил"""
+        program = make_program("1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> V; 0 -> !\n"
+                               "5: 1 -> ?6; 0 -> Q\n6: 1 -> X; 0 -> ?5\n")
+        analysis = analyze(program)
+        self.assertEqual(analysis.graph[1], (2, 3))
+        self.assertEqual(analysis.graph[3], (4, None))
+        self.assertEqual(analysis.reachable, {1, 2, 3})
+        self.assertEqual(analysis.unreachable, [5, 6])
+        self.assertEqual(analysis.missing_targets, {3: [4], 6: [7]})
+        self.assertEqual(analysis.invalid_actions, {5: ['Q']})
+        self.assertTrue(analysis.can_halt)
+        self.assertEqual(analysis.spin_loops, {})
+
+    def test_spin_loops(self):
+        """Тест доказательства вечных холостых циклов"""
+        analysis = analyze(make_program("1: 1 -> ?1; 0 -> ?1\n"))
+        self.assertEqual(analysis.spin_loops, {1: [True, False]})
+        self.assertEqual(analysis.cycles, [[1]])
+        self.assertFalse(analysis.can_halt)
+        self.assertIn("вечный холостой цикл при любой клетке", analysis.report())
+        self.assertIn("не может остановиться", analysis.report())
+
+        # Из 1 по метке - переходы 2 -> 3 -> 2 при известной клетке; после
+        # "клетка не 0" исход правила 2 не известен (на ленте не только 0 и 1)
+        analysis = analyze(make_program("1: 1 -> ?2; 0 -> !\n2: 1 -> ?3; 0 -> ?4\n3: 0 -> ?4; 1 -> ?2\n"
+                                        "4: 1 -> !; 0 -> !\n"))
+        self.assertEqual(analysis.spin_loops, {1: [True], 2: [True]})
+        self.assertEqual(analysis.cycles, [[2, 3]])
+        self.assertTrue(analysis.can_halt)
+
+        # После V клетка известна, после R - нет
+        analysis = analyze(make_program("1: 1 -> V; 0 -> V\n2: 1 -> ?2; 0 -> ?3\n3: 1 -> !; 0 -> !\n"))
+        self.assertEqual(analysis.spin_loops, {1: [True, False], 2: [True]})
+        analysis = analyze(make_program("1: 1 -> R; 0 -> R\n2: 1 -> ?2; 0 -> ?3\n3: 1 -> !; 0 -> !\n"))
+        self.assertEqual(analysis.spin_loops, {2: [True]})
+
+    def test_never_halts(self):
+        """Тест программы без достижимых остановок"""
+        analysis = analyze(make_program("1: 1 -> R; 0 -> V\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> !; 0 -> !\n"))
+        self.assertFalse(analysis.can_halt)
+        self.assertEqual(analysis.unreachable, [3])
+        self.assertTrue(analyze(make_program("1: 1 -> ?1; 0 -> ?1\n", start=7)).can_halt)
+
+    def test_threading(self):
+        """Тест сквозных переходов и удаления мёртвых правил"""
+        text = ("1: 1 -> X; 0 -> ?10\n2: 1 -> ?20; 0 -> ?20\n3: 1 -> R; 0 -> R\n4: 1 -> ?1; 0 -> ?30\n"
+                "10: 1 -> ?11; 0 -> ?12\n11: 1 -> !; 0 -> !\n12: 1 -> ?11; 0 -> ?2\n"
+                "20: 1 -> ?3; 0 -> ?3\n30: 1 -> ?31; 0 -> ?31\n99: 1 -> !; 0 -> !\n")
+        program = make_program(text)
+        analysis = analyze(program)
+        optimized = analysis.optimized()
+        self.assertEqual(optimized.rules[1].action_false, "?3")
+        self.assertEqual((optimized.rules[2].action_true, optimized.rules[2].action_false), ("?3", "?3"))
+        self.assertEqual(optimized.rules[4].action_false, "?31")
+        self.assertEqual(sorted(optimized.rules), [1, 2, 3, 4])
+        self.assertEqual(analysis.threaded, 6)
+        self.assertEqual(program.rules[1].action_false, "?10")
+
+        original = run(make_program(text), "1101")
+        fast = run(optimized, "1101")
+        self.assertEqual(fast.tape, original.tape)
+        self.assertEqual((fast.halted, fast.program.current_rule),
+                         (original.halted, original.program.current_rule))
+        self.assertLess(fast.step_count, original.step_count)
+
+    def test_optimized_matches_original_on_random_programs(self):
+        """Тест, что оптимизированная программа даёт тот же результат"""
+        rng = random.Random(4)
+        actions = ['V', 'X', 'R', 'L', '!'] + ['?{}'] * 8
+        checked = 0
+        while checked < 300:
+            size = rng.randint(1, 8)
+            text = ""
+            for number in range(1, size + 1):
+                true, false = (rng.choice(actions).format(rng.randint(1, size + 1)) for _ in range(2))
+                text += f"{number}: {rng.choice('01')} -> {true}; 0 -> {false}\n"
+            tape = "".join(rng.choice("01") for _ in range(rng.randint(1, 20)))
+            original = run(make_program(text), tape)
+            analysis = analyze(make_program(text))
+            if not original.halted:
+                continue
+            self.assertTrue(analysis.can_halt, text)
+            fast = run(analysis.optimized(), tape)
+            self.assertTrue(fast.halted, text)
+            self.assertEqual(fast.tape, original.tape, text)
+            self.assertEqual(fast.program.current_rule, original.program.current_rule, text)
+            self.assertLessEqual(fast.step_count, original.step_count, text)
+            checked += 1
+
+    def test_report_and_dump(self):
+        """Тест отчёта и сохранения анализа в JSON"""
+        analysis = analyze(make_program("1: 1 -> ?5; 0 -> ?3\n3: 1 -> Z; 0 -> !\n4: 1 -> !; 0 -> !\n"))
+        report = analysis.report()
+        self.assertTrue(report.startswith("Правил: 3, начальное: 1, достижимо: 2"))
+        self.assertIn("Недостижимые правила: 4", report)
+        self.assertIn("Правило 1: переход на отсутствующее правило 5 (остановка)", report)
+        self.assertIn("Правило 3: неизвестное действие Z", report)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analysis.json")
+            analysis.dump(path)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data, json.loads(json.dumps(analysis.to_dict())))
+        self.assertEqual(data['unreachable'], [4])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
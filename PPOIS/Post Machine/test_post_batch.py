@@ -0,0 +1,96 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from post_batch import collect_files, run_file, run_batch, main
+
+
+class TestPostBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.files = []
+        programs = {
+            "a.txt": "101\n1: 1 -> X; 0 -> V\n2: 1 -> R; 0 -> L\n3: 1 -> ?1; 0 -> !\n",
+            "b.txt": "1\n1: 1 -> X; 0 -> !\n",
+            "c.txt": "101\n1: 1 -> X; 0 -> V\n2: 0 -> ?1; 1 -> ?1\n",
+            "d.txt": "0\n1: 0 -> R; 1 -> R\n2: 0 -> ?1; 0 -> ?1\n",
+        }
+        for name, text in programs.items():
+            path = os.path.join(self.dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_files(self):
+        """Тест сбора файлов по каталогу и шаблону"""
+        self.assertEqual(collect_files([self.dir]), self.files)
+        self.assertEqual(collect_files([os.path.join(self.dir, "[ab].txt")]), self.files[:2])
+
+    def test_run_file(self):
+        """Тест прогона одного файла"""
+        result = run_file(self.files[0])
+        self.assertEqual(result['tape'], "0001")
+        self.assertEqual(result['position'], 0)
+        self.assertEqual(result['steps'], 3)
+        self.assertTrue(result['halted'])
+        self.assertIn('wall_time', result)
+
+    def test_run_file_limits(self):
+        """Тест ограничений для бесконечных программ"""
+        self.assertEqual(run_file(self.files[2])['reason'], 'cycle')
+        result = run_file(self.files[3], max_steps=500)
+        self.assertEqual(result['reason'], 'step_limit')
+        self.assertFalse(result['halted'])
+
+    def test_run_file_diagnostics(self):
+        """Тест сообщений парсера в результате"""
+        path = os.path.join(self.dir, "e.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("1\n1: 1 -> X; 0 -> V\n2: 0 -> ?5; 1 -> !\n")
+        result = run_file(path)
+        self.assertEqual(len(result['diagnostics']), 1)
+        self.assertTrue(result['diagnostics'][0].startswith("строка 3,"))
+
+    def test_run_file_missing(self):
+        """Тест отсутствующего файла"""
+        result = run_file(os.path.join(self.dir, "missing.txt"))
+        self.assertIn('error', result)
+
+    def test_bad_file_in_batch(self):
+        """Тест файла с ошибкой среди правильных файлов"""
+        bad = os.path.join(self.dir, "bb.txt")
+        with open(bad, 'w', encoding='utf-8') as f:
+            f.write("1Ж1\n1: 1 -> X; 0 -> !\n")
+        files = collect_files([self.dir])
+        results = list(run_batch(files, max_steps=1000, workers=2))
+        self.assertEqual([r['file'] for r in results], files)
+        errors = [r for r in results if 'error' in r]
+        self.assertEqual([r['file'] for r in errors], [bad])
+        self.assertTrue(errors[0]['error'].startswith("UnicodeEncodeError"))
+        self.assertEqual(sum('reason' in r for r in results), 4)
+
+    def test_run_batch_order(self):
+        """Тест порядка результатов в пуле процессов"""
+        results = list(run_batch(self.files, max_steps=1000, workers=2))
+        self.assertEqual([r['file'] for r in results], self.files)
+        self.assertEqual(results[1]['steps'], 1)
+
+    def test_main_json_lines(self):
+        """Тест вывода JSON lines"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = main([self.dir, '--max-steps', '1000', '--workers', '2'])
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,7 +1,15 @@
 import unittest
 import sys
 import io
-from post_machine import Tape, Rule, Program, Post_machine
+import random
+import os
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+import post_machine
+from post_machine import (Diagnostic, ProgramSyntaxError, parse_program, parse_program_cached,
+                          Tape, CompactTape, RunLengthTape, TapeViewport, Rule, Program, Post_machine, CycleDetector,
+                          decode_action, OP_JUMP, OP_INVALID, OP_MARK, OP_RUN, OP_SCAN)
 
 class TestTape(unittest.TestCase):
     
@@ -97,6 +105,355 @@ class TestTape(unittest.TestCase):
         tape.position = 1
         self.assertEqual(str(tape), " 1 [0] 1 ")
 
+    def test_long_walk_left(self):
+        """Тест длинного движения влево - лента растёт без сдвига клеток"""
+        tape = Tape("1")
+        for _ in range(100000):
+            tape.move_left()
+        self.assertEqual(tape.position, 0)
+        self.assertEqual(len(tape), 100001)
+        self.assertEqual(tape.cells[-1], '1')
+        
+        tape.set_current('1')
+        self.assertEqual(tape.cells[0], '1')
+    
+    def test_position_after_left_growth(self):
+        """Тест позиции после роста ленты в обе стороны"""
+        tape = Tape("10")
+        tape.move_left()
+        tape.move_left()
+        tape.set_current('1')
+        self.assertEqual(str(tape), "[1] 0  1  0 ")
+        
+        tape.position = 2
+        self.assertEqual(tape.get_current(), '1')
+        tape.move_right()
+        tape.move_right()
+        tape.set_current('1')
+        self.assertEqual(tape.cells, ['1', '0', '1', '0', '1'])
+
+    def test_region_and_count_marks(self):
+        """Тест участков ленты и подсчёта меток"""
+        tape = Tape("0110")
+        tape.move_left()
+        tape.set_current('1')
+        self.assertEqual(tape.region(0, 5), "10110")
+        self.assertEqual(tape.region(1, 3), "01")
+        self.assertEqual(tape.region(3, 100), "10")
+        self.assertEqual(tape.region(4, 2), "")
+        self.assertEqual(tape.count_marks(), 3)
+
+    
+    def test_move(self):
+        """Тест сдвига головки сразу на несколько клеток"""
+        tape = Tape("101")
+        tape.move(5)
+        self.assertEqual(tape.position, 5)
+        self.assertEqual(len(tape), 6)
+        tape.move(-8)
+        self.assertEqual(tape.position, 0)
+        self.assertEqual(tape.cells, list("000101000"))
+    
+    def test_scan(self):
+        """Тест поиска конца серии клеток"""
+        for tape_class in (Tape, CompactTape):
+            tape = tape_class("0111110")
+            tape.position = 1
+            self.assertEqual(tape.scan(1, '1', True), 5)
+            self.assertEqual(tape.position, 6)
+            
+            tape.move_left()
+            self.assertEqual(tape.scan(-1, '0', False), 5)
+            self.assertEqual(tape.position, 0)
+            
+            # Серия доходит до края - лента растёт на одну клетку
+            tape = tape_class("111")
+            self.assertEqual(tape.scan(-1, '1', True), 1)
+            self.assertEqual(tape.cells, list("0111"))
+            tape.move_right()
+            self.assertEqual(tape.scan(1, '0', False), 3)
+            self.assertEqual(tape.cells, list("01110"))
+            self.assertEqual(tape.position, 4)
+    
+    def test_scan_across_origin(self):
+        """Тест поиска через начало ленты в обе стороны"""
+        tape = Tape("1" * 100)
+        tape.move(-40)
+        tape.set_current('0')
+        tape.move(1)
+        for _ in range(39):
+            tape.set_current('1')
+            tape.move(1)
+        tape.move(-39)
+        self.assertEqual(tape.scan(1, '1', True), 139)
+        self.assertEqual(tape.position, 140)
+        tape.move_left()
+        self.assertEqual(tape.scan(-1, '0', False), 139)
+        self.assertEqual(tape.position, 0)
+    
+    def test_cells_write_through(self):
+        """Тест изменения ленты через tape.cells на месте"""
+        for factory in (Tape, CompactTape, RunLengthTape):
+            with self.subTest(factory=factory.__name__):
+                tape = factory("101")
+                tape.move_left()
+                tape.move_right()
+                cells = tape.cells
+                cells[0] = '1'
+                cells[-1] = '0'
+                self.assertEqual(tape.cells, ['1', '1', '0', '0'])
+                self.assertEqual(tape.position, 1)
+                self.assertEqual(tape.get_current(), '1')
+                tape.cells.append('1')
+                self.assertEqual(len(tape), 5)
+                self.assertEqual(tape.cells[4], '1')
+                tape.cells.insert(0, '1')
+                del tape.cells[1]
+                self.assertEqual(tape.cells, list("11001"))
+                self.assertEqual(tape.cells[1:3], ['1', '0'])
+                self.assertEqual(tape.position, 1)
+                with self.assertRaises(IndexError):
+                    tape.cells[5] = '1'
+
+class TestCompactTape(unittest.TestCase):
+    
+    def test_same_behaviour_as_tape(self):
+        """Тест, что компактная лента ведёт себя как обычная"""
+        tape = Tape("101")
+        compact = CompactTape("101")
+        for tp in (tape, compact):
+            tp.move_left()
+            tp.set_current('1')
+            tp.position = 6
+            tp.set_current('1')
+            tp.move_right()
+        
+        self.assertEqual(compact.cells, tape.cells)
+        self.assertEqual(str(compact), str(tape))
+        self.assertEqual(compact.get_current(), '0')
+        self.assertEqual(compact, tape)
+    
+    def test_storage_is_bytearray(self):
+        """Тест хранения клеток в bytearray"""
+        tape = CompactTape("1101")
+        self.assertIsInstance(tape._right, bytearray)
+        self.assertEqual(tape.get_current(), '1')
+        self.assertEqual(tape.count_marks(), 3)
+    
+    def test_load_from_stream(self):
+        """Тест загрузки компактной ленты из потока"""
+        tape = CompactTape()
+        tape.load_from_stream(io.StringIO("0011\n"))
+        self.assertEqual(tape.region(0, len(tape)), "0011")
+        
+        tape.load_from_stream(io.StringIO("\n"))
+        self.assertEqual(tape.cells, ['0'])
+    
+    def test_compare(self):
+        """Тест сравнения лент"""
+        self.assertEqual(CompactTape("101"), CompactTape("101"))
+        self.assertNotEqual(CompactTape("101"), CompactTape("100"))
+        
+        moved = CompactTape("101")
+        moved.move_right()
+        self.assertNotEqual(moved, CompactTape("101"))
+    
+    def test_compact_machine(self):
+        """Тест машины с компактной лентой"""
+        machine = Post_machine(compact=True)
+        self.assertIsInstance(machine.tape, CompactTape)
+        
+        machine.load_tape_from_stream(io.StringIO("101\n"))
+        machine.load_program_from_stream(io.StringIO("1: 1 -> X; 0 -> V\n2: 1 -> R; 0 -> L\n3: 1 -> ?1; 0 -> !\n"))
+        machine.execute_all()
+        self.assertEqual(str(machine.tape), "[0] 0  0  1 ")
+
+
+class TestRunLengthTape(unittest.TestCase):
+    
+    def test_runs(self):
+        """Тест хранения ленты сериями"""
+        tape = RunLengthTape("1110011110")
+        self.assertEqual(tape.runs(), [('1', 3), ('0', 2), ('1', 4), ('0', 1)])
+        self.assertEqual(len(tape), 10)
+        self.assertEqual(tape.count_marks(), 7)
+        self.assertEqual(tape.region(2, 7), "10011")
+        self.assertEqual(RunLengthTape().runs(), [('0', 1)])
+    
+    def test_set_current_splits_and_merges(self):
+        """Тест деления и слияния серий при записи"""
+        tape = RunLengthTape("11111")
+        tape.position = 2
+        tape.set_current('0')
+        self.assertEqual(tape.runs(), [('1', 2), ('0', 1), ('1', 2)])
+        tape.set_current('1')
+        self.assertEqual(tape.runs(), [('1', 5)])
+        tape.position = 0
+        tape.set_current('0')
+        tape.position = 4
+        tape.set_current('0')
+        self.assertEqual(tape.runs(), [('0', 1), ('1', 3), ('0', 1)])
+        tape.position = 1
+        tape.set_current('0')
+        self.assertEqual(tape.runs(), [('0', 2), ('1', 2), ('0', 1)])
+        self.assertEqual(tape.get_current(), '0')
+        tape.position = 3
+        tape.set_current('0')
+        self.assertEqual(tape.runs(), [('0', 2), ('1', 1), ('0', 2)])
+        tape.position = 2
+        tape.set_current('0')
+        self.assertEqual(tape.runs(), [('0', 5)])
+    
+    def test_same_behaviour_as_tape(self):
+        """Тест совпадения со списочной лентой на случайных операциях"""
+        rng = random.Random(21)
+        for _ in range(30):
+            data = "".join(rng.choice("0011") for _ in range(rng.randint(1, 20)))
+            tape = Tape(data)
+            rle = RunLengthTape(data)
+            for _ in range(300):
+                op = rng.randrange(7)
+                value = rng.choice('01')
+                shift = rng.randint(-6, 6)
+                step = rng.choice((1, -1))
+                while_equal = rng.random() < 0.5
+                target = rng.randint(-3, len(tape) + 3)
+                for tp in (tape, rle):
+                    if op == 0:
+                        tp.move_left()
+                    elif op == 1:
+                        tp.move_right()
+                    elif op == 2:
+                        tp.set_current(value)
+                    elif op == 3:
+                        tp.move(shift)
+                    elif op == 4:
+                        tp.scan(step, value, while_equal)
+                    elif op == 5:
+                        tp.position = target
+                        tp.set_current('1')
+                    else:
+                        tp.position = min(max(target, 0), len(tp) - 1)
+                self.assertEqual(rle.cells, tape.cells)
+                self.assertEqual(rle.position, tape.position)
+                self.assertEqual(rle.get_current(), tape.get_current())
+                self.assertEqual(rle, tape)
+            self.assertEqual(rle.count_marks(), tape.count_marks())
+            self.assertEqual(str(rle), str(tape))
+    
+    def test_scan(self):
+        """Тест прохода серий целиком"""
+        tape = RunLengthTape("0111110")
+        tape.position = 1
+        self.assertEqual(tape.run_length(1), 5)
+        self.assertEqual(tape.run_length(-1), 1)
+        self.assertEqual(tape.scan(1, '1', True), 5)
+        self.assertEqual(tape.position, 6)
+        tape = RunLengthTape("111")
+        self.assertEqual(tape.scan(-1, '1', True), 1)
+        self.assertEqual(tape.cells, list("0111"))
+        tape.move_right()
+        self.assertEqual(tape.scan(1, '0', False), 3)
+        self.assertEqual(tape.cells, list("01110"))
+    
+    def test_huge_numbers(self):
+        """Тест ленты с числами в миллиарды клеток"""
+        tape = RunLengthTape.from_runs([('1', 3 * 10 ** 9), ('0', 1), ('1', 2 * 10 ** 9)])
+        self.assertEqual(len(tape), 5 * 10 ** 9 + 1)
+        self.assertEqual(tape.scan(1, '1', True), 3 * 10 ** 9)
+        tape.set_current('1')
+        self.assertEqual(tape.runs(), [('1', 5 * 10 ** 9 + 1)])
+        tape.move(-10)
+        self.assertEqual(tape.region(tape.position, tape.position + 3), "111")
+        self.assertEqual(tape.count_marks(), 5 * 10 ** 9 + 1)
+    
+    def test_machine_and_checkpoint(self):
+        """Тест машины с лентой из серий и контрольной точки"""
+        program = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n4: 1 -> ?3; 0 -> !\n"
+        machine = Post_machine(tape_factory=RunLengthTape)
+        machine.load_tape_from_stream(io.StringIO("1" * 1000 + "\n"))
+        machine.load_program_from_stream(io.StringIO(program))
+        reference = Post_machine()
+        reference.load_tape_from_stream(io.StringIO("1" * 1000 + "\n"))
+        reference.load_program_from_stream(io.StringIO(program))
+        machine.execute_all()
+        reference.execute_all(fuse=False)
+        self.assertEqual(machine.get_state(), reference.get_state())
+        self.assertEqual(len(machine.tape.runs()), 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.ckpt")
+            machine.save_checkpoint(path)
+            restored = Post_machine(tape_factory=RunLengthTape)
+            restored.load_checkpoint(path)
+        self.assertIsInstance(restored.tape, RunLengthTape)
+        self.assertEqual(restored.tape, machine.tape)
+
+class TestTapeViewport(unittest.TestCase):
+    
+    def test_render_region(self):
+        """Тест отрисовки участка ленты"""
+        tape = Tape("10110")
+        tape.position = 2
+        self.assertEqual(tape.render(), " 1  0 [1] 1  0 ")
+        self.assertEqual(tape.render(1, 4), " 0 [1] 1 ")
+        self.assertEqual(tape.render(3, 10), " 1  0 ")
+        self.assertEqual(tape.render(4, 2), "")
+    
+    def test_short_tape_is_full(self):
+        """Тест, что короткая лента показывается целиком"""
+        tape = Tape("101")
+        tape.position = 1
+        self.assertEqual(TapeViewport().render(tape), str(tape))
+    
+    def test_elision(self):
+        """Тест окна вокруг головки со счётчиками скрытых клеток"""
+        tape = CompactTape("1" * 1000)
+        tape.position = 500
+        text = TapeViewport(radius=2).render(tape)
+        self.assertEqual(text, "...(498)  1  1 [1] 1  1  (497)...")
+        tape.position = 0
+        self.assertEqual(TapeViewport(radius=2).render(tape), "[1] 1  1  1  1  (995)...")
+        tape.position = 999
+        self.assertEqual(TapeViewport(radius=2).render(tape), "...(995)  1  1  1  1 [1]")
+    
+    def test_incremental_updates(self):
+        """Тест совпадения кэшированной отрисовки с полной"""
+        rng = random.Random(8)
+        for tape_class in (Tape, CompactTape, RunLengthTape):
+            tape = tape_class("".join(rng.choice("01") for _ in range(200)))
+            tape.position = 100
+            viewport = TapeViewport(radius=5)
+            for _ in range(500):
+                op = rng.randrange(4)
+                if op == 0:
+                    tape.move_left()
+                elif op == 1:
+                    tape.move_right()
+                elif op == 2:
+                    tape.set_current(rng.choice("01"))
+                else:
+                    tape.move(rng.randint(-20, 20))
+                text = viewport.render(tape)
+                start = viewport._start
+                stop = min(start + 11, len(tape))
+                expected = tape.render(start, stop)
+                if start > 0:
+                    expected = f"...({start}) " + expected
+                if stop < len(tape):
+                    expected += f" ({len(tape) - stop})..."
+                self.assertEqual(text, expected)
+                self.assertTrue(start <= tape.position < stop)
+    
+    def test_machine_str_uses_viewport(self):
+        """Тест вывода состояния машины с окном ленты"""
+        machine = Post_machine(compact=True)
+        machine.load_tape_from_stream(io.StringIO("1" * 100000 + "\n"))
+        machine.viewport = TapeViewport(radius=1)
+        self.assertEqual(str(machine),
+                         "Шаг: 0, Правило: 1, Лента: [1] 1  1  (99997)..., Остановлена: False")
+        self.assertEqual(len(machine.describe(full=True)),
+                         len(str(machine)) - len(" (99997)...") + 3 * 99997)
+        self.assertEqual(machine.get_state()['tape'], str(machine.tape))
 
 class TestRule(unittest.TestCase):
     
@@ -209,6 +566,81 @@ class TestProgram(unittest.TestCase):
         program.load_from_stream(stream)
         self.assertEqual(len(program.rules), 0)
     
+    def test_load_from_stream_no_spaces_and_comments(self):
+        """Тест загрузки без пробелов и с комментарием в конце строки"""
+        program = Program()
+        program.load_from_stream(io.StringIO("1:1->X;0->?2  # стереть\n2: 0 -> !; !0 -> !\n"))
+        self.assertEqual(program.rules[1].action_false, '?2')
+        self.assertEqual(program.diagnostics, [])
+    
+    def test_diagnostics_syntax_errors(self):
+        """Тест сообщений об ошибках синтаксиса с местом ошибки"""
+        program = Program()
+        program.load_from_stream(io.StringIO("1: 1 -> X\nx: 1 -> X; 0 -> V\n3: 1 X; 0 -> V\n4: 1 -> X; 0 -> V V\n"))
+        self.assertEqual(program.rules, {})
+        self.assertEqual(program.diagnostics, [
+            Diagnostic(1, 10, Diagnostic.ERROR, "ожидалось ';', а строка закончилась"),
+            Diagnostic(2, 1, Diagnostic.ERROR, "номер правила 'x' не целое число"),
+            Diagnostic(3, 6, Diagnostic.ERROR, "ожидалось '->', найдено 'X'"),
+            Diagnostic(4, 19, Diagnostic.ERROR, "лишний текст 'V' после правила"),
+        ])
+        self.assertEqual(str(program.diagnostics[2]),
+                         "строка 3, столбец 6: ошибка: ожидалось '->', найдено 'X'")
+    
+    def test_diagnostics_warnings(self):
+        """Тест предупреждений: повтор номера, переход в никуда, неизвестное действие"""
+        rules, diagnostics = parse_program(
+            "1: 1 -> X; 0 -> ?7\n1: 1 -> R; 1 -> V\n2: 0 -> Z; 1 -> !\n", first_line=2)
+        self.assertEqual([rule[0] for rule in rules], [1, 1, 2])
+        self.assertEqual([(d.line, d.column, d.severity) for d in diagnostics], [
+            (2, 17, Diagnostic.WARNING),
+            (3, 1, Diagnostic.WARNING),
+            (3, 12, Diagnostic.WARNING),
+            (4, 9, Diagnostic.WARNING),
+        ])
+        self.assertIn("переход на несуществующее правило 7", diagnostics[0].message)
+        self.assertIn("неизвестное действие 'Z'", diagnostics[3].message)
+    
+    def test_strict_mode(self):
+        """Тест строгого режима загрузки"""
+        program = Program()
+        with self.assertRaises(ProgramSyntaxError) as context:
+            program.load_from_stream(io.StringIO("1: 1 -> X\n"), strict=True)
+        self.assertEqual(len(context.exception.diagnostics), 1)
+        self.assertEqual(program.rules, {})
+    
+    def test_parse_cache(self):
+        """Тест кэша разобранных программ"""
+        text = "1: 1 -> X; 0 -> V\n"
+        self.assertIs(parse_program_cached(text), parse_program_cached(text))
+        
+        first, second = Program(), Program()
+        first.load_from_stream(io.StringIO(text))
+        second.load_from_stream(io.StringIO(text))
+        self.assertIsNot(first.rules[1], second.rules[1])
+    
+    def test_decode_action(self):
+        """Тест разбора действий"""
+        self.assertEqual(decode_action('V'), (OP_MARK, None))
+        self.assertEqual(decode_action('?12'), (OP_JUMP, 12))
+        self.assertEqual(decode_action('7'), (OP_JUMP, 7))
+        self.assertEqual(decode_action('?'), (OP_INVALID, None))
+        self.assertEqual(decode_action('invalid'), (OP_INVALID, None))
+    
+    def test_compile(self):
+        """Тест компиляции программы в таблицу команд"""
+        program = Program()
+        program.add_rule(Rule(1, '1', 'R', '?5'))
+        program.add_rule(Rule(2, '1', '!', '?1'))
+        compiled = program.compile()
+        
+        self.assertEqual(compiled.numbers[:2], [1, 2])
+        condition, op_true, next_true, op_false, next_false = compiled.code[0]
+        self.assertEqual(compiled.numbers[next_true], 2)
+        self.assertEqual(op_false, OP_JUMP)
+        self.assertEqual(compiled.numbers[next_false], 5)
+        self.assertIsNone(compiled.code[next_false][0])
+    
     def test_str_representation(self):
         """Тест строкового представления программы"""
         program = Program()
@@ -231,6 +663,14 @@ class TestPostMachine(unittest.TestCase):
         self.assertFalse(machine.halted)
         self.assertEqual(machine.step_count, 0)
     
+    def test_tape_factory(self):
+        """Тест подключения другого бэкенда ленты"""
+        class MyTape(Tape):
+            pass
+        
+        machine = Post_machine(tape_factory=MyTape)
+        self.assertIsInstance(machine.tape, MyTape)
+    
     def test_load_tape_from_stream(self):
         """Тест загрузки ленты из потока"""
         machine = Post_machine()
@@ -362,6 +802,202 @@ class TestPostMachine(unittest.TestCase):
         self.assertEqual(machine.tape.get_current(), '0')
         self.assertEqual(machine.step_count, 2)
     
+    def test_execute_all_matches_execute_step(self):
+        """Тест совпадения execute_all с пошаговым выполнением"""
+        programs = [
+            "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n4: 1 -> ?3; 0 -> !\n",
+            "1: 1 -> X; 0 -> V\n2: 1 -> R; 0 -> L\n3: 1 -> ?1; 0 -> !\n",
+            "1: 1 -> L; 0 -> V\n2: 1 -> ?9; 0 -> ?1\n",
+            "1: 0 -> R; 1 -> bad\n",
+            "1: 1 -> R; 0 -> V\n",
+        ]
+        for text in programs:
+            for tape_data in ("1111011", "0", "10"):
+                machines = []
+                for _ in range(2):
+                    machine = Post_machine()
+                    machine.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+                    machine.load_program_from_stream(io.StringIO(text))
+                    machines.append(machine)
+                reference, fast = machines
+                while reference.execute_step():
+                    pass
+                fast.execute_all()
+                self.assertEqual(fast.get_state(), reference.get_state())
+    
+    def test_fuse(self):
+        """Тест слияния циклов поиска и цепочек сдвигов"""
+        program = Program()
+        program.add_rule(Rule(1, '1', 'R', '?3'))
+        program.add_rule(Rule(2, '0', '?1', '?1'))
+        program.add_rule(Rule(3, '0', 'L', 'L'))
+        program.add_rule(Rule(4, '0', 'L', 'L'))
+        program.add_rule(Rule(5, '0', '!', '!'))
+        compiled = program.compile(fuse=True)
+        
+        self.assertEqual(compiled.code[0][1], OP_SCAN)
+        self.assertEqual(compiled.macros[0], (1, '1', True, 2))
+        self.assertEqual(compiled.code[2][1], OP_RUN)
+        self.assertEqual(compiled.macros[2], (-2, 2))
+
+    def test_fuse_mixed_directions(self):
+        """Тест, что цепочка R, R, R, L не сливается в один сдвиг"""
+        text = "1: 1 -> R; 0 -> R\n2: 1 -> R; 0 -> R\n3: 1 -> R; 0 -> R\n4: 1 -> L; 0 -> L\n"
+        states = []
+        for fuse in (True, False):
+            machine = Post_machine()
+            machine.load_tape_from_stream(io.StringIO("1\n"))
+            machine.load_program_from_stream(io.StringIO(text))
+            machine.execute_all(fuse=fuse)
+            states.append(machine.get_state())
+        self.assertEqual(states[0], states[1])
+        self.assertEqual(states[0]['step'], 4)
+        self.assertEqual(states[0]['tape'], " 1  0 [0] 0 ")
+        compiled = Program()
+        compiled.load_from_stream(io.StringIO(text))
+        self.assertEqual(compiled.compile(fuse=True).macros[0], (3, 3))
+
+    def test_fused_execution_matches_reference(self):
+        """Тест совпадения слитого выполнения с пошаговым на случайных программах"""
+        rng = random.Random(1)
+        actions = ['V', 'X', 'R', 'L', 'R', 'L', '!']
+        checked = 0
+        while checked < 200:
+            size = rng.randint(1, 6)
+            text = ""
+            for number in range(1, size + 1):
+                options = actions + [f"?{rng.randint(1, size + 1)}"] * 3
+                text += f"{number}: {rng.choice('01')} -> {rng.choice(options)}; 0 -> {rng.choice(options)}\n"
+            tape_data = "".join(rng.choice("0111") for _ in range(rng.randint(1, 30)))
+            
+            reference = Post_machine()
+            reference.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+            reference.load_program_from_stream(io.StringIO(text))
+            for _ in range(3000):
+                if not reference.execute_step():
+                    break
+            if not reference.halted:
+                continue
+            
+            for factory in (Tape, CompactTape, RunLengthTape):
+                fast = Post_machine(tape_factory=factory)
+                fast.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+                fast.load_program_from_stream(io.StringIO(text))
+                fast.execute_all()
+                self.assertEqual(fast.get_state(), reference.get_state(), text)
+            checked += 1
+    
+    def test_step_limit_with_macros(self):
+        """Тест предела шагов при слитых макрооперациях"""
+        program = "1: 1 -> R; !1 -> !\n2: 1 -> ?1; 0 -> ?1\n"
+        for factory in (Tape, CompactTape, RunLengthTape):
+            machine = Post_machine(factory)
+            machine.load_tape_from_stream(io.StringIO("1" * 100000 + "\n"))
+            machine.load_program_from_stream(io.StringIO(program))
+            result = machine.execute_all(max_steps=10)
+            self.assertEqual((result['reason'], result['steps']), ('step_limit', 10))
+            self.assertEqual(machine.tape.position, 5)
+            self.assertEqual(machine.execute_all(max_steps=11)['steps'], 11)
+            self.assertEqual(machine.program.current_rule, 2)
+            result = machine.execute_all()
+            self.assertEqual((result['reason'], result['steps']), ('halt', 200001))
+
+    def test_step_limit_matches_reference(self):
+        """Тест, что прогон кусками по max_steps совпадает с пошаговым"""
+        rng = random.Random(6)
+        programs = ["1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n4: 1 -> L; 0 -> L\n"
+                    "5: 1 -> L; 0 -> L\n6: 0 -> ?7; 1 -> ?3\n7: 1 -> R; 0 -> R\n8: 1 -> R; 0 -> R\n"
+                    "9: 1 -> V; 0 -> !\n",
+                    "1: 0 -> L; 1 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> X; 0 -> X\n4: 1 -> R; 0 -> R\n"
+                    "5: 1 -> R; 0 -> R\n6: 1 -> ?4; 0 -> V\n7: 1 -> ?1; 0 -> ?1\n"]
+        for text in programs:
+            tape_data = "".join(rng.choice("0111") for _ in range(60))
+            reference = Post_machine()
+            reference.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+            reference.load_program_from_stream(io.StringIO(text))
+            limit = 0
+            for factory in (Tape, CompactTape, RunLengthTape):
+                machine = Post_machine(factory)
+                machine.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+                machine.load_program_from_stream(io.StringIO(text))
+                limit = 0
+                while not machine.halted and limit < 3000:
+                    limit += rng.randint(1, 40)
+                    machine.execute_all(max_steps=limit)
+                    while reference.step_count < limit and reference.execute_step():
+                        pass
+                    self.assertEqual(machine.get_state(), reference.get_state(), text)
+                reference = Post_machine()
+                reference.load_tape_from_stream(io.StringIO(tape_data + "\n"))
+                reference.load_program_from_stream(io.StringIO(text))
+
+    def test_execute_all_missing_start_rule(self):
+        """Тест execute_all без начального правила"""
+        machine = Post_machine()
+        machine.program.current_rule = 999
+        machine.execute_all()
+        self.assertTrue(machine.halted)
+        self.assertEqual(machine.step_count, 0)
+    
+    def test_execute_all_result(self):
+        """Тест результата execute_all для завершившейся программы"""
+        machine = Post_machine()
+        machine.tape = Tape("1")
+        machine.program.add_rule(Rule(1, '1', 'X', '!'))
+        
+        result = machine.execute_all(detect_cycles=True, max_steps=100)
+        self.assertEqual(result, {'reason': 'halt', 'halted': True, 'steps': 1})
+    
+    def test_execute_all_detects_cycle(self):
+        """Тест обнаружения зацикливания"""
+        machine = Post_machine()
+        machine.load_tape_from_stream(io.StringIO("101\n"))
+        machine.load_program_from_stream(io.StringIO("1: 1 -> X; 0 -> V\n2: 0 -> ?1; 1 -> ?1\n"))
+        
+        result = machine.execute_all(detect_cycles=True, check_every=3)
+        self.assertEqual(result['reason'], 'cycle')
+        self.assertFalse(result['halted'])
+        self.assertFalse(machine.halted)
+        self.assertEqual(result['cycle_steps'] % 4, 0)
+    
+    def test_execute_all_step_limit(self):
+        """Тест бюджета шагов для бесконечного движения"""
+        machine = Post_machine()
+        machine.load_program_from_stream(io.StringIO("1: 0 -> L; 1 -> R\n2: 0 -> V; 1 -> X\n3: 0 -> ?1; 0 -> ?1\n"))
+        
+        result = machine.execute_all(fuse=False, max_steps=1000, detect_cycles=True)
+        self.assertEqual(result['reason'], 'step_limit')
+        self.assertEqual(machine.step_count, 1000)
+        
+        # Продолжение прогона после остановки по бюджету
+        result = machine.execute_all(fuse=False, max_steps=1500)
+        self.assertEqual(machine.step_count, 1500)
+    
+    def test_execute_all_time_limit(self):
+        """Тест бюджета времени"""
+        machine = Post_machine()
+        machine.load_program_from_stream(io.StringIO("1: 0 -> R; 1 -> R\n2: 0 -> V; 0 -> V\n3: 0 -> ?1; 0 -> ?1\n"))
+        
+        result = machine.execute_all(max_time=0.05)
+        self.assertEqual(result['reason'], 'time_limit')
+        self.assertGreater(machine.step_count, 0)
+    
+    def test_cycle_detector(self):
+        """Тест детектора циклов на повторяющихся состояниях"""
+        detector = CycleDetector()
+        tape = Tape("10")
+        results = [detector.check(rule, tape, step) for step, rule in enumerate([1, 2, 3, 1, 2, 3, 1, 2, 3])]
+        self.assertIn(3, results)
+        
+        # Одинаковое окно, но разная лента вне окна - не цикл
+        detector = CycleDetector(window=1)
+        far = Tape("1" + "0" * 10)
+        self.assertIsNone(detector.check(1, far, 0))
+        far.position = 10
+        far.set_current('1')
+        far.position = 0
+        self.assertIsNone(detector.check(1, far, 5))
+    
     def test_get_state(self):
         """Тест получения состояния машины"""
         machine = Post_machine()
@@ -389,6 +1025,191 @@ class TestPostMachine(unittest.TestCase):
         self.assertEqual(str(machine), expected_str)
 
 
+
+class TestCheckpoint(unittest.TestCase):
+    
+    PROGRAM = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> V\n4: 1 -> ?3; 0 -> !\n"
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.ckpt")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def make_machine(self, compact=False):
+        machine = Post_machine(compact=compact)
+        machine.load_tape_from_stream(io.StringIO("0110111\n"))
+        machine.load_program_from_stream(io.StringIO(self.PROGRAM))
+        return machine
+    
+    def test_round_trip(self):
+        """Тест сохранения и загрузки контрольной точки"""
+        for compact in (False, True):
+            machine = self.make_machine(compact)
+            machine.tape.move_left()
+            machine.execute_all(fuse=False, max_steps=7)
+            machine.save_checkpoint(self.path)
+            
+            restored = Post_machine(compact=compact)
+            restored.load_checkpoint(self.path)
+            self.assertEqual(restored.get_state(), machine.get_state())
+            self.assertEqual(restored.program.view_rules(), machine.program.view_rules())
+            self.assertIsInstance(restored.tape, CompactTape if compact else Tape)
+    
+    def test_non_latin1_tape(self):
+        """Тест контрольной точки ленты с символами вне latin-1"""
+        for factory in (Tape, RunLengthTape):
+            machine = Post_machine(factory)
+            machine.load_tape_from_stream(io.StringIO("1Ж1ЖЖ\n"))
+            machine.load_program_from_stream(io.StringIO("1: 1 -> R; 0 -> ?1\n2: 1 -> ?1; Ж -> !\n"))
+            machine.execute_all()
+            machine.save_checkpoint(self.path)
+            
+            restored = Post_machine(factory)
+            restored.load_checkpoint(self.path)
+            self.assertEqual(restored.get_state(), machine.get_state())
+            self.assertIsInstance(restored.tape, factory)
+        with self.assertRaises(ValueError):
+            Post_machine(compact=True).load_checkpoint(self.path)
+    
+    def test_resume_matches_full_run(self):
+        """Тест продолжения прогона с контрольной точки"""
+        full = self.make_machine()
+        full.execute_all()
+        
+        machine = self.make_machine(compact=True)
+        machine.execute_all(fuse=False, max_steps=5)
+        machine.save_checkpoint(self.path)
+        
+        resumed = Post_machine()
+        resumed.load_checkpoint(self.path)
+        resumed.execute_all()
+        self.assertEqual(resumed.get_state(), full.get_state())
+    
+    def test_run_with_checkpoints(self):
+        """Тест прогона с периодическими контрольными точками"""
+        machine = self.make_machine()
+        result = machine.run_with_checkpoints(self.path, 3, fuse=False)
+        self.assertEqual(result['reason'], 'halt')
+        
+        restored = Post_machine()
+        restored.load_checkpoint(self.path)
+        self.assertTrue(restored.halted)
+        self.assertEqual(restored.get_state(), machine.get_state())
+    
+    def test_mmap_load(self):
+        """Тест загрузки большой ленты через mmap"""
+        machine = Post_machine(compact=True)
+        machine.tape = CompactTape("1" * 5000)
+        machine.tape.position = 4000
+        machine.save_checkpoint(self.path)
+        
+        restored = Post_machine(compact=True)
+        with patch.object(post_machine, 'CHECKPOINT_MMAP_SIZE', 1000):
+            restored.load_checkpoint(self.path)
+        self.assertEqual(restored.tape, machine.tape)
+    
+    def test_not_a_checkpoint(self):
+        """Тест загрузки файла другого формата"""
+        with open(self.path, 'wb') as f:
+            f.write(b"101\n")
+        with self.assertRaises(ValueError):
+            Post_machine().load_checkpoint(self.path)
+
+class TestChunkedLoad(unittest.TestCase):
+    
+    PROGRAM = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> V\n4: 1 -> ?3; 0 -> !\n"
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "task.txt")
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_chunks_match_whole_line(self):
+        """Тест загрузки ленты мелкими кусками для всех бэкендов"""
+        lines = ["  0110 0111  \n", "\n", "   \n", "1", "0000011111000\r\n", "\t1 \t \t1\n"]
+        for factory in (Tape, CompactTape, RunLengthTape):
+            for line in lines:
+                for chunk_size in (1, 2, 3, 5, 100):
+                    text = line + "tail" if line.endswith("\n") else line
+                    for stream in (io.StringIO(text), io.BytesIO(text.encode())):
+                        with self.subTest(factory=factory.__name__, line=line, chunk=chunk_size):
+                            tape = factory()
+                            tape.load_from_stream(stream, chunk_size)
+                            self.assertEqual(tape, factory(line.strip()))
+                            self.assertEqual(tape.position, 0)
+                            self.assertEqual(len(stream.read()), len(text) - len(line))
+    
+    def test_program_after_chunked_tape(self):
+        """Тест разбора программы после потоковой загрузки ленты"""
+        machine = Post_machine(compact=True)
+        stream = io.StringIO("0110111\n" + self.PROGRAM)
+        machine.tape.load_from_stream(stream, 3)
+        machine.load_program_from_stream(stream, first_line=2)
+        self.assertEqual(sorted(machine.program.rules), [1, 2, 3, 4])
+        self.assertEqual(machine.program.diagnostics, [])
+        self.assertEqual(machine.execute_all()['reason'], 'halt')
+    
+    def test_peak_memory(self):
+        """Тест пика памяти при загрузке длинной ленты"""
+        size = 4 << 20
+        stream = io.BytesIO(b"10" * (size // 2) + b"\n")
+        tape = CompactTape()
+        tracemalloc.start()
+        try:
+            tape.load_from_stream(stream, 64 << 10)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(tape), size)
+        self.assertLess(peak, size * 1.5)
+    
+    def test_load_file(self):
+        """Тест загрузки файла задания, в том числе через mmap"""
+        tape = "1" * 3000 + "0" + "1" * 2000
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(f"  {tape} \r\n" + self.PROGRAM + "5: 1 -> Q\n")
+        for factory in (Tape, CompactTape, RunLengthTape):
+            for mmap_size in (1 << 20, 100):
+                with self.subTest(factory=factory.__name__, mmap_size=mmap_size):
+                    machine = Post_machine(factory)
+                    with patch.object(post_machine, 'TASK_MMAP_SIZE', mmap_size):
+                        machine.load_file(self.path)
+                    self.assertEqual(machine.tape, factory(tape))
+                    self.assertEqual(sorted(machine.program.rules), [1, 2, 3, 4])
+                    self.assertEqual([d.line for d in machine.program.diagnostics], [6])
+    
+    def test_load_file_non_ascii_tape(self):
+        """Тест одинаковой загрузки не-ASCII ленты через поток и через mmap"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("1ж1\n" + self.PROGRAM)
+        for factory in (Tape, RunLengthTape):
+            for mmap_size in (1 << 20, 0):
+                with self.subTest(factory=factory.__name__, mmap_size=mmap_size):
+                    machine = Post_machine(factory)
+                    with patch.object(post_machine, 'TASK_MMAP_SIZE', mmap_size):
+                        machine.load_file(self.path)
+                    self.assertEqual(machine.tape.cells, ['1', 'ж', '1'])
+                    self.assertEqual(sorted(machine.program.rules), [1, 2, 3, 4])
+        for mmap_size in (1 << 20, 0):
+            with patch.object(post_machine, 'TASK_MMAP_SIZE', mmap_size):
+                with self.assertRaises(UnicodeEncodeError):
+                    Post_machine(compact=True).load_file(self.path)
+    
+    def test_load_file_tape_only(self):
+        """Тест файла из одной строки без перевода строки"""
+        with open(self.path, 'wb') as f:
+            f.write(b"0" * 200 + b"1")
+        for mmap_size in (1 << 20, 100):
+            machine = Post_machine(compact=True)
+            with patch.object(post_machine, 'TASK_MMAP_SIZE', mmap_size):
+                machine.load_file(self.path)
+            self.assertEqual(len(machine.tape), 201)
+            self.assertEqual(machine.program.rules, {})
+
 class TestIntegration(unittest.TestCase):
     """Интеграционные тесты"""
     
@@ -0,0 +1,102 @@
+import unittest
+import io
+import random
+from post_machine import Post_machine, Tape, CompactTape, RunLengthTape
+from post_memo import MacroStepEngine
+
+
+# Головка ходит туда-обратно по серии меток (бесконечная программа)
+BOUNCE = ("1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n"
+          "4: 1 -> ?3; 0 -> ?5\n5: 1 -> R; 0 -> R\n6: 1 -> ?1; 0 -> ?1\n")
+
+
+def make_machine(tape, program, factory=Tape):
+    machine = Post_machine(factory)
+    machine.load_tape_from_stream(io.StringIO(tape + "\n"))
+    machine.load_program_from_stream(io.StringIO(program))
+    return machine
+
+
+def run_reference(machine, max_steps):
+    while machine.step_count < max_steps and machine.execute_step():
+        pass
+
+
+class TestMacroStepEngine(unittest.TestCase):
+
+    def test_matches_execute_step_on_random_programs(self):
+        """Тест совпадения с пошаговым выполнением на случайных программах"""
+        rng = random.Random(3)
+        actions = ['V', 'X', 'R', 'L', 'R', 'L', '!']
+        for _ in range(150):
+            size = rng.randint(1, 6)
+            text = ""
+            for number in range(1, size + 1):
+                options = actions + [f"?{rng.randint(1, size + 1)}"] * 3
+                text += f"{number}: {rng.choice('01')} -> {rng.choice(options)}; 0 -> {rng.choice(options)}\n"
+            tape = "".join(rng.choice("0111") for _ in range(rng.randint(1, 30)))
+            max_steps = rng.choice([None, rng.randint(0, 3000)])
+
+            reference = make_machine(tape, text)
+            run_reference(reference, 3000 if max_steps is None else max_steps)
+            if max_steps is None and not reference.halted:
+                continue
+            for factory in (Tape, CompactTape, RunLengthTape):
+                engine = MacroStepEngine(radius=2, levels=2, max_block_steps=50, max_size=8)
+                machine = make_machine(tape, text, factory)
+                result = engine.run(machine, max_steps)
+                self.assertEqual(machine.get_state(), reference.get_state(), text)
+                self.assertEqual(result['halted'], reference.halted)
+
+    def test_repetitive_program_hits(self):
+        """Тест, что повторяющаяся программа выполняется блоками из кэша"""
+        engine = MacroStepEngine()
+        machine = make_machine("1" * 3000, BOUNCE, CompactTape)
+        result = engine.run(machine, max_steps=200000)
+        reference = make_machine("1" * 3000, BOUNCE)
+        reference.execute_all(fuse=False, max_steps=200000)
+        self.assertEqual(result['reason'], 'step_limit')
+        self.assertEqual(machine.get_state(), reference.get_state())
+        stats = engine.stats()
+        self.assertLess(stats['misses'], 50)
+        self.assertLess(stats['hits'], 200000 // 100)
+
+    def test_resume_and_halt(self):
+        """Тест продолжения прогона и остановки на отсутствующем правиле"""
+        program = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> ?9\n"
+        engine = MacroStepEngine(radius=4)
+        machine = make_machine("1" * 500, program)
+        self.assertEqual(engine.run(machine, max_steps=100)['steps'], 100)
+        result = engine.run(machine)
+        reference = make_machine("1" * 500, program)
+        reference.execute_all(fuse=False)
+        self.assertEqual(result['reason'], 'halt')
+        self.assertEqual(machine.get_state(), reference.get_state())
+        self.assertEqual(machine.program.current_rule, 9)
+
+    def test_eviction_and_program_change(self):
+        """Тест вытеснения из кэша и сброса кэша при смене программы"""
+        engine = MacroStepEngine(radius=2, levels=1, max_size=3)
+        rng = random.Random(5)
+        tape = "".join(rng.choice("01") for _ in range(400))
+        program = "1: 1 -> R; 0 -> R\n2: 1 -> ?1; 0 -> ?1\n"
+        machine = make_machine(tape, program)
+        engine.run(machine, max_steps=5000)
+        self.assertEqual(len(engine), 3)
+        self.assertGreater(engine.stats()['evictions'], 0)
+
+        machine = make_machine("1", "1: 1 -> !; 0 -> !\n")
+        engine.run(machine)
+        self.assertTrue(machine.halted)
+        self.assertEqual(len(engine), 1)
+
+    def test_invalid_arguments(self):
+        """Тест проверки параметров движка"""
+        with self.assertRaises(ValueError):
+            MacroStepEngine(radius=0)
+        with self.assertRaises(ValueError):
+            MacroStepEngine(max_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
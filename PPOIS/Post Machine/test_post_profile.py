@@ -0,0 +1,76 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from post_machine import Post_machine
+from post_profile import RuleProfiler
+
+
+PROGRAM = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n4: 1 -> ?3; 0 -> !\n"
+
+
+def make_machine(tape="111"):
+    machine = Post_machine()
+    machine.load_tape_from_stream(io.StringIO(tape + "\n"))
+    machine.load_program_from_stream(io.StringIO(PROGRAM))
+    return machine
+
+
+class TestRuleProfiler(unittest.TestCase):
+
+    def test_counts(self):
+        """Тест подсчёта срабатываний правил по ветвям"""
+        machine = make_machine()
+        profiler = RuleProfiler()
+        result = profiler.run(machine)
+
+        self.assertEqual(result['reason'], 'halt')
+        self.assertEqual(profiler.steps, machine.step_count)
+        self.assertEqual(profiler.true_counts, {1: 3, 2: 2, 3: 3, 4: 3})
+        self.assertEqual(profiler.false_counts, {1: 1, 2: 1, 3: 1, 4: 1})
+        self.assertEqual(profiler.extended_right, 1)
+        self.assertEqual(profiler.extended_left, 1)
+        self.assertEqual(profiler.peak_tape_length, 5)
+
+    def test_same_result_as_execute_all(self):
+        """Тест совпадения состояния с обычным прогоном"""
+        machine = make_machine("1101")
+        RuleProfiler().run(machine)
+        reference = make_machine("1101")
+        reference.execute_all()
+        self.assertEqual(machine.get_state(), reference.get_state())
+
+    def test_hot_rules_and_report(self):
+        """Тест сортировки горячих правил и отчёта"""
+        profiler = RuleProfiler()
+        profiler.run(make_machine())
+        self.assertEqual(profiler.hot_rules()[0], (1, 4, 3, 1))
+        report = profiler.report()
+        self.assertTrue(report.startswith("Шагов: 15"))
+        self.assertIn("Правило 3: 4 (26.7%), истина 3, ложь 1", report)
+
+    def test_step_limit(self):
+        """Тест ограничения шагов"""
+        machine = make_machine()
+        profiler = RuleProfiler()
+        result = profiler.run(machine, max_steps=5)
+        self.assertEqual(result['reason'], 'step_limit')
+        self.assertEqual(machine.step_count, 5)
+        self.assertFalse(machine.halted)
+
+    def test_dump(self):
+        """Тест сохранения профиля в JSON"""
+        profiler = RuleProfiler()
+        profiler.run(make_machine())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            profiler.dump(path)
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data, profiler.to_dict())
+        self.assertEqual(data['rules'][0]['rule'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,120 @@
+import unittest
+import io
+import os
+import tempfile
+from unittest import mock
+import post_trace
+from post_machine import Post_machine, OP_JUMP
+from post_trace import TraceWriter, read_trace, replay, END
+
+
+PROGRAM = "1: 1 -> X; 0 -> V\n2: 1 -> L; 0 -> R\n3: 0 -> ?1; 1 -> ?4\n4: 1 -> R; 0 -> !\n"
+
+
+def make_machine(tape="1101", program=PROGRAM):
+    machine = Post_machine()
+    machine.load_tape_from_stream(io.StringIO(tape + "\n"))
+    machine.load_program_from_stream(io.StringIO(program))
+    return machine
+
+
+class TestPostTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.trace")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record_run(self, machine, buffer_records=4096):
+        states = [machine.get_state()]
+        with TraceWriter(self.path, machine, buffer_records) as trace:
+            machine.trace = trace
+            for _ in range(200):
+                if not machine.execute_step():
+                    break
+                states.append(machine.get_state())
+        return states
+
+    def test_records(self):
+        """Тест записи дельт шагов"""
+        machine = make_machine()
+        states = self.record_run(machine, buffer_records=2)
+        header, records = read_trace(self.path)
+        records = list(records)
+
+        self.assertEqual(header['tape'], "1101")
+        # шаги и маркер остановки на отсутствующем правиле 5
+        self.assertEqual(len(records), machine.step_count + 1)
+        self.assertEqual(records[-1][:3], (5, END, 5))
+        rule, op, next_rule, position, cell = records[0]
+        self.assertEqual((rule, next_rule, position, cell), (1, 2, 0, ord('0')))
+
+    def test_replay_every_step(self):
+        """Тест восстановления состояния на любом шаге"""
+        machine = make_machine()
+        states = self.record_run(machine)
+        for step, state in enumerate(states):
+            self.assertEqual(replay(self.path, step).get_state(), state)
+        self.assertEqual(replay(self.path).get_state(), machine.get_state())
+        self.assertTrue(replay(self.path).halted)
+
+    def test_replay_in_blocks(self):
+        """Тест чтения записей блоками и остановки на нужном шаге"""
+        states = self.record_run(make_machine("1" * 40, "1: 1 -> R; 0 -> !\n2: 1 -> ?1; 0 -> ?1\n"))
+        with mock.patch.object(post_trace, 'BLOCK_RECORDS', 3):
+            self.assertEqual(len(list(read_trace(self.path)[1])), len(states) - 1)
+            for step in (0, 1, 3, 4, 50, len(states) - 1):
+                self.assertEqual(replay(self.path, step).get_state(), states[step])
+            reads = []
+            real_open = open
+
+            def counting_open(*args, **kwargs):
+                f = real_open(*args, **kwargs)
+                read = f.read
+                f.read = lambda size=-1: reads.append(size) or read(size)
+                return f
+            with mock.patch('builtins.open', counting_open):
+                replay(self.path, 4)
+        # заголовок - три чтения, записи до шага 4 - два блока
+        self.assertEqual(reads[3:], [3 * post_trace.RECORD.size] * 2)
+
+    def test_replay_missing_rule_halt(self):
+        """Тест остановки на переходе к отсутствующему правилу"""
+        machine = make_machine("1", "1: 1 -> R; 0 -> R\n")
+        states = self.record_run(machine)
+        self.assertTrue(machine.halted)
+        self.assertEqual(machine.program.current_rule, 2)
+        final = replay(self.path)
+        self.assertEqual(final.get_state(), machine.get_state())
+        self.assertEqual(final.get_state()['step'], 1)
+        self.assertEqual(replay(self.path, 1).get_state(), states[1])
+        self.assertEqual(len(list(read_trace(self.path)[1])), 2)
+
+    def test_large_rule_numbers(self):
+        """Тест номеров правил за пределами 32 бит"""
+        big = 2 ** 40
+        machine = make_machine("11", f"1: 1 -> ?{big}; 0 -> !\n{big}: 1 -> R; 0 -> !\n")
+        states = self.record_run(machine)
+        records = list(read_trace(self.path)[1])
+        self.assertEqual(records[0][:3], (1, OP_JUMP, big))
+        self.assertEqual(records[1][0], big)
+        self.assertEqual(replay(self.path).get_state(), machine.get_state())
+        self.assertEqual(replay(self.path, 1).get_state(), states[1])
+
+    def test_replay_left_growth(self):
+        """Тест восстановления при росте ленты влево"""
+        states = self.record_run(make_machine("0"))
+        self.assertEqual(replay(self.path).get_state(), states[-1])
+
+    def test_not_a_trace(self):
+        """Тест чтения файла другого формата"""
+        with open(self.path, 'wb') as f:
+            f.write(b"101\n")
+        with self.assertRaises(ValueError):
+            replay(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
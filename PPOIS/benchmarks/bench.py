@@ -0,0 +1,338 @@
+# bench.py
+# Микробенчмарки горячих путей пятнашек (tag_game) и машины Поста
+# (Post Machine). Нагрузки детерминированы (фиксированное зерно), размер
+# задаётся масштабом. Для каждого бенчмарка считаются операции в секунду
+# (лучший из repeat прогонов) и пик памяти (отдельный прогон под
+# tracemalloc, чтобы трассировка не искажала время).
+# Результаты можно сохранить как JSON-базу и сравнивать с ней следующие
+# прогоны: бенчмарк, ставший медленнее базы больше чем на threshold,
+# считается регрессией (код выхода 1).
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, '..', 'tag_game'), os.path.join(HERE, '..', 'Post Machine')]
+
+from tag import FifteenPuzzle, neighbour_table  # noqa: E402
+from packed import PackedFifteenPuzzle  # noqa: E402
+from post_machine import Tape, CompactTape, RunLengthTape, Post_machine  # noqa: E402
+from post_memo import MacroStepEngine  # noqa: E402
+
+SCALES = {'tiny': 0.01, 'small': 1, 'medium': 10, 'large': 100}
+DEFAULT_THRESHOLD = 0.2
+SEED = 12345
+
+# имя -> функция подготовки: setup(scale) -> (run, число операций)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _size(base, scale):
+    return max(1, int(base * scale))
+
+
+# Координаты (1..4) случайной партии из count допустимых ходов
+def _random_game(count):
+    rng = random.Random(SEED)
+    neighbours = neighbour_table(4, 4)
+    blank = 15
+    moves = []
+    for _ in range(count):
+        pos = rng.choice(neighbours[blank])
+        moves.append((pos // 4 + 1, pos % 4 + 1))
+        blank = pos
+    return moves
+
+
+@benchmark('tag.scramble')
+def _bench_scramble(scale):
+    games = _size(20, scale)
+
+    def run():
+        for i in range(games):
+            FifteenPuzzle(scramble_on_init=False, seed=i).scramble()
+    return run, games * 1000
+
+
+@benchmark('tag.scramble_uniform')
+def _bench_scramble_uniform(scale):
+    games = _size(20000, scale)
+
+    def run():
+        game = FifteenPuzzle(scramble_on_init=False, seed=SEED)
+        for _ in range(games):
+            game.scramble(uniform=True)
+    return run, games
+
+
+def _bench_moves(factory, scale):
+    moves = _random_game(_size(10000, scale))
+
+    def run():
+        game = factory(scramble_on_init=False)
+        move = game.move
+        for row, col in moves:
+            move(row, col)
+    return run, len(moves)
+
+
+@benchmark('tag.move')
+def _bench_move(scale):
+    return _bench_moves(FifteenPuzzle, scale)
+
+
+@benchmark('packed.move')
+def _bench_packed_move(scale):
+    return _bench_moves(PackedFifteenPuzzle, scale)
+
+
+@benchmark('tag.find_empty_pos')
+def _bench_find_empty_pos(scale):
+    calls = _size(100000, scale)
+    game = FifteenPuzzle(seed=SEED)
+
+    def run():
+        find = game.find_empty_pos
+        for _ in range(calls):
+            find()
+    return run, calls
+
+
+@benchmark('tag.is_solved')
+def _bench_is_solved(scale):
+    calls = _size(100000, scale)
+    game = FifteenPuzzle(scramble_on_init=False)
+
+    def run():
+        solved = game.is_solved
+        for _ in range(calls):
+            solved()
+    return run, calls
+
+
+def _bench_move_left(factory, scale):
+    steps = _size(100000, scale)
+
+    def run():
+        tape = factory("1" * 1000)
+        move_left = tape.move_left
+        for _ in range(steps):
+            move_left()
+    return run, steps
+
+
+@benchmark('tape.move_left')
+def _bench_tape_move_left(scale):
+    return _bench_move_left(Tape, scale)
+
+
+@benchmark('compact_tape.move_left')
+def _bench_compact_move_left(scale):
+    return _bench_move_left(CompactTape, scale)
+
+
+@benchmark('rle_tape.move_left')
+def _bench_rle_move_left(scale):
+    return _bench_move_left(RunLengthTape, scale)
+
+
+# Уход вправо по меткам и возврат влево за начало ленты
+LONG_TAPE_PROGRAM = "1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n4: 1 -> ?3; 0 -> !\n"
+# Бесконечное движение влево (ограничивается числом шагов)
+LEFT_WALK_PROGRAM = "1: 0 -> L; 1 -> L\n2: 0 -> ?1; 1 -> ?1\n"
+
+
+def _machine(tape, program, compact, tape_factory=Tape):
+    machine = Post_machine(tape_factory, compact=compact)
+    machine.load_tape_from_stream(io.StringIO(tape + "\n"))
+    machine.load_program_from_stream(io.StringIO(program))
+    return machine
+
+
+def _bench_long_tape(scale, fuse, compact, tape_factory=Tape):
+    tape = "1" * _size(10000, scale)
+    steps = _machine(tape, LONG_TAPE_PROGRAM, compact).execute_all()['steps']
+
+    def run():
+        _machine(tape, LONG_TAPE_PROGRAM, compact, tape_factory).execute_all(fuse=fuse)
+    return run, steps
+
+
+@benchmark('post.execute_all.long_tape')
+def _bench_post_long_tape(scale):
+    return _bench_long_tape(scale, fuse=False, compact=False)
+
+
+@benchmark('post.execute_all.long_tape_fused')
+def _bench_post_long_tape_fused(scale):
+    return _bench_long_tape(scale, fuse=True, compact=True)
+
+
+@benchmark('post.execute_all.long_tape_rle')
+def _bench_post_long_tape_rle(scale):
+    return _bench_long_tape(scale, fuse=True, compact=False, tape_factory=RunLengthTape)
+
+
+@benchmark('post.execute_all.left_walk')
+def _bench_post_left_walk(scale):
+    steps = _size(100000, scale)
+
+    def run():
+        _machine("1", LEFT_WALK_PROGRAM, False).execute_all(fuse=False, max_steps=steps)
+    return run, steps
+
+
+# Челнок по серии меток туда и обратно (ограничивается числом шагов)
+BOUNCE_PROGRAM = ("1: 1 -> R; 0 -> ?3\n2: 1 -> ?1; 0 -> ?1\n3: 1 -> L; 0 -> L\n"
+                  "4: 1 -> ?3; 0 -> ?5\n5: 1 -> R; 0 -> R\n6: 1 -> ?1; 0 -> ?1\n")
+
+
+@benchmark('post.execute_all.bounce')
+def _bench_post_bounce(scale):
+    steps = _size(1000000, scale)
+
+    def run():
+        _machine("1" * 1000, BOUNCE_PROGRAM, True).execute_all(fuse=False, max_steps=steps)
+    return run, steps
+
+
+@benchmark('post.memo.bounce')
+def _bench_post_memo_bounce(scale):
+    steps = _size(1000000, scale)
+
+    def run():
+        MacroStepEngine().run(_machine("1" * 1000, BOUNCE_PROGRAM, True), max_steps=steps)
+    return run, steps
+
+
+# Прогон одного бенчмарка: лучшее время из repeat, затем (если нужно)
+# отдельный прогон под tracemalloc для пика памяти
+def run_benchmark(name, scale=1, repeat=3, memory=True):
+    setup = BENCHMARKS[name]
+    best = None
+    for _ in range(repeat):
+        run, ops = setup(scale)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    result = {'ops': ops, 'seconds': best, 'ops_per_sec': ops / best if best else float('inf')}
+    if memory:
+        run, _ = setup(scale)
+        tracemalloc.start()
+        try:
+            run()
+            result['peak_kib'] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def select(patterns=None):
+    if not patterns:
+        return list(BENCHMARKS)
+    return [name for name in BENCHMARKS if any(p in name for p in patterns)]
+
+
+def run_all(names=None, scale='small', repeat=3, memory=True):
+    factor = SCALES[scale]
+    return {
+        'scale': scale,
+        'python': platform.python_version(),
+        'results': {name: run_benchmark(name, factor, repeat, memory)
+                    for name in (names or list(BENCHMARKS))},
+    }
+
+
+def save_baseline(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Регрессии относительно базы: бенчмарки, у которых ops/sec упали больше
+# чем на threshold. Сравниваются только общие бенчмарки одного масштаба
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    if report['scale'] != baseline.get('scale'):
+        raise ValueError(f"база снята на масштабе {baseline.get('scale')}, "
+                         f"а прогон - на {report['scale']}")
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append({'name': name, 'baseline': base['ops_per_sec'],
+                                'current': result['ops_per_sec'], 'ratio': ratio})
+    return regressions
+
+
+def format_report(report, baseline=None):
+    lines = [f"Масштаб: {report['scale']}, Python {report['python']}"]
+    for name, result in report['results'].items():
+        line = f"{name:36s} {result['ops_per_sec']:14,.0f} оп/с"
+        if 'peak_kib' in result:
+            line += f" {result['peak_kib']:10,.1f} КиБ"
+        if baseline is not None and name in baseline['results']:
+            ratio = result['ops_per_sec'] / baseline['results'][name]['ops_per_sec']
+            line += f"  x{ratio:.2f} к базе"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Микробенчмарки tag_game и Post Machine")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--only', nargs='*', default=None, help="подстроки имён бенчмарков")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="не измерять пик памяти")
+    parser.add_argument('--save', default=None, help="сохранить результат как базу (JSON)")
+    parser.add_argument('--compare', default=None, help="сравнить с базой (JSON)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимое замедление, доля (0.2 = 20%%)")
+    parser.add_argument('--list', action='store_true', help="только список бенчмарков")
+    args = parser.parse_args(argv)
+
+    names = select(args.only)
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print("Бенчмарки не найдены", file=sys.stderr)
+        return 1
+    baseline = load_baseline(args.compare) if args.compare else None
+    report = run_all(names, args.scale, args.repeat, not args.no_memory)
+    print(format_report(report, baseline))
+    if args.save:
+        save_baseline(report, args.save)
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ {regression['name']}: {regression['current']:,.0f} оп/с "
+                  f"против {regression['baseline']:,.0f} (x{regression['ratio']:.2f})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
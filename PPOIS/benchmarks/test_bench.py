@@ -0,0 +1,72 @@
+import unittest
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from bench import (BENCHMARKS, run_benchmark, run_all, select, compare, save_baseline,
+                   load_baseline, main)
+
+
+def make_report(scale='tiny', **speeds):
+    return {'scale': scale, 'python': '3',
+            'results': {name: {'ops': 1, 'seconds': 1 / speed, 'ops_per_sec': speed}
+                        for name, speed in speeds.items()}}
+
+
+class TestBench(unittest.TestCase):
+
+    def test_all_benchmarks_run(self):
+        """Тест прогона всех бенчмарков на малом масштабе"""
+        report = run_all(scale='tiny', repeat=1)
+        self.assertEqual(set(report['results']), set(BENCHMARKS))
+        for result in report['results'].values():
+            self.assertGreater(result['ops'], 0)
+            self.assertGreater(result['ops_per_sec'], 0)
+            self.assertGreaterEqual(result['peak_kib'], 0)
+
+    def test_run_benchmark_without_memory(self):
+        """Тест прогона без замера памяти"""
+        result = run_benchmark('tag.move', 0.01, repeat=2, memory=False)
+        self.assertEqual(result['ops'], 100)
+        self.assertNotIn('peak_kib', result)
+
+    def test_select(self):
+        """Тест выбора бенчмарков по подстроке"""
+        self.assertEqual(select(['move_left']),
+                         ['tape.move_left', 'compact_tape.move_left', 'rle_tape.move_left'])
+        self.assertEqual(select(None), list(BENCHMARKS))
+
+    def test_compare(self):
+        """Тест поиска регрессий относительно базы"""
+        baseline = make_report(a=100.0, b=100.0, c=100.0)
+        report = make_report(a=85.0, b=70.0, d=1.0)
+        regressions = compare(report, baseline, threshold=0.2)
+        self.assertEqual([r['name'] for r in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0]['ratio'], 0.7)
+        self.assertEqual(compare(report, baseline, threshold=0.1)[0]['name'], 'a')
+        with self.assertRaises(ValueError):
+            compare(make_report('small', a=1.0), baseline)
+
+    def test_baseline_roundtrip_and_main(self):
+        """Тест сохранения базы и флага регрессии в main"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = main(['--scale', 'tiny', '--only', 'is_solved', '--repeat', '1',
+                             '--no-memory', '--save', path])
+            self.assertEqual(code, 0)
+            baseline = load_baseline(path)
+            self.assertEqual(list(baseline['results']), ['tag.is_solved'])
+            # База в тысячу раз быстрее - прогон должен считаться регрессией
+            baseline['results']['tag.is_solved']['ops_per_sec'] *= 1000
+            save_baseline(baseline, path)
+            with redirect_stdout(output):
+                code = main(['--scale', 'tiny', '--only', 'is_solved', '--repeat', '1',
+                             '--no-memory', '--compare', path])
+            self.assertEqual(code, 1)
+            self.assertIn("РЕГРЕССИЯ tag.is_solved", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from solver import SearchBudgetExceeded, get_solver
+
+# Решатель процесса пула: создаётся один раз на процесс, а не на задачу
+_worker = {}
+
+
+# Инициализация процесса пула. При fork таблицы решателя, построенные
+# в родителе до создания пула, достаются процессу без копирования
+# (copy-on-write); база шаблонов открывается через mmap, и все процессы
+# читают одну копию из page cache
+def _init_worker(rows, cols, database_path):
+    if database_path is not None:
+        from pattern_db import PatternDatabase, PatternDatabaseSolver
+        _worker['solver'] = PatternDatabaseSolver(PatternDatabase(database_path))
+    else:
+        _worker['solver'] = get_solver(rows, cols)
+
+
+# Решение одной доски в процессе пула
+def solve_instance(index, tiles, max_nodes=None, max_time=None):
+    solver = _worker['solver']
+    start = time.perf_counter()
+    result = {'index': index, 'tiles': list(tiles)}
+    solver.nodes = 0
+    try:
+        path = solver.solve(tiles, max_nodes, max_time)
+        if path is None:
+            result['status'] = 'unsolvable'
+        else:
+            result['status'] = 'solved'
+            result['path'] = path
+            result['length'] = len(path)
+    except SearchBudgetExceeded as e:
+        result['status'] = 'budget'
+        result['error'] = str(e)
+    except Exception as e:
+        # Любая ошибка доски - запись 'error', пакет идёт дальше
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['nodes'] = solver.nodes
+    result['wall_time'] = time.perf_counter() - start
+    return result
+
+
+# Результат задачи пула; ошибка вне solve_instance (передача доски в
+# процесс, упавший процесс) - тоже запись 'error', а не конец пакета
+def _result(future, jobs):
+    index, tiles = jobs.pop(future)
+    try:
+        return future.result()
+    except Exception as e:
+        return {'index': index, 'tiles': tiles, 'status': 'error',
+                'error': f"{type(e).__name__}: {e}"}
+
+
+def _context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+# Решение набора досок в пуле процессов. Результаты отдаются по мере
+# готовности (поле index - номер доски во входе); в работе держится не
+# больше нескольких задач на процесс, так что вход может быть генератором.
+# database - путь к файлу pattern_db; max_nodes / max_time - бюджет на доску
+def solve_batch(instances, rows=4, cols=4, max_nodes=None, max_time=None,
+                database=None, workers=None):
+    workers = workers or os.cpu_count() or 1
+    if database is None:
+        # Таблицы строятся в родителе, процессы наследуют их при fork
+        get_solver(rows, cols)
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_context(),
+                             initializer=_init_worker,
+                             initargs=(rows, cols, database)) as executor:
+        pending = set()
+        jobs = {}  # задача -> (номер доски, доска)
+        for index, tiles in enumerate(instances):
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _result(future, jobs)
+            tiles = list(tiles)
+            future = executor.submit(solve_instance, index, tiles, max_nodes, max_time)
+            jobs[future] = (index, tiles)
+            pending.add(future)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _result(future, jobs)
+
+
+# Доски из потока: по доске на строку, числа через пробел или запятую
+def read_boards(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield [int(num) for num in line.replace(',', ' ').split()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Пакетное решение пятнашек, результат - JSON lines в порядке готовности")
+    parser.add_argument('boards', nargs='?', default='-',
+                        help="файл с досками (по строке на доску), '-' - stdin")
+    parser.add_argument('--rows', type=int, default=4)
+    parser.add_argument('--cols', type=int, default=4)
+    parser.add_argument('--database', default=None, help="файл базы шаблонов (pattern_db.py)")
+    parser.add_argument('--max-nodes', type=int, default=None, help="бюджет узлов на доску")
+    parser.add_argument('--max-time', type=float, default=None, help="бюджет секунд на доску")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.boards == '-' else open(args.boards, encoding='utf-8')
+    try:
+        for result in solve_batch(read_boards(stream), args.rows, args.cols,
+                                  args.max_nodes, args.max_time, args.database, args.workers):
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# board_batch.py
+# Векторная обработка больших наборов досок на NumPy: доски - массив
+# (N, rows*cols) uint8, по строке на доску, 0 - пустая клетка.
+# Все функции работают сразу со всем массивом, без цикла Python по доскам
+# (циклы есть только по клеткам доски).
+import numpy as np
+
+from tag import UP, DOWN, LEFT, RIGHT
+
+
+def _as_boards(boards, rows, cols):
+    boards = np.asarray(boards, dtype=np.uint8)
+    if boards.ndim != 2 or boards.shape[1] != rows * cols:
+        raise ValueError(f"ожидается массив (N, {rows * cols})")
+    return boards
+
+
+# Решённая доска 1..n-1, 0
+def goal(rows=4, cols=4):
+    return ((np.arange(rows * cols) + 1) % (rows * cols)).astype(np.uint8)
+
+
+# Доски объектов SlidingPuzzle / FifteenPuzzle -> массив (N, rows*cols)
+def from_puzzles(puzzles):
+    return np.array([puzzle.tiles for puzzle in puzzles], dtype=np.uint8)
+
+
+def is_solved(boards, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols)
+    return (boards == goal(rows, cols)).all(axis=1)
+
+
+# Позиция пустой клетки каждой доски
+def blank_positions(boards, rows=4, cols=4):
+    return np.argmin(_as_boards(boards, rows, cols), axis=1)
+
+
+# Сумма манхэттенских расстояний плиток: таблица dist[плитка, клетка]
+# и одна выборка по всему массиву
+def manhattan(boards, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols)
+    size = rows * cols
+    tile = np.arange(size)[:, None]
+    pos = np.arange(size)[None, :]
+    dist = np.abs((tile - 1) // cols - pos // cols) + np.abs((tile - 1) % cols - pos % cols)
+    dist[0, :] = 0
+    return dist.astype(np.uint16)[boards, pos].sum(axis=1, dtype=np.int32)
+
+
+# Число инверсий среди плиток (пустая клетка не считается)
+def inversions(boards, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols)
+    result = np.zeros(len(boards), dtype=np.int32)
+    for i in range(rows * cols - 1):
+        rest = boards[:, i + 1:]
+        result += ((boards[:, i:i + 1] > rest) & (rest != 0)).sum(axis=1, dtype=np.int32)
+    return result
+
+
+# Решаемость - то же правило, что solver.is_solvable
+def solvable(boards, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols)
+    parity = inversions(boards, rows, cols) % 2
+    if cols % 2 == 1:
+        return parity == 0
+    blank_row_from_bottom = rows - blank_positions(boards, rows, cols) // cols
+    return (parity + blank_row_from_bottom) % 2 == 1
+
+
+# Все метрики за один вызов
+def evaluate(boards, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols)
+    return {
+        'solved': is_solved(boards, rows, cols),
+        'manhattan': manhattan(boards, rows, cols),
+        'inversions': inversions(boards, rows, cols),
+        'solvable': solvable(boards, rows, cols),
+    }
+
+
+# Один ход на каждой доске: moves[i] - направление (UP/DOWN/LEFT/RIGHT),
+# в котором сдвигается пустая клетка доски i. Возвращает новый массив и
+# маску допустимых ходов; доски с недопустимым ходом не меняются
+def apply_moves(boards, moves, rows=4, cols=4):
+    boards = _as_boards(boards, rows, cols).copy()
+    moves = np.asarray(moves)
+    if moves.shape != (len(boards),):
+        raise ValueError("нужно по одному ходу на доску")
+    blank = blank_positions(boards, rows, cols)
+    row, col = blank // cols, blank % cols
+    legal = np.select([moves == UP, moves == DOWN, moves == LEFT, moves == RIGHT],
+                      [row > 0, row < rows - 1, col > 0, col < cols - 1], False)
+    delta = np.array([-cols, cols, -1, 1])[np.where(legal, moves, 0)]
+    index = np.nonzero(legal)[0]
+    source = blank[index]
+    target = source + delta[index]
+    boards[index, source] = boards[index, target]
+    boards[index, target] = 0
+    return boards, legal
+
+
+# count случайных решаемых досок, равномерно по решаемым позициям:
+# случайные перестановки, у нерешаемых меняются местами две плитки,
+# не задевающие пустую клетку
+def random_boards(count, seed=None, rows=4, cols=4):
+    rng = np.random.default_rng(seed)
+    size = rows * cols
+    boards = np.argsort(rng.random((count, size)), axis=1).astype(np.uint8)
+    bad = np.nonzero(~solvable(boards, rows, cols))[0]
+    blank = blank_positions(boards[bad], rows, cols)
+    first = np.where(blank > 1, 0, 2)
+    second = first + 1
+    values = boards[bad, first]
+    boards[bad, first] = boards[bad, second]
+    boards[bad, second] = values
+    return boards
@@ -0,0 +1,145 @@
+# hint_cache.py
+# Кэш решений для подсказок: позиция -> (оставшееся число ходов
+# оптимального решения, следующий ход). Ключ - доска, упакованная в
+# целое по (n-1).bit_length() бит на клетку (для 4x4 - те же 64 бита, что
+# в packed.py). Размер ограничен, вытесняется давно не использованная
+# позиция (LRU). Найденное решение кладёт в кэш все позиции своего пути,
+# так что следующие подсказки по этому пути решатель не вызывают.
+#
+# Файл кэша: MAGIC, заголовок HEADER (rows, cols, число записей), затем
+# записи - ключ (key_bytes байт, little-endian), расстояние (uint16) и
+# следующий ход (int16, -1 - позиция решена). Записи идут от давно
+# использованных к недавним, так что порядок LRU переживает загрузку.
+import os
+import struct
+from collections import OrderedDict
+
+from solver import get_solver
+
+MAGIC = b'HINTC001'
+HEADER = struct.Struct('<HHI')
+RECORD_TAIL = struct.Struct('<Hh')
+DEFAULT_SIZE = 100000
+
+
+class SolutionCache:
+    def __init__(self, rows=4, cols=4, max_size=DEFAULT_SIZE, path=None):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.bits = (self.size - 1).bit_length()
+        self.key_bytes = (self.bits * self.size + 7) // 8
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    # Компактный ключ доски
+    def key(self, tiles):
+        bits = self.bits
+        key = 0
+        for pos, tile in enumerate(tiles):
+            key |= tile << (bits * pos)
+        return key
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, tiles):
+        return self.key(tiles) in self._entries
+
+    def _store(self, key, distance, move):
+        entries = self._entries
+        entries[key] = (distance, move)
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    # (расстояние до цели, позиция плитки для следующего хода) или None
+    def get(self, tiles):
+        key = self.key(tiles)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    # Запись всех позиций оптимального пути path (позиции плиток, как
+    # возвращает решатель) начиная с tiles
+    def put_path(self, tiles, path):
+        board = list(tiles)
+        blank = board.index(0)
+        remaining = len(path)
+        for pos in path:
+            self._store(self.key(board), remaining, pos)
+            board[blank], board[pos] = board[pos], 0
+            blank = pos
+            remaining -= 1
+        self._store(self.key(board), 0, None)
+
+    # Следующий ход оптимального решения (позиция плитки), None - доска
+    # решена или нерешаема. При промахе доска решается, и весь путь
+    # попадает в кэш
+    def hint(self, tiles, max_nodes=None, max_time=None):
+        entry = self.get(tiles)
+        if entry is not None:
+            return entry[1]
+        path = get_solver(self.rows, self.cols).solve(tiles, max_nodes, max_time)
+        if path is None:
+            return None
+        self.put_path(tiles, path)
+        return path[0] if path else None
+
+    # Оставшееся число ходов оптимального решения (None - нерешаема)
+    def distance(self, tiles, max_nodes=None, max_time=None):
+        entry = self.get(tiles)
+        if entry is None:
+            path = get_solver(self.rows, self.cols).solve(tiles, max_nodes, max_time)
+            if path is None:
+                return None
+            self.put_path(tiles, path)
+            return len(path)
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'size': len(self._entries), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses}
+
+    def save(self, path=None):
+        path = path or self.path
+        key_bytes = self.key_bytes
+        with open(path, 'wb') as f:
+            f.write(MAGIC + HEADER.pack(self.rows, self.cols, len(self._entries)))
+            for key, (distance, move) in self._entries.items():
+                f.write(key.to_bytes(key_bytes, 'little'))
+                f.write(RECORD_TAIL.pack(distance, -1 if move is None else move))
+
+    # Загрузка добавляет записи файла к текущим (они считаются недавними)
+    def load(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: не файл кэша подсказок")
+        rows, cols, count = HEADER.unpack_from(data, len(MAGIC))
+        if (rows, cols) != (self.rows, self.cols):
+            raise ValueError(f"{path}: кэш для доски {rows}x{cols}")
+        offset = len(MAGIC) + HEADER.size
+        key_bytes = self.key_bytes
+        record = key_bytes + RECORD_TAIL.size
+        if len(data) != offset + count * record:
+            raise ValueError(f"{path}: файл кэша повреждён")
+        for _ in range(count):
+            key = int.from_bytes(data[offset:offset + key_bytes], 'little')
+            distance, move = RECORD_TAIL.unpack_from(data, offset + key_bytes)
+            self._store(key, distance, None if move < 0 else move)
+            offset += record
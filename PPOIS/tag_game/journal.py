@@ -0,0 +1,176 @@
+# journal.py
+# Журнал ходов партии: каждый ход - направление сдвига пустой клетки
+# (tag.UP/DOWN/LEFT/RIGHT), 2 бита, по 4 хода в байте. Отмена и повтор
+# хода - O(1) (обратное направление - d ^ 1), миллион ходов занимает
+# 250 КБ. Каждые checkpoint_every ходов запоминается доска, так что любая
+# промежуточная позиция восстанавливается проигрыванием не больше
+# checkpoint_every ходов от ближайшей контрольной точки.
+#
+# Формат файла: MAGIC, заголовок HEADER (rows, cols, checkpoint_every,
+# число ходов, текущий ход), начальная доска (байт на клетку), ходы.
+# Контрольные точки не сохраняются - они пересчитываются при загрузке.
+import struct
+
+from tag import SlidingPuzzle, UP, DOWN, LEFT, RIGHT
+
+MAGIC = b'PJRNL001'
+HEADER = struct.Struct('<HHIQQ')
+DEFAULT_CHECKPOINT_EVERY = 1024
+
+
+class MoveJournal:
+    # puzzle - игра (SlidingPuzzle или её наследник), ходы которой
+    # записываются; ходы делаются через journal.move, а не puzzle.move
+    def __init__(self, puzzle, checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every должен быть положительным")
+        self.puzzle = puzzle
+        self.rows = puzzle.rows
+        self.cols = puzzle.cols
+        self.checkpoint_every = checkpoint_every
+        self.start = list(puzzle.tiles)
+        self._deltas = (-self.cols, self.cols, -1, 1)
+        self._directions = {-self.cols: UP, self.cols: DOWN, -1: LEFT, 1: RIGHT}
+        self._moves = bytearray()
+        # length - записано ходов (включая отменённые, доступные для повтора),
+        # cursor - сколько из них сейчас сделано
+        self.length = 0
+        self.cursor = 0
+        # _checkpoints[i] - доска после i * checkpoint_every ходов
+        self._checkpoints = [bytes(self.start)]
+
+    def __len__(self):
+        return self.length
+
+    # Направление хода номер index (с нуля)
+    def direction(self, index):
+        if not 0 <= index < self.length:
+            raise IndexError("нет хода с таким номером")
+        return (self._moves[index >> 2] >> ((index & 3) * 2)) & 3
+
+    def directions(self):
+        moves = self._moves
+        for index in range(self.length):
+            yield (moves[index >> 2] >> ((index & 3) * 2)) & 3
+
+    def _write(self, index, direction):
+        byte = index >> 2
+        if byte == len(self._moves):
+            self._moves.append(0)
+        shift = (index & 3) * 2
+        self._moves[byte] = (self._moves[byte] & ~(3 << shift)) | (direction << shift)
+
+    # Сдвиг пустой клетки игры в направлении direction
+    def _step(self, direction):
+        pos = self.puzzle.blank + self._deltas[direction]
+        if not self.puzzle.move(pos // self.cols + 1, pos % self.cols + 1):
+            raise ValueError("журнал не соответствует доске")
+
+    # Ход как в SlidingPuzzle.move (координаты с 1); успешный ход
+    # записывается, а отменённые ходы после текущего отбрасываются
+    def move(self, row, col):
+        blank = self.puzzle.blank
+        if not self.puzzle.move(row, col):
+            return False
+        direction = self._directions[(row - 1) * self.cols + col - 1 - blank]
+        if self.cursor < self.length:
+            self.length = self.cursor
+            del self._moves[(self.length + 3) >> 2:]
+            del self._checkpoints[self.length // self.checkpoint_every + 1:]
+        self._write(self.cursor, direction)
+        self.cursor += 1
+        self.length = self.cursor
+        if self.cursor % self.checkpoint_every == 0:
+            self._checkpoints.append(bytes(self.puzzle.tiles))
+        return True
+
+    def undo(self):
+        if self.cursor == 0:
+            return False
+        self.cursor -= 1
+        self._step(self.direction(self.cursor) ^ 1)
+        return True
+
+    def redo(self):
+        if self.cursor == self.length:
+            return False
+        self._step(self.direction(self.cursor))
+        self.cursor += 1
+        return True
+
+    # Плитки после первых index ходов: ближайшая контрольная точка и
+    # проигрывание остатка на плоском списке
+    def position_at(self, index):
+        if not 0 <= index <= self.length:
+            raise IndexError("нет позиции с таким номером")
+        checkpoint = min(index // self.checkpoint_every, len(self._checkpoints) - 1)
+        tiles = list(self._checkpoints[checkpoint])
+        blank = tiles.index(0)
+        deltas = self._deltas
+        moves = self._moves
+        for i in range(checkpoint * self.checkpoint_every, index):
+            pos = blank + deltas[(moves[i >> 2] >> ((i & 3) * 2)) & 3]
+            tiles[blank] = tiles[pos]
+            tiles[pos] = 0
+            blank = pos
+        return tiles
+
+    # Переход игры к позиции после index ходов (отмена / повтор сразу
+    # нескольких ходов)
+    def seek(self, index):
+        tiles = self.position_at(index)
+        cols = self.cols
+        self.puzzle.board = [tiles[i * cols:(i + 1) * cols] for i in range(self.rows)]
+        self.cursor = index
+
+    # Пересчёт контрольных точек по записанным ходам
+    def _rebuild_checkpoints(self):
+        self._checkpoints = [bytes(self.start)]
+        every = self.checkpoint_every
+        tiles = list(self.start)
+        blank = tiles.index(0)
+        deltas = self._deltas
+        for i, direction in enumerate(self.directions(), 1):
+            pos = blank + deltas[direction]
+            tiles[blank] = tiles[pos]
+            tiles[pos] = 0
+            blank = pos
+            if i % every == 0:
+                self._checkpoints.append(bytes(tiles))
+
+    def to_bytes(self):
+        header = HEADER.pack(self.rows, self.cols, self.checkpoint_every,
+                             self.length, self.cursor)
+        return MAGIC + header + bytes(self.start) + bytes(self._moves[:(self.length + 3) >> 2])
+
+    # Восстановление партии: новая игра на начальной доске журнала,
+    # ходы проигрываются до сохранённого текущего хода. puzzle_factory
+    # вызывается как puzzle_factory(rows=..., cols=..., scramble_on_init=False)
+    @classmethod
+    def from_bytes(cls, data, puzzle_factory=SlidingPuzzle):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("не журнал ходов")
+        rows, cols, every, length, cursor = HEADER.unpack_from(data, len(MAGIC))
+        offset = len(MAGIC) + HEADER.size
+        size = rows * cols
+        moves = data[offset + size:]
+        if len(moves) != (length + 3) >> 2 or cursor > length:
+            raise ValueError("журнал ходов повреждён")
+        puzzle = puzzle_factory(rows=rows, cols=cols, scramble_on_init=False)
+        start = list(data[offset:offset + size])
+        puzzle.board = [start[i * cols:(i + 1) * cols] for i in range(rows)]
+        journal = cls(puzzle, every)
+        journal._moves = bytearray(moves)
+        journal.length = length
+        journal._rebuild_checkpoints()
+        journal.seek(cursor)
+        return journal
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path, puzzle_factory=SlidingPuzzle):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read(), puzzle_factory)
@@ -0,0 +1,133 @@
+# packed.py
+# Упакованное представление доски 4x4: одно 64-битное целое, по 4 бита
+# на клетку (клетка pos - биты 4*pos..4*pos+3), плюс позиция пустой
+# клетки, которая хранится отдельно и не ищется перебором.
+# Ход - одна операция XOR, проверка решения - сравнение целых,
+# а само число годится как хешируемый ключ для решателей и кэшей.
+import random
+
+from tag import BoardRow, FifteenPuzzle, neighbour_table, random_solvable_tiles
+
+SIZE = 4
+CELLS = SIZE * SIZE
+MASK = 0xF
+# Решённая доска: 1..15, пустая клетка последней
+GOAL = sum(((pos + 1) % CELLS) << (4 * pos) for pos in range(CELLS))
+
+# Соседи каждой клетки (клетки, плитки из которых можно сдвинуть в неё)
+NEIGHBOURS = neighbour_table(SIZE, SIZE)
+
+
+# Плоский список плиток -> упакованное число
+def pack(tiles):
+    state = 0
+    for pos, tile in enumerate(tiles):
+        state |= tile << (4 * pos)
+    return state
+
+
+# Упакованное число -> плоский список плиток
+def unpack(state):
+    return [(state >> (4 * pos)) & MASK for pos in range(CELLS)]
+
+
+# Позиция пустой клетки (нужна только при загрузке доски)
+def find_blank(state):
+    for pos in range(CELLS):
+        if not (state >> (4 * pos)) & MASK:
+            return pos
+    raise ValueError("на доске нет пустой клетки")
+
+
+# Сдвиг плитки из клетки pos в пустую клетку blank: пустая клетка
+# содержит 0, поэтому достаточно одного XOR
+def slide(state, blank, pos):
+    tile = (state >> (4 * pos)) & MASK
+    return state ^ (tile << (4 * pos)) ^ (tile << (4 * blank))
+
+
+class PackedFifteenPuzzle(FifteenPuzzle):
+    # Та же игра, что FifteenPuzzle, но на упакованной доске.
+    # board - строки BoardRow поверх упакованного числа: запись в клетку
+    # board[r][c] меняет state, присваивание board перепаковывает доску
+    def __init__(self, scramble_on_init=True, seed=None, *, rows=SIZE, cols=SIZE):
+        if (rows, cols) != (SIZE, SIZE):
+            raise ValueError("упакованная доска - только 4x4")
+        self.rows = self.cols = SIZE
+        self.size = CELLS
+        self.neighbours = NEIGHBOURS
+        self.state = GOAL
+        self.blank = CELLS - 1
+        self.rng = random.Random(seed)
+        if scramble_on_init:
+            self.scramble()
+
+    @property
+    def board(self):
+        return [BoardRow(self, i) for i in range(SIZE)]
+
+    @board.setter
+    def board(self, rows):
+        self.state = pack([num for row in rows for num in row])
+        self.blank = find_blank(self.state)
+
+    @property
+    def tiles(self):
+        return unpack(self.state)
+
+    # Ключ позиции для словарей и кэшей
+    def key(self):
+        return self.state
+
+    def scramble(self, moves=1000, uniform=False):
+        if uniform:
+            self.state = pack(random_solvable_tiles(self.rng))
+            self.blank = find_blank(self.state)
+            return
+        state = self.state
+        blank = self.blank
+        choice = self.rng.choice
+        for _ in range(moves):
+            pos = choice(NEIGHBOURS[blank])
+            state = slide(state, blank, pos)
+            blank = pos
+        self.state = state
+        self.blank = blank
+
+    def find_empty_pos(self):
+        return divmod(self.blank, SIZE)
+
+    def move(self, row, col):
+        # Те же правила, что у FifteenPuzzle.move: координаты 1..4,
+        # неверный ввод и невозможный ход - False
+        if not isinstance(row, int) or not isinstance(col, int):
+            return False
+        if row < 1 or row > SIZE or col < 1 or col > SIZE:
+            return False
+        pos = (row - 1) * SIZE + col - 1
+        if pos not in NEIGHBOURS[self.blank]:
+            return False
+        self.state = slide(self.state, self.blank, pos)
+        self.blank = pos
+        return True
+
+    def is_solved(self):
+        return self.state == GOAL
+
+    def get_item(self, index):
+        i, j = index
+        return (self.state >> (4 * (i * SIZE + j))) & MASK
+
+    # Запись плитки в клетку, пустая клетка - как в SlidingPuzzle.set_item
+    def set_item(self, index, value):
+        i, j = index
+        pos = i * SIZE + j
+        shift = 4 * pos
+        self.state = (self.state & ~(MASK << shift)) | (value << shift)
+        if value == 0:
+            self.blank = pos
+        elif pos == self.blank:
+            try:
+                self.blank = find_blank(self.state)
+            except ValueError:
+                pass
@@ -0,0 +1,253 @@
+# pattern_db.py
+# Аддитивные базы шаблонов (pattern databases) для решателя пятнашек.
+# Плитки делятся на непересекающиеся группы; для каждой группы заранее
+# поиском в ширину считается, за сколько ходов плиток группы их можно
+# поставить на места (ходы остальных плиток не считаются). Сумма по
+# группам - допустимая оценка, не слабее манхэттенского расстояния.
+#
+# Файл базы: MAGIC, длина заголовка (uint32), заголовок JSON (размеры
+# доски, группы, смещения таблиц), затем таблицы - по байту на состояние.
+# Состояние группы из k плиток кодируется как sum(pos_i * N^(k-1-i)),
+# N = rows*cols, так что ход плитки меняет индекс прибавлением константы.
+# База открывается через mmap: несколько процессов-решателей делят одну
+# копию в page cache.
+import json
+import mmap
+import struct
+import sys
+import time
+
+from solver import IDAStarSolver, SearchBudgetExceeded, is_solvable
+
+MAGIC = b'PDB15v1\0'
+HEADER = struct.Struct('<I')
+UNKNOWN = 0xFF
+
+# Разбиение Корфа-Фелнера 6-6-3 и более быстрое в построении 5-5-5
+GROUPS_663 = ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))
+GROUPS_555 = ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15))
+
+
+def _neighbours(rows, cols):
+    result = []
+    for pos in range(rows * cols):
+        r, c = divmod(pos, cols)
+        result.append(tuple(p for p, ok in ((pos - cols, r > 0), (pos + cols, r < rows - 1),
+                                            (pos - 1, c > 0), (pos + 1, c < cols - 1)) if ok))
+    return result
+
+
+# Таблица расстояний одной группы. Поиск 0-1 BFS от цели по состояниям
+# (позиции плиток группы, позиция пустой клетки): ход чужой плитки - это
+# бесплатное перемещение пустой клетки, ход плитки группы стоит 1.
+# В таблицу идёт минимум по позициям пустой клетки
+def build_group_table(tiles, rows=4, cols=4):
+    size = rows * cols
+    k = len(tiles)
+    # Индекс состояния: позиции плиток старшими разрядами, пустая - младшим
+    weights = [size ** (k - i) for i in range(k)]
+    neighbours = _neighbours(rows, cols)
+    dist = bytearray([UNKNOWN]) * (size ** (k + 1))
+    start = sum((tile - 1) * weight for tile, weight in zip(tiles, weights)) + size - 1
+    dist[start] = 0
+    level = [start]
+    depth = 0
+    while level:
+        next_level = []
+        i = 0
+        while i < len(level):
+            state = level[i]
+            i += 1
+            if dist[state] != depth:
+                continue
+            blank = state % size
+            positions = [(state // weight) % size for weight in weights]
+            for target in neighbours[blank]:
+                if target in positions:
+                    # Плитка группы сдвигается в пустую клетку - стоит 1 ход
+                    tile = positions.index(target)
+                    moved = state + (blank - target) * weights[tile] + target - blank
+                    if dist[moved] > depth + 1:
+                        dist[moved] = depth + 1
+                        next_level.append(moved)
+                else:
+                    moved = state + target - blank
+                    if dist[moved] > depth:
+                        dist[moved] = depth
+                        level.append(moved)
+        level = next_level
+        depth += 1
+
+    table = bytearray([UNKNOWN]) * (size ** k)
+    for index in range(len(table)):
+        table[index] = min(dist[index * size:(index + 1) * size])
+    return table
+
+
+def _check_groups(groups, rows, cols):
+    tiles = sorted(tile for group in groups for tile in group)
+    if tiles != list(range(1, rows * cols)):
+        raise ValueError("группы должны разбивать плитки 1..%d без повторов" % (rows * cols - 1))
+
+
+# Построение базы и запись в файл (делается один раз, офлайн)
+def build_pattern_database(path, groups=GROUPS_663, rows=4, cols=4, verbose=False):
+    groups = [tuple(group) for group in groups]
+    _check_groups(groups, rows, cols)
+    tables = []
+    for group in groups:
+        started = time.perf_counter()
+        tables.append(build_group_table(group, rows, cols))
+        if verbose:
+            print(f"Группа {group}: {len(tables[-1])} состояний, "
+                  f"{time.perf_counter() - started:.1f} с")
+    offsets = []
+    offset = 0
+    for table in tables:
+        offsets.append(offset)
+        offset += len(table)
+    header = json.dumps({'rows': rows, 'cols': cols, 'groups': groups,
+                         'offsets': offsets}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(MAGIC + HEADER.pack(len(header)) + header)
+        for table in tables:
+            f.write(table)
+
+
+class PatternDatabase:
+    # База, открытая через mmap только для чтения
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path}: не база шаблонов")
+        (size,) = HEADER.unpack_from(self._mmap, len(MAGIC))
+        start = len(MAGIC) + HEADER.size
+        header = json.loads(self._mmap[start:start + size].decode('utf-8'))
+        data = start + size
+        self.rows = header['rows']
+        self.cols = header['cols']
+        self.groups = [tuple(group) for group in header['groups']]
+        board = self.rows * self.cols
+        self.tables = []
+        view = memoryview(self._mmap)
+        for group, offset in zip(self.groups, header['offsets']):
+            length = board ** len(group)
+            self.tables.append(view[data + offset:data + offset + length])
+        # Для каждой плитки: номер группы и вес её позиции в индексе группы
+        self.group_of = [-1] * board
+        self.weight_of = [0] * board
+        for g, group in enumerate(self.groups):
+            for i, tile in enumerate(group):
+                self.group_of[tile] = g
+                self.weight_of[tile] = board ** (len(group) - 1 - i)
+
+    # Индексы состояний групп для доски
+    def indices(self, tiles):
+        result = [0] * len(self.groups)
+        for pos, tile in enumerate(tiles):
+            if tile:
+                result[self.group_of[tile]] += pos * self.weight_of[tile]
+        return result
+
+    def heuristic(self, tiles):
+        return sum(table[index] for table, index in zip(self.tables, self.indices(tiles)))
+
+    def close(self):
+        for table in self.tables:
+            table.release()
+        self.tables = []
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PatternDatabaseSolver(IDAStarSolver):
+    # IDA* с аддитивной базой шаблонов вместо манхэттена и конфликтов.
+    # При ходе меняется индекс только группы сдвинутой плитки
+    def __init__(self, database):
+        super().__init__(database.rows, database.cols)
+        self.database = database
+
+    def heuristic(self, tiles):
+        return self.database.heuristic(tiles)
+
+    def solve(self, tiles, max_nodes=None, max_time=None):
+        board = list(tiles)
+        if len(board) != self.size or sorted(board) != list(range(self.size)):
+            raise ValueError("доска должна содержать числа 0..%d" % (self.size - 1))
+        if not is_solvable(board, self.rows, self.cols):
+            return None
+
+        neighbours = self.neighbours
+        tables = self.database.tables
+        group_of = self.database.group_of
+        weight_of = self.database.weight_of
+        index = self.database.indices(board)
+        path = []
+        deadline = time.perf_counter() + max_time if max_time is not None else None
+        self.nodes = 0
+        found = -1
+
+        def search(blank, g, h, prev, bound):
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                return found
+            self.nodes += 1
+            if max_nodes is not None and self.nodes > max_nodes:
+                raise SearchBudgetExceeded(f"превышен лимит {max_nodes} узлов")
+            if deadline is not None and not self.nodes & 0xFFF \
+                    and time.perf_counter() > deadline:
+                raise SearchBudgetExceeded(f"превышен лимит {max_time} с")
+            minimum = 1 << 30
+            for pos in neighbours[blank]:
+                if pos == prev:
+                    continue
+                tile = board[pos]
+                group = group_of[tile]
+                table = tables[group]
+                old = index[group]
+                new = old + (blank - pos) * weight_of[tile]
+                index[group] = new
+                board[blank] = tile
+                board[pos] = 0
+                path.append(pos)
+                result = search(pos, g + 1, h - table[old] + table[new], blank, bound)
+                if result == found:
+                    return found
+                path.pop()
+                board[pos] = tile
+                board[blank] = 0
+                index[group] = old
+                if result < minimum:
+                    minimum = result
+            return minimum
+
+        blank = board.index(0)
+        h = self.heuristic(board)
+        bound = h
+        while True:
+            result = search(blank, 0, h, -1, bound)
+            if result == found:
+                return path
+            bound = result
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Использование: python pattern_db.py <файл_базы> [6-6-3|5-5-5]")
+        sys.exit(1)
+    groups = GROUPS_555 if len(sys.argv) > 2 and sys.argv[2] == '5-5-5' else GROUPS_663
+    build_pattern_database(sys.argv[1], groups, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
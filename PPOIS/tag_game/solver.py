@@ -0,0 +1,193 @@
+# solver.py
+# Оптимальный решатель пятнашек: IDA* с эвристикой
+# "манхэттенское расстояние + линейные конфликты".
+# Доска - плоский список длины rows*cols, 0 - пустая клетка,
+# цель - 1, 2, ..., rows*cols-1, 0.
+import time
+
+
+class SearchBudgetExceeded(Exception):
+    # Поиск прерван по лимиту узлов или времени
+    pass
+
+
+# Чётность перестановки: решаема ли доска (стандартная проверка инверсий
+# и строки пустой клетки)
+def is_solvable(tiles, rows=4, cols=4):
+    numbers = [t for t in tiles if t]
+    inversions = 0
+    for i in range(len(numbers)):
+        for j in range(i + 1, len(numbers)):
+            if numbers[i] > numbers[j]:
+                inversions += 1
+    if cols % 2 == 1:
+        return inversions % 2 == 0
+    blank_row_from_bottom = rows - tiles.index(0) // cols
+    return (inversions + blank_row_from_bottom) % 2 == 1
+
+
+class IDAStarSolver:
+    # Таблицы (расстояния, соседи клеток, кэш конфликтов линий) строятся
+    # один раз на размер доски; сам поиск меняет доску на месте и не
+    # создаёт объектов на каждый узел
+    def __init__(self, rows=4, cols=4):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        size = self.size
+        # manhattan[tile * size + pos] - расстояние плитки tile от цели
+        self.manhattan = [0] * (size * size)
+        for tile in range(1, size):
+            goal = tile - 1
+            for pos in range(size):
+                self.manhattan[tile * size + pos] = \
+                    abs(goal // cols - pos // cols) + abs(goal % cols - pos % cols)
+        self.neighbours = []
+        for pos in range(size):
+            r, c = divmod(pos, cols)
+            near = []
+            if r > 0:
+                near.append(pos - cols)
+            if r < rows - 1:
+                near.append(pos + cols)
+            if c > 0:
+                near.append(pos - 1)
+            if c < cols - 1:
+                near.append(pos + 1)
+            self.neighbours.append(tuple(near))
+        # Линии: сначала строки, потом столбцы - клетки каждой линии
+        self.lines = [tuple(range(r * cols, (r + 1) * cols)) for r in range(rows)] + \
+                     [tuple(range(c, size, cols)) for c in range(cols)]
+        self.row_line = [pos // cols for pos in range(size)]
+        self.col_line = [rows + pos % cols for pos in range(size)]
+        # Кэш конфликтов - свой словарь на каждую линию: ключ - плитки линии
+        # по основанию size, у строк и столбцов разной длины общие ключи
+        # означали бы разные линии
+        self._line_cache = [{} for _ in self.lines]
+        self.nodes = 0
+
+    # Штраф линейных конфликтов линии: 2 * (сколько плиток линии, стоящих
+    # в своей целевой линии, надо убрать, чтобы остальные шли по порядку)
+    def _line_conflict(self, board, line):
+        cells = self.lines[line]
+        cache = self._line_cache[line]
+        key = 0
+        for pos in cells:
+            key = key * self.size + board[pos]
+        cost = cache.get(key)
+        if cost is None:
+            is_row = line < self.rows
+            order = []
+            for pos in cells:
+                tile = board[pos]
+                if not tile:
+                    continue
+                goal = tile - 1
+                if is_row and goal // self.cols == line:
+                    order.append(goal % self.cols)
+                elif not is_row and goal % self.cols == line - self.rows:
+                    order.append(goal // self.cols)
+            # Длина наибольшей возрастающей подпоследовательности
+            best = [1] * len(order)
+            for i in range(len(order)):
+                for j in range(i):
+                    if order[j] < order[i] and best[j] + 1 > best[i]:
+                        best[i] = best[j] + 1
+            cost = 2 * (len(order) - max(best, default=0))
+            cache[key] = cost
+        return cost
+
+    def heuristic(self, tiles):
+        size = self.size
+        h = sum(self.manhattan[tile * size + pos] for pos, tile in enumerate(tiles) if tile)
+        return h + sum(self._line_conflict(tiles, line) for line in range(len(self.lines)))
+
+    # Оптимальное решение: список позиций плиток (индексов в tiles), которые
+    # по очереди сдвигаются в пустую клетку; None - доска нерешаема.
+    # max_nodes / max_time - бюджет поиска, при превышении SearchBudgetExceeded
+    def solve(self, tiles, max_nodes=None, max_time=None):
+        board = list(tiles)
+        if len(board) != self.size or sorted(board) != list(range(self.size)):
+            raise ValueError("доска должна содержать числа 0..%d" % (self.size - 1))
+        if not is_solvable(board, self.rows, self.cols):
+            return None
+
+        size = self.size
+        manhattan = self.manhattan
+        neighbours = self.neighbours
+        row_line = self.row_line
+        col_line = self.col_line
+        line_conflict = self._line_conflict
+        line_cost = [line_conflict(board, line) for line in range(len(self.lines))]
+        path = []
+        deadline = time.perf_counter() + max_time if max_time is not None else None
+        self.nodes = 0
+        found = -1
+
+        def search(blank, g, h, prev, bound):
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                return found
+            self.nodes += 1
+            if max_nodes is not None and self.nodes > max_nodes:
+                raise SearchBudgetExceeded(f"превышен лимит {max_nodes} узлов")
+            if deadline is not None and not self.nodes & 0xFFF \
+                    and time.perf_counter() > deadline:
+                raise SearchBudgetExceeded(f"превышен лимит {max_time} с")
+            minimum = 1 << 30
+            for pos in neighbours[blank]:
+                if pos == prev:
+                    continue
+                tile = board[pos]
+                # Вертикальный ход меняет строки, горизонтальный - столбцы
+                if row_line[pos] != row_line[blank]:
+                    first, second = row_line[pos], row_line[blank]
+                else:
+                    first, second = col_line[pos], col_line[blank]
+                old_first, old_second = line_cost[first], line_cost[second]
+                board[blank] = tile
+                board[pos] = 0
+                new_first = line_conflict(board, first)
+                new_second = line_conflict(board, second)
+                line_cost[first] = new_first
+                line_cost[second] = new_second
+                new_h = (h + manhattan[tile * size + blank] - manhattan[tile * size + pos]
+                         + new_first + new_second - old_first - old_second)
+                path.append(pos)
+                result = search(pos, g + 1, new_h, blank, bound)
+                if result == found:
+                    return found
+                path.pop()
+                line_cost[first] = old_first
+                line_cost[second] = old_second
+                board[pos] = tile
+                board[blank] = 0
+                if result < minimum:
+                    minimum = result
+            return minimum
+
+        blank = board.index(0)
+        h = self.heuristic(board)
+        bound = h
+        while True:
+            result = search(blank, 0, h, -1, bound)
+            if result == found:
+                return path
+            bound = result
+
+
+_solvers = {}
+
+
+# Общий решатель для размера доски (таблицы строятся один раз)
+def get_solver(rows=4, cols=4):
+    solver = _solvers.get((rows, cols))
+    if solver is None:
+        solver = _solvers[(rows, cols)] = IDAStarSolver(rows, cols)
+    return solver
+
+
+def solve(tiles, rows=4, cols=4, max_nodes=None, max_time=None):
+    return get_solver(rows, cols).solve(tiles, max_nodes, max_time)
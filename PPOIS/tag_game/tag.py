@@ -1,119 +1,254 @@
 # tag.py
 import random
 
-class FifteenPuzzle:
-    def __init__(self, scramble_on_init=True):
-        # создаём упорядоченную доску 4x4 с 0 в правом-нижнем углу
-        self.board = [[(i * 4 + j + 1) % 16 for j in range(4)] for i in range(4)]
+
+# Чётность перестановки доски за O(n) через разложение на циклы.
+# Пустая клетка считается плиткой rows*cols, её цель - последняя клетка
+def _permutation_parity(tiles):
+    n = len(tiles)
+    seen = [False] * n
+    parity = 0
+    for start in range(n):
+        pos = start
+        length = 0
+        while not seen[pos]:
+            seen[pos] = True
+            pos = (tiles[pos] - 1) % n
+            length += 1
+        if length:
+            parity ^= (length - 1) & 1
+    return parity
+
+
+# Случайная решаемая доска (плоский список), равномерно по всем решаемым
+# позициям: случайная перестановка, а если она нерешаема - обмен двух
+# плиток, не задевающий пустую клетку. Доска решаема, когда чётность
+# перестановки совпадает с чётностью расстояния пустой клетки до угла
+def random_solvable_tiles(rng=random, rows=4, cols=4):
+    tiles = list(range(rows * cols))
+    rng.shuffle(tiles)
+    blank = tiles.index(0)
+    distance = (rows - 1 - blank // cols) + (cols - 1 - blank % cols)
+    if _permutation_parity(tiles) != distance % 2:
+        first, second = (0, 1) if blank > 1 else (2, 3)
+        tiles[first], tiles[second] = tiles[second], tiles[first]
+    return tiles
+
+
+# Направления хода пустой клетки (противоположное направление - d ^ 1)
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+
+_neighbour_tables = {}
+
+
+# Соседи каждой клетки доски rows x cols (строится один раз на размер)
+def neighbour_table(rows, cols):
+    table = _neighbour_tables.get((rows, cols))
+    if table is None:
+        table = []
+        for pos in range(rows * cols):
+            r, c = divmod(pos, cols)
+            table.append(tuple(p for p, ok in ((pos - cols, r > 0), (pos + cols, r < rows - 1),
+                                               (pos - 1, c > 0), (pos + 1, c < cols - 1)) if ok))
+        table = _neighbour_tables[(rows, cols)] = tuple(table)
+    return table
+
+
+# Поток случайных решаемых досок для тестовых корпусов (кортежи плиток)
+def generate_boards(count, seed=None, rows=4, cols=4):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield tuple(random_solvable_tiles(rng, rows, cols))
+
+
+class BoardRow:
+    # Строка доски - вид на клетки игры, а не копия: чтение и запись
+    # board[r][c] идут через get_item/set_item, так что запись меняет доску
+    # и позицию пустой клетки. Срез строки - обычный список (копия)
+    __slots__ = ('_game', '_row')
+
+    def __init__(self, game, row):
+        self._game = game
+        self._row = row
+
+    def __len__(self):
+        return self._game.cols
+
+    def _col(self, col):
+        cols = self._game.cols
+        if not -cols <= col < cols:
+            raise IndexError("номер столбца вне доски")
+        return col % cols
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[c] for c in range(*col.indices(len(self)))]
+        return self._game.get_item((self._row, self._col(col)))
+
+    def __setitem__(self, col, value):
+        self._game.set_item((self._row, self._col(col)), value)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __eq__(self, other):
+        try:
+            return self[:] == list(other)
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self[:])
+
+
+class SlidingPuzzle:
+    # Головоломка rows x cols. Доска хранится плоским списком tiles,
+    # позиция пустой клетки - в blank, соседи клеток берутся из общей
+    # таблицы, так что ход и поиск пустой клетки не перебирают доску.
+    # seed - зерно генератора случайных чисел для воспроизводимого перемешивания
+    def __init__(self, rows=4, cols=4, scramble_on_init=True, seed=None):
+        if rows < 2 or cols < 2:
+            raise ValueError("доска должна быть не меньше 2x2")
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.neighbours = neighbour_table(rows, cols)
+        # упорядоченная доска с 0 в правом-нижнем углу
+        self.goal = [(pos + 1) % self.size for pos in range(self.size)]
+        self.tiles = self.goal[:]
+        self.blank = self.size - 1
+        self.rng = random.Random(seed)
         if scramble_on_init:
             self.scramble()
 
-    def scramble(self):
+    # Доска в виде списка строк BoardRow: board[r][c] = x меняет клетку
+    # игры; присваивание board заменяет всю доску
+    @property
+    def board(self):
+        return [BoardRow(self, i) for i in range(self.rows)]
+
+    @board.setter
+    def board(self, rows):
+        tiles = [num for row in rows for num in row]
+        if len(tiles) != self.size:
+            raise ValueError(f"доска должна быть {self.rows}x{self.cols}")
+        self.tiles = tiles
+        self.blank = tiles.index(0)
+
+    # moves - число случайных ходов; uniform=True - равномерно случайная
+    # решаемая позиция за O(rows*cols) вместо случайных ходов
+    def scramble(self, moves=1000, uniform=False):
+        if uniform:
+            self.tiles = random_solvable_tiles(self.rng, self.rows, self.cols)
+            self.blank = self.tiles.index(0)
+            return
         # простая перестановка путём случайных легальных ходов — сохраняет набор чисел
-        for _ in range(1000):
-            empty_row, empty_col = self.find_empty_pos()
-            directions = []
-            if empty_col > 0:
-                directions.append('left')
-            if empty_col < 3:
-                directions.append('right')
-            if empty_row > 0:
-                directions.append('up')
-            if empty_row < 3:
-                directions.append('down')
-            choice = random.choice(directions)
-            if choice == 'up':
-                # переместить верхнюю плитку вниз (в пустую)
-                self.board[empty_row][empty_col], self.board[empty_row-1][empty_col] = \
-                    self.board[empty_row-1][empty_col], self.board[empty_row][empty_col]
-            elif choice == 'down':
-                self.board[empty_row][empty_col], self.board[empty_row+1][empty_col] = \
-                    self.board[empty_row+1][empty_col], self.board[empty_row][empty_col]
-            elif choice == 'left':
-                self.board[empty_row][empty_col], self.board[empty_row][empty_col-1] = \
-                    self.board[empty_row][empty_col-1], self.board[empty_row][empty_col]
-            elif choice == 'right':
-                self.board[empty_row][empty_col], self.board[empty_row][empty_col+1] = \
-                    self.board[empty_row][empty_col+1], self.board[empty_row][empty_col]
+        tiles = self.tiles
+        blank = self.blank
+        neighbours = self.neighbours
+        choice = self.rng.choice
+        for _ in range(moves):
+            pos = choice(neighbours[blank])
+            tiles[blank], tiles[pos] = tiles[pos], 0
+            blank = pos
+        self.blank = blank
 
     def find_empty_pos(self):
-        for i in range(4):
-            for j in range(4):
-                if self.board[i][j] == 0:
-                    return i, j
-        # на всякий случай (не должно случаться) — возвращаем (3,3)
-        return 3, 3
+        return divmod(self.blank, self.cols)
 
     def move(self, row, col):
-        # Метод ожидает координаты в формате 1..4 (как в тестах).
+        # Метод ожидает координаты в формате 1..rows, 1..cols (как в тестах).
         # Возвращает True при успешном ходе, False — если ход невозможен / вход неверен.
 
         # Проверка типов — тесты ожидают, что при неверном вводе просто вернётся False
         if not isinstance(row, int) or not isinstance(col, int):
             return False
 
-        # Проверка границ в 1..4 (тесты проверяют, что 0 и 5 -> False)
-        if row < 1 or row > 4 or col < 1 or col > 4:
+        # Проверка границ (для 4x4 тесты проверяют, что 0 и 5 -> False)
+        if row < 1 or row > self.rows or col < 1 or col > self.cols:
             return False
 
-        # Переводим в индексы Python 0..3
-        r = row - 1
-        c = col - 1
-
-        # Нельзя "перемещать" пустую плитку
-        if self.board[r][c] == 0:
+        # Ход возможен, только если плитка соседствует с пустой клеткой;
+        # сама пустая клетка соседом себе не считается
+        pos = (row - 1) * self.cols + col - 1
+        if pos not in self.neighbours[self.blank]:
             return False
-
-        # Проверяем соседние клетки: если рядом 0 — меняем местами и возвращаем True
-        # вверх
-        if r > 0 and self.board[r-1][c] == 0:
-            self.board[r-1][c], self.board[r][c] = self.board[r][c], 0
-            return True
-        # вниз
-        if r < 3 and self.board[r+1][c] == 0:
-            self.board[r+1][c], self.board[r][c] = self.board[r][c], 0
-            return True
-        # влево
-        if c > 0 and self.board[r][c-1] == 0:
-            self.board[r][c-1], self.board[r][c] = self.board[r][c], 0
-            return True
-        # вправо
-        if c < 3 and self.board[r][c+1] == 0:
-            self.board[r][c+1], self.board[r][c] = self.board[r][c], 0
-            return True
-
-        # Никакой соседней пустой клетки — ход невозможен
-        return False
+        self.tiles[self.blank] = self.tiles[pos]
+        self.tiles[pos] = 0
+        self.blank = pos
+        return True
 
     def is_solved(self):
-        num = 1
-        for i in range(4):
-            for j in range(4):
-                if i == 3 and j == 3:
-                    if self.board[i][j] != 0:
-                        return False
-                else:
-                    if self.board[i][j] != num:
-                        return False
-                    num += 1
-        return True
+        return self.tiles == self.goal
+
+    # Оптимальное решение из текущей позиции: список координат (строка, столбец)
+    # в формате 1..rows, 1..cols - плитки, которые по очереди передаются в move().
+    # None - позиция нерешаема. database - открытая pattern_db.PatternDatabase
+    # того же размера для трудных позиций
+    def solve(self, max_nodes=None, max_time=None, database=None):
+        from solver import solve
+        if database is not None:
+            from pattern_db import PatternDatabaseSolver
+            if (database.rows, database.cols) != (self.rows, self.cols):
+                raise ValueError(f"база построена для доски {database.rows}x{database.cols}")
+            path = PatternDatabaseSolver(database).solve(self.tiles, max_nodes, max_time)
+        else:
+            path = solve(self.tiles, self.rows, self.cols, max_nodes, max_time)
+        if path is None:
+            return None
+        return [(pos // self.cols + 1, pos % self.cols + 1) for pos in path]
+
+    # Подсказка: следующий ход оптимального решения или None.
+    # cache - hint_cache.SolutionCache того же размера: повторные подсказки
+    # с позиций уже найденного пути не вызывают решатель
+    def hint(self, cache=None):
+        if cache is None:
+            path = self.solve()
+            return path[0] if path else None
+        pos = cache.hint(self.tiles)
+        return None if pos is None else (pos // self.cols + 1, pos % self.cols + 1)
 
     def get_item(self, index):
         i, j = index
-        return self.board[i][j]
+        return self.tiles[i * self.cols + j]
+
+    # Запись плитки в клетку (строка, столбец) с 0 - пустая клетка.
+    # Пустая клетка переезжает туда, куда записан 0; если затёрта
+    # единственная пустая клетка, blank указывает на неё, пока 0 не
+    # будет записан снова (обмен двух клеток board[..][..])
+    def set_item(self, index, value):
+        i, j = index
+        pos = i * self.cols + j
+        self.tiles[pos] = value
+        if value == 0:
+            self.blank = pos
+        elif pos == self.blank and 0 in self.tiles:
+            self.blank = self.tiles.index(0)
 
     def __str__(self):
+        width = max(2, len(str(self.size - 1)))
         s = ''
-        for i in range(4):
-            for j in range(4):
-                if self.board[i][j] == 0:
-                    s += '   '
+        for row in self.board:
+            for num in row:
+                if num == 0:
+                    s += ' ' * (width + 1)
                 else:
-                    s += f'{self.board[i][j]:2d} '
+                    s += f'{num:{width}d} '
             s += '\n'
         return s
 
 
+class FifteenPuzzle(SlidingPuzzle):
+    # Классические пятнашки 4x4. rows и cols принимаются, чтобы класс
+    # годился фабрикой игр с размером доски (journal.MoveJournal.from_bytes)
+    def __init__(self, scramble_on_init=True, seed=None, *, rows=4, cols=4):
+        if (rows, cols) != (4, 4):
+            raise ValueError("пятнашки - только доска 4x4")
+        super().__init__(4, 4, scramble_on_init, seed)
+
+
 if __name__ == "__main__":
     game = FifteenPuzzle()
     print("Start position: ")
@@ -121,8 +256,8 @@ if __name__ == "__main__":
 
     while not game.is_solved():
         try:
-            row = int(input("Enter row (1-4): "))
-            col = int(input('Enter col (1-4): '))
+            row = int(input(f"Enter row (1-{game.rows}): "))
+            col = int(input(f'Enter col (1-{game.cols}): '))
             if game.move(row, col):
                 print('Move completed: ')
                 print(game)
@@ -0,0 +1,110 @@
+import unittest
+import io
+import json
+import os
+import random
+import tempfile
+from contextlib import redirect_stdout
+from batch_solve import solve_batch, read_boards, main
+from pattern_db import build_pattern_database
+from test_solver import random_walk, apply_path, GOAL
+
+
+class TestBatchSolve(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.boards = [random_walk(GOAL, moves, rng) for moves in (0, 10, 20, 30, 40, 25)]
+        unsolvable = GOAL[:]
+        unsolvable[0], unsolvable[1] = unsolvable[1], unsolvable[0]
+        self.boards.append(unsolvable)
+
+    def test_results(self):
+        """Тест решения набора досок в пуле процессов"""
+        results = list(solve_batch(self.boards, workers=2))
+        self.assertEqual(sorted(r['index'] for r in results), list(range(len(self.boards))))
+        for result in results:
+            board = self.boards[result['index']]
+            self.assertEqual(result['tiles'], board)
+            if result['index'] == len(self.boards) - 1:
+                self.assertEqual(result['status'], 'unsolvable')
+            else:
+                self.assertEqual(result['status'], 'solved')
+                self.assertEqual(apply_path(board, result['path']), GOAL)
+                self.assertEqual(result['length'], len(result['path']))
+            self.assertIn('wall_time', result)
+
+    def test_budget_and_errors(self):
+        """Тест бюджета узлов и неверной доски"""
+        hard = random_walk(GOAL, 1000, random.Random(5))
+        results = sorted(solve_batch([hard, [1] * 16, GOAL], max_nodes=50, workers=1),
+                         key=lambda r: r['index'])
+        self.assertEqual([r['status'] for r in results], ['budget', 'error', 'solved'])
+
+    def test_unexpected_errors(self):
+        """Тест досок, на которых падает решатель или передача в процесс"""
+        boards = [GOAL, [None] * 16, [len] * 16, self.boards[1]]
+        results = sorted(solve_batch(boards, workers=1), key=lambda r: r['index'])
+        self.assertEqual([r['status'] for r in results], ['solved', 'error', 'error', 'solved'])
+        self.assertTrue(results[1]['error'].startswith("TypeError"))
+        self.assertEqual(results[2]['tiles'], [len] * 16)
+
+    def test_generator_input(self):
+        """Тест входа-генератора длиннее окна задач"""
+        boards = (random_walk(GOAL, 8, random.Random(i)) for i in range(30))
+        results = list(solve_batch(boards, workers=1))
+        self.assertEqual(len(results), 30)
+        self.assertTrue(all(r['status'] == 'solved' for r in results))
+
+    def test_other_size(self):
+        """Тест досок 3x3"""
+        goal = list(range(1, 9)) + [0]
+        boards = [random_walk(goal, 30, random.Random(i), cols=3, rows=3) for i in range(4)]
+        for result in solve_batch(boards, rows=3, cols=3, workers=2):
+            self.assertEqual(apply_path(boards[result['index']], result['path']), goal)
+
+    def test_database(self):
+        """Тест решения с базой шаблонов, открытой в каждом процессе"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pdb.bin")
+            build_pattern_database(path, ((1, 2, 3), (4, 7, 8), (5, 6, 9),
+                                          (10, 13, 14), (11, 12, 15)))
+            results = list(solve_batch(self.boards[:4], database=path, workers=2))
+        by_index = {r['index']: r for r in results}
+        plain = {r['index']: r for r in solve_batch(self.boards[:4], workers=1)}
+        for index, result in by_index.items():
+            self.assertEqual(result['length'], plain[index]['length'])
+
+    def test_read_boards(self):
+        """Тест чтения досок из потока"""
+        stream = io.StringIO("# комментарий\n1 2 3\n\n4,5,6\n")
+        self.assertEqual(list(read_boards(stream)), [[1, 2, 3], [4, 5, 6]])
+
+    def test_main_json_lines(self):
+        """Тест вывода JSON lines"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "boards.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                for board in self.boards[:3]:
+                    f.write(" ".join(map(str, board)) + "\n")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                code = main([path, '--workers', '2', '--max-time', '10'])
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(sorted(line['index'] for line in lines), [0, 1, 2])
+
+    def test_main_non_ascii_errors(self):
+        """Тест вывода сообщений об ошибках без экранирования"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "boards.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("1 1 1 1 1 1 1 1 1 1 1 1 1 1 1 1\n")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main([path, '--workers', '1'])
+        self.assertIn("доска должна содержать", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
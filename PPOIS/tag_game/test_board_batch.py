@@ -0,0 +1,101 @@
+import unittest
+from tag import SlidingPuzzle, generate_boards
+from solver import is_solvable
+
+try:
+    import numpy as np
+    import board_batch
+except ImportError:
+    np = None
+
+
+def manhattan(tiles, rows=4, cols=4):
+    return sum(abs((tile - 1) // cols - pos // cols) + abs((tile - 1) % cols - pos % cols)
+               for pos, tile in enumerate(tiles) if tile)
+
+
+def inversions(tiles):
+    numbers = [t for t in tiles if t]
+    return sum(1 for i in range(len(numbers)) for j in range(i + 1, len(numbers))
+               if numbers[i] > numbers[j])
+
+
+@unittest.skipUnless(np is not None, "нужен numpy")
+class TestBoardBatch(unittest.TestCase):
+
+    def setUp(self):
+        tiles = list(generate_boards(300, seed=1))
+        # Нерешаемые доски: обмен двух первых плиток
+        for board in tiles[:100]:
+            board = list(board)
+            if board[0] and board[1]:
+                board[0], board[1] = board[1], board[0]
+                tiles.append(tuple(board))
+        tiles.append(tuple(list(range(1, 16)) + [0]))
+        self.tiles = tiles
+        self.boards = np.array(tiles, dtype=np.uint8)
+
+    def test_metrics_match_python(self):
+        """Тест совпадения метрик с поштучным вычислением"""
+        result = board_batch.evaluate(self.boards)
+        for i, tiles in enumerate(self.tiles):
+            self.assertEqual(result['manhattan'][i], manhattan(tiles))
+            self.assertEqual(result['inversions'][i], inversions(tiles))
+            self.assertEqual(bool(result['solvable'][i]), is_solvable(list(tiles)))
+            self.assertEqual(bool(result['solved'][i]), tiles == tuple(range(1, 16)) + (0,))
+        self.assertTrue(result['solved'][-1])
+        self.assertEqual(result['solved'].sum(), 1)
+
+    def test_other_sizes(self):
+        """Тест досок 3x3 и 3x4"""
+        for rows, cols in ((3, 3), (3, 4)):
+            tiles = list(generate_boards(50, seed=2, rows=rows, cols=cols))
+            boards = np.array(tiles, dtype=np.uint8)
+            self.assertTrue(board_batch.solvable(boards, rows, cols).all())
+            distances = board_batch.manhattan(boards, rows, cols)
+            self.assertEqual(list(distances), [manhattan(t, rows, cols) for t in tiles])
+
+    def test_apply_moves(self):
+        """Тест одновременного хода на всех досках"""
+        boards = self.boards[:200]
+        original = boards.copy()
+        moves = np.arange(len(boards)) % 4
+        moved, legal = board_batch.apply_moves(boards, moves)
+        deltas = {board_batch.UP: (-1, 0), board_batch.DOWN: (1, 0),
+                  board_batch.LEFT: (0, -1), board_batch.RIGHT: (0, 1)}
+        for i in range(len(boards)):
+            game = SlidingPuzzle(scramble_on_init=False)
+            game.board = [[int(t) for t in boards[i][r * 4:(r + 1) * 4]] for r in range(4)]
+            row, col = game.find_empty_pos()
+            dr, dc = deltas[int(moves[i])]
+            self.assertEqual(bool(legal[i]), game.move(row + dr + 1, col + dc + 1))
+            self.assertEqual(list(moved[i]), game.tiles)
+        # Исходный массив не меняется
+        self.assertTrue((boards == original).all())
+
+    def test_random_boards(self):
+        """Тест генерации случайных решаемых досок"""
+        boards = board_batch.random_boards(5000, seed=3)
+        self.assertEqual(boards.shape, (5000, 16))
+        self.assertTrue((np.sort(boards, axis=1) == np.arange(16)).all())
+        self.assertTrue(board_batch.solvable(boards).all())
+        again = board_batch.random_boards(5000, seed=3)
+        self.assertTrue((again == boards).all())
+
+    def test_from_puzzles(self):
+        """Тест преобразования объектов игры в массив"""
+        games = [SlidingPuzzle(seed=i) for i in range(5)]
+        boards = board_batch.from_puzzles(games)
+        self.assertEqual(boards.dtype, np.uint8)
+        self.assertEqual([list(row) for row in boards], [game.tiles for game in games])
+
+    def test_bad_shape(self):
+        """Тест массива неверной формы"""
+        with self.assertRaises(ValueError):
+            board_batch.is_solved(np.zeros((3, 9), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            board_batch.apply_moves(self.boards, [0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
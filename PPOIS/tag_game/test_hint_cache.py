@@ -0,0 +1,110 @@
+import unittest
+import os
+import random
+import tempfile
+from tag import FifteenPuzzle, SlidingPuzzle
+from packed import pack
+from hint_cache import SolutionCache
+from test_solver import random_walk, GOAL
+
+
+class TestSolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.board = random_walk(GOAL, 30, random.Random(4))
+
+    def test_key_matches_packed(self):
+        """Тест совпадения ключа 4x4 с упакованной доской"""
+        cache = SolutionCache()
+        self.assertEqual(cache.key(self.board), pack(self.board))
+        self.assertEqual(cache.key_bytes, 8)
+
+    def test_hint_fills_path(self):
+        """Тест заполнения кэша позициями всего пути"""
+        cache = SolutionCache()
+        first = cache.hint(self.board)
+        self.assertEqual(cache.misses, 1)
+        distance = cache.distance(self.board)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(len(cache), distance + 1)
+        # Идём по подсказкам до цели - все ответы из кэша
+        board = self.board[:]
+        pos = first
+        while pos is not None:
+            blank = board.index(0)
+            board[blank], board[pos] = board[pos], 0
+            pos = cache.hint(board)
+        self.assertEqual(board, GOAL)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.distance(GOAL), 0)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных позиций"""
+        cache = SolutionCache(max_size=3)
+        boards = [random_walk(GOAL, 1, random.Random(seed)) for seed in range(10)]
+        boards = [b for i, b in enumerate(boards) if b not in boards[:i]][:2]
+        cache.put_path(boards[0], [15])
+        self.assertIn(GOAL, cache)
+        cache.get(boards[0])
+        cache.put_path(boards[1], [15])
+        self.assertEqual(len(cache), 3)
+        self.assertIn(boards[0], cache)
+        self.assertIn(boards[1], cache)
+        self.assertIn(GOAL, cache)
+        cache.put_path(self.board[:], [])
+        self.assertEqual(len(cache), 3)
+        self.assertIn(self.board, cache)
+
+    def test_unsolvable(self):
+        """Тест нерешаемой доски"""
+        cache = SolutionCache()
+        swapped = GOAL[:]
+        swapped[0], swapped[1] = swapped[1], swapped[0]
+        self.assertIsNone(cache.hint(swapped))
+        self.assertIsNone(cache.distance(swapped))
+        self.assertEqual(len(cache), 0)
+
+    def test_persistence(self):
+        """Тест сохранения и загрузки кэша"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hints.bin")
+            cache = SolutionCache(path=path)
+            cache.hint(self.board)
+            cache.save()
+            loaded = SolutionCache(path=path)
+            self.assertEqual(len(loaded), len(cache))
+            self.assertEqual(loaded.get(self.board), cache.get(self.board))
+            self.assertEqual(loaded.get(GOAL), (0, None))
+            self.assertEqual(loaded.misses, 0)
+            with self.assertRaises(ValueError):
+                SolutionCache(3, 3, path=path)
+            with open(path, 'r+b') as f:
+                f.truncate(20)
+            with self.assertRaises(ValueError):
+                SolutionCache(path=path)
+
+    def test_other_size(self):
+        """Тест кэша для доски 3x3"""
+        cache = SolutionCache(3, 3)
+        goal = list(range(1, 9)) + [0]
+        board = random_walk(goal, 40, random.Random(2), cols=3, rows=3)
+        self.assertIsNotNone(cache.hint(board))
+        self.assertEqual(cache.get(goal), (0, None))
+
+    def test_puzzle_hint_with_cache(self):
+        """Тест подсказки игры через кэш"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        game.board = [self.board[i * 4:(i + 1) * 4] for i in range(4)]
+        cache = SolutionCache()
+        self.assertEqual(game.hint(cache), game.hint())
+        while not game.is_solved():
+            self.assertTrue(game.move(*game.hint(cache)))
+        self.assertIsNone(game.hint(cache))
+        self.assertEqual(cache.misses, 1)
+        small = SlidingPuzzle(2, 3, scramble_on_init=False)
+        small.move(1, 3)
+        self.assertEqual(small.hint(SolutionCache(2, 3)), (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,134 @@
+import unittest
+import os
+import random
+import tempfile
+from tag import FifteenPuzzle, SlidingPuzzle, UP, LEFT
+from packed import PackedFifteenPuzzle
+from journal import MoveJournal
+
+
+def random_moves(journal, count, rng):
+    # Случайные допустимые ходы через журнал; возвращает доски после каждого
+    puzzle = journal.puzzle
+    boards = [list(puzzle.tiles)]
+    for _ in range(count):
+        pos = rng.choice(puzzle.neighbours[puzzle.blank])
+        journal.move(pos // puzzle.cols + 1, pos % puzzle.cols + 1)
+        boards.append(list(puzzle.tiles))
+    return boards
+
+
+class TestMoveJournal(unittest.TestCase):
+
+    def test_record_directions(self):
+        """Тест записи направлений ходов"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        journal = MoveJournal(game)
+        self.assertTrue(journal.move(4, 3))
+        self.assertTrue(journal.move(3, 3))
+        self.assertFalse(journal.move(1, 1))
+        self.assertFalse(journal.move("invalid", 1))
+        self.assertEqual(list(journal.directions()), [LEFT, UP])
+        self.assertEqual(len(journal), 2)
+
+    def test_undo_redo(self):
+        """Тест отмены и повтора ходов"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        journal = MoveJournal(game, checkpoint_every=4)
+        boards = random_moves(journal, 30, random.Random(1))
+        for index in range(30, 0, -1):
+            self.assertEqual(game.tiles, boards[index])
+            self.assertTrue(journal.undo())
+        self.assertTrue(game.is_solved())
+        self.assertFalse(journal.undo())
+        for index in range(1, 31):
+            self.assertTrue(journal.redo())
+            self.assertEqual(game.tiles, boards[index])
+        self.assertFalse(journal.redo())
+
+    def test_new_move_drops_redo(self):
+        """Тест, что новый ход отбрасывает отменённые"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        journal = MoveJournal(game, checkpoint_every=3)
+        boards = random_moves(journal, 10, random.Random(2))
+        for _ in range(5):
+            journal.undo()
+        more = random_moves(journal, 6, random.Random(3))
+        self.assertEqual(len(journal), 11)
+        self.assertFalse(journal.redo())
+        expected = boards[:5] + more
+        for index in range(12):
+            self.assertEqual(journal.position_at(index), expected[index])
+
+    def test_position_at_and_seek(self):
+        """Тест восстановления промежуточной позиции"""
+        game = SlidingPuzzle(3, 5, scramble_on_init=False)
+        journal = MoveJournal(game, checkpoint_every=16)
+        boards = random_moves(journal, 200, random.Random(4))
+        for index in (0, 1, 15, 16, 17, 100, 200):
+            self.assertEqual(journal.position_at(index), boards[index])
+        journal.seek(57)
+        self.assertEqual(game.tiles, boards[57])
+        self.assertTrue(journal.redo())
+        self.assertEqual(game.tiles, boards[58])
+        with self.assertRaises(IndexError):
+            journal.position_at(201)
+
+    def test_serialization(self):
+        """Тест сохранения и загрузки партии"""
+        game = SlidingPuzzle(seed=5)
+        journal = MoveJournal(game, checkpoint_every=8)
+        boards = random_moves(journal, 101, random.Random(5))
+        journal.undo()
+        data = journal.to_bytes()
+        self.assertEqual(len(data), 8 + 24 + 16 + 26)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "game.pjr")
+            journal.save(path)
+            loaded = MoveJournal.load(path)
+        self.assertEqual(loaded.puzzle.tiles, boards[100])
+        self.assertEqual(loaded.start, boards[0])
+        self.assertEqual((loaded.length, loaded.cursor), (101, 100))
+        self.assertTrue(loaded.redo())
+        self.assertEqual(loaded.puzzle.tiles, boards[101])
+        self.assertEqual(loaded.position_at(50), boards[50])
+        with self.assertRaises(ValueError):
+            MoveJournal.from_bytes(data[:-1])
+        with self.assertRaises(ValueError):
+            MoveJournal.from_bytes(b"garbage" + data)
+
+    def test_packed_puzzle(self):
+        """Тест журнала для упакованной доски"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        journal = MoveJournal(game)
+        boards = random_moves(journal, 50, random.Random(6))
+        journal.seek(10)
+        self.assertEqual(game.tiles, boards[10])
+        journal.undo()
+        self.assertEqual(game.tiles, boards[9])
+
+    def test_serialization_with_factory(self):
+        """Тест загрузки партии в игры 4x4 через фабрику"""
+        journal = MoveJournal(FifteenPuzzle(seed=8), checkpoint_every=16)
+        boards = random_moves(journal, 40, random.Random(8))
+        data = journal.to_bytes()
+        for factory in (FifteenPuzzle, PackedFifteenPuzzle):
+            loaded = MoveJournal.from_bytes(data, factory)
+            self.assertIsInstance(loaded.puzzle, factory)
+            self.assertEqual(list(loaded.puzzle.tiles), boards[40])
+            self.assertTrue(loaded.undo())
+            self.assertEqual(list(loaded.puzzle.tiles), boards[39])
+        data = MoveJournal(SlidingPuzzle(3, 3, seed=8)).to_bytes()
+        with self.assertRaises(ValueError):
+            MoveJournal.from_bytes(data, FifteenPuzzle)
+
+    def test_compact_size(self):
+        """Тест размера журнала длинной партии"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        journal = MoveJournal(game)
+        random_moves(journal, 20000, random.Random(7))
+        self.assertEqual(len(journal.to_bytes()), 8 + 24 + 16 + 5000)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,132 @@
+import unittest
+import random
+from tag import FifteenPuzzle
+from packed import PackedFifteenPuzzle, GOAL, pack, unpack, slide
+
+SOLVED = [
+    [1, 2, 3, 4],
+    [5, 6, 7, 8],
+    [9, 10, 11, 12],
+    [13, 14, 15, 0]
+]
+
+
+class TestPacking(unittest.TestCase):
+
+    def test_pack_unpack(self):
+        """Тест упаковки и распаковки доски"""
+        tiles = list(range(16))
+        random.Random(1).shuffle(tiles)
+        state = pack(tiles)
+        self.assertLess(state, 1 << 64)
+        self.assertEqual(unpack(state), tiles)
+        self.assertEqual(unpack(GOAL), [num for row in SOLVED for num in row])
+
+    def test_slide(self):
+        """Тест сдвига плитки в пустую клетку"""
+        tiles = [num for row in SOLVED for num in row]
+        state = slide(pack(tiles), 15, 11)
+        tiles[15], tiles[11] = 12, 0
+        self.assertEqual(unpack(state), tiles)
+
+
+class TestPackedFifteenPuzzle(unittest.TestCase):
+
+    def test_initialization(self):
+        """Тест инициализации упакованной игры"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        self.assertTrue(game.is_solved())
+        self.assertEqual(game.board, SOLVED)
+        self.assertEqual(game.find_empty_pos(), (3, 3))
+        game = PackedFifteenPuzzle()
+        self.assertEqual(sorted(num for row in game.board for num in row), list(range(16)))
+
+    def test_board_assignment(self):
+        """Тест присваивания доски"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        game.board = [
+            [1, 2, 3, 4],
+            [5, 0, 7, 8],
+            [9, 10, 11, 12],
+            [13, 14, 15, 6]
+        ]
+        self.assertEqual(game.find_empty_pos(), (1, 1))
+        self.assertEqual(game.get_item((3, 3)), 6)
+        self.assertFalse(game.is_solved())
+
+    def test_board_item_write(self):
+        """Тест записи в клетку упакованной доски через board[r][c]"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        reference = FifteenPuzzle(scramble_on_init=False)
+        for puzzle in (game, reference):
+            board = puzzle.board
+            board[3][3], board[2][3] = board[2][3], board[3][3]
+        self.assertEqual(game.board, reference.board)
+        self.assertEqual(game.find_empty_pos(), (2, 3))
+        self.assertEqual(game.state, pack(reference.tiles))
+        self.assertTrue(game.move(4, 4))
+        self.assertTrue(game.is_solved())
+
+    def test_same_behaviour_as_list_board(self):
+        """Тест совпадения ходов, вывода и get_item с обычной игрой"""
+        rng = random.Random(5)
+        reference = FifteenPuzzle(scramble_on_init=False)
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        for _ in range(500):
+            row, col = rng.randint(0, 5), rng.randint(0, 5)
+            self.assertEqual(game.move(row, col), reference.move(row, col))
+            self.assertEqual(game.board, reference.board)
+        self.assertEqual(str(game), str(reference))
+        self.assertEqual(game.find_empty_pos(), reference.find_empty_pos())
+        for i in range(4):
+            for j in range(4):
+                self.assertEqual(game.get_item((i, j)), reference.get_item((i, j)))
+        self.assertEqual(game.is_solved(), reference.is_solved())
+
+    def test_invalid_moves(self):
+        """Тест невалидных ходов"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        self.assertFalse(game.move(1, 1))
+        self.assertFalse(game.move(4, 4))
+        self.assertFalse(game.move(0, 1))
+        self.assertFalse(game.move(1, 5))
+        self.assertFalse(game.move("invalid", "input"))
+        self.assertTrue(game.is_solved())
+
+    def test_key(self):
+        """Тест ключа позиции"""
+        first = PackedFifteenPuzzle(scramble_on_init=False)
+        second = PackedFifteenPuzzle(scramble_on_init=False)
+        self.assertEqual(first.key(), GOAL)
+        second.move(4, 3)
+        seen = {first.key(), second.key()}
+        self.assertEqual(len(seen), 2)
+        second.move(4, 4)
+        self.assertIn(second.key(), seen)
+
+    def test_solve(self):
+        """Тест решения упакованной игры"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        game.scramble(40)
+        for row, col in game.solve():
+            self.assertTrue(game.move(row, col))
+        self.assertTrue(game.is_solved())
+
+    def test_uniform_scramble(self):
+        """Тест равномерного перемешивания упакованной игры"""
+        game = PackedFifteenPuzzle(scramble_on_init=False, seed=3)
+        game.scramble(uniform=True)
+        reference = FifteenPuzzle(scramble_on_init=False, seed=3)
+        reference.scramble(uniform=True)
+        self.assertEqual(game.board, reference.board)
+        self.assertEqual(game.find_empty_pos(), reference.find_empty_pos())
+
+    def test_str_representation(self):
+        """Тест строкового представления"""
+        game = PackedFifteenPuzzle(scramble_on_init=False)
+        expected_output = " 1  2  3  4 \n 5  6  7  8 \n 9 10 11 12 \n13 14 15    \n"
+        self.assertEqual(str(game), expected_output)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,88 @@
+import unittest
+import os
+import random
+import tempfile
+from tag import FifteenPuzzle
+from solver import IDAStarSolver
+from pattern_db import (build_group_table, build_pattern_database, PatternDatabase,
+                        PatternDatabaseSolver, UNKNOWN)
+from test_solver import random_walk, bfs_distance, apply_path, GOAL
+
+GROUPS_4x4 = ((1, 2, 3), (4, 7, 8), (5, 6, 9), (10, 13, 14), (11, 12, 15))
+GROUPS_3x3 = ((1, 2, 3, 4), (5, 6, 7, 8))
+GOAL_3x3 = list(range(1, 9)) + [0]
+
+
+class TestPatternDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "pdb.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_group_table(self):
+        """Тест таблицы одной группы"""
+        table = build_group_table((1, 2), 3, 3)
+        self.assertEqual(len(table), 81)
+        self.assertEqual(table[0 * 9 + 1], 0)
+        # Плитки 1 и 2 поменяны местами: манхэттен 2, но нужно обойти
+        self.assertGreater(table[1 * 9 + 0], 2)
+        self.assertEqual(table[0 * 9 + 0], UNKNOWN)
+
+    def test_admissible_on_3x3(self):
+        """Тест допустимости оценки и оптимальности решения на доске 3x3"""
+        build_pattern_database(self.path, GROUPS_3x3, 3, 3)
+        rng = random.Random(4)
+        with PatternDatabase(self.path) as database:
+            self.assertEqual(database.heuristic(GOAL_3x3), 0)
+            solver = PatternDatabaseSolver(database)
+            manhattan = IDAStarSolver(3, 3)
+            for _ in range(5):
+                board = random_walk(GOAL_3x3, 60, rng, cols=3, rows=3)
+                distance = bfs_distance(board)
+                self.assertLessEqual(database.heuristic(board), distance)
+                path = solver.solve(board)
+                self.assertEqual(len(path), distance)
+                self.assertEqual(apply_path(board, path), GOAL_3x3)
+                self.assertGreaterEqual(len(path), manhattan.heuristic(board))
+
+    def test_solve_4x4(self):
+        """Тест решения доски 4x4 с базой шаблонов"""
+        build_pattern_database(self.path, GROUPS_4x4)
+        rng = random.Random(8)
+        with PatternDatabase(self.path) as database:
+            solver = PatternDatabaseSolver(database)
+            for _ in range(3):
+                board = random_walk(GOAL, 30, rng)
+                path = solver.solve(board)
+                self.assertEqual(apply_path(board, path), GOAL)
+                self.assertEqual(len(path), len(IDAStarSolver().solve(board)))
+
+    def test_fifteen_puzzle_solve_with_database(self):
+        """Тест FifteenPuzzle.solve с базой шаблонов"""
+        build_pattern_database(self.path, GROUPS_4x4)
+        game = FifteenPuzzle(scramble_on_init=False)
+        tiles = random_walk(GOAL, 20, random.Random(1))
+        game.board = [tiles[i * 4:(i + 1) * 4] for i in range(4)]
+        with PatternDatabase(self.path) as database:
+            for row, col in game.solve(database=database):
+                self.assertTrue(game.move(row, col))
+        self.assertTrue(game.is_solved())
+
+    def test_bad_groups(self):
+        """Тест неверного разбиения плиток"""
+        with self.assertRaises(ValueError):
+            build_pattern_database(self.path, ((1, 2), (2, 3)), 2, 2)
+
+    def test_not_a_database(self):
+        """Тест открытия файла другого формата"""
+        with open(self.path, 'wb') as f:
+            f.write(b"not a database at all")
+        with self.assertRaises(ValueError):
+            PatternDatabase(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,176 @@
+import unittest
+import random
+from collections import deque
+from tag import FifteenPuzzle
+from solver import IDAStarSolver, SearchBudgetExceeded, is_solvable, solve
+
+GOAL = list(range(1, 16)) + [0]
+
+
+def random_walk(tiles, moves, rng, cols=4, rows=4):
+    board = list(tiles)
+    blank = board.index(0)
+    for _ in range(moves):
+        r, c = divmod(blank, cols)
+        options = [p for p, ok in ((blank - cols, r > 0), (blank + cols, r < rows - 1),
+                                   (blank - 1, c > 0), (blank + 1, c < cols - 1)) if ok]
+        pos = rng.choice(options)
+        board[blank], board[pos] = board[pos], 0
+        blank = pos
+    return board
+
+
+def bfs_distance(tiles, cols=3, rows=3):
+    goal = tuple(list(range(1, rows * cols)) + [0])
+    start = tuple(tiles)
+    seen = {start: 0}
+    queue = deque([start])
+    while queue:
+        board = queue.popleft()
+        if board == goal:
+            return seen[board]
+        blank = board.index(0)
+        r, c = divmod(blank, cols)
+        for pos, ok in ((blank - cols, r > 0), (blank + cols, r < rows - 1),
+                        (blank - 1, c > 0), (blank + 1, c < cols - 1)):
+            if ok:
+                nxt = list(board)
+                nxt[blank], nxt[pos] = nxt[pos], 0
+                nxt = tuple(nxt)
+                if nxt not in seen:
+                    seen[nxt] = seen[board] + 1
+                    queue.append(nxt)
+
+
+# Расстояния до цели всех решаемых позиций доски rows x cols (BFS от цели)
+def bfs_all_distances(rows, cols):
+    goal = tuple(list(range(1, rows * cols)) + [0])
+    seen = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        board = queue.popleft()
+        blank = board.index(0)
+        r, c = divmod(blank, cols)
+        for pos, ok in ((blank - cols, r > 0), (blank + cols, r < rows - 1),
+                        (blank - 1, c > 0), (blank + 1, c < cols - 1)):
+            if ok:
+                nxt = list(board)
+                nxt[blank], nxt[pos] = nxt[pos], 0
+                nxt = tuple(nxt)
+                if nxt not in seen:
+                    seen[nxt] = seen[board] + 1
+                    queue.append(nxt)
+    return seen
+
+
+def apply_path(tiles, path):
+    board = list(tiles)
+    for pos in path:
+        blank = board.index(0)
+        board[blank], board[pos] = board[pos], 0
+    return board
+
+
+class TestSolver(unittest.TestCase):
+
+    def test_is_solvable(self):
+        """Тест проверки решаемости"""
+        self.assertTrue(is_solvable(GOAL))
+        swapped = GOAL[:]
+        swapped[13], swapped[14] = swapped[14], swapped[13]
+        self.assertFalse(is_solvable(swapped))
+        self.assertTrue(is_solvable(random_walk(GOAL, 101, random.Random(3))))
+
+    def test_solved_board(self):
+        """Тест уже решённой доски"""
+        self.assertEqual(solve(GOAL), [])
+
+    def test_unsolvable(self):
+        """Тест нерешаемой доски"""
+        swapped = GOAL[:]
+        swapped[0], swapped[1] = swapped[1], swapped[0]
+        self.assertIsNone(solve(swapped))
+
+    def test_solutions_are_valid(self):
+        """Тест, что решения приводят к цели"""
+        rng = random.Random(7)
+        for moves in (5, 15, 30):
+            board = random_walk(GOAL, moves, rng)
+            path = solve(board)
+            self.assertEqual(apply_path(board, path), GOAL)
+            self.assertLessEqual(len(path), moves)
+
+    def test_optimal_on_3x3(self):
+        """Тест оптимальности решения по сравнению с BFS на доске 3x3"""
+        rng = random.Random(11)
+        solver = IDAStarSolver(3, 3)
+        goal = list(range(1, 9)) + [0]
+        for _ in range(5):
+            board = random_walk(goal, 40, rng, cols=3, rows=3)
+            path = solver.solve(board)
+            self.assertEqual(apply_path(board, path), goal)
+            self.assertEqual(len(path), bfs_distance(board))
+
+    def test_optimal_on_rectangular(self):
+        """Тест оптимальности на прямоугольных досках 2x3 и 2x4 (один решатель на размер)"""
+        rng = random.Random(12)
+        for rows, cols, samples in ((2, 3, None), (2, 4, 300), (3, 2, None)):
+            distances = bfs_all_distances(rows, cols)
+            boards = list(distances)
+            if samples is not None:
+                boards = rng.sample(boards, samples)
+            solver = IDAStarSolver(rows, cols)
+            goal = list(range(1, rows * cols)) + [0]
+            for board in boards:
+                self.assertLessEqual(solver.heuristic(board), distances[board], board)
+                path = solver.solve(board)
+                self.assertEqual(apply_path(board, path), goal)
+                self.assertEqual(len(path), distances[board], board)
+
+    def test_heuristic_linear_conflict(self):
+        """Тест эвристики с линейными конфликтами"""
+        solver = IDAStarSolver()
+        board = GOAL[:]
+        board[0], board[1] = board[1], board[0]
+        # Манхэттен 2 + конфликт в строке 2
+        self.assertEqual(solver.heuristic(board), 4)
+
+    def test_budget(self):
+        """Тест лимита узлов"""
+        board = random_walk(GOAL, 1000, random.Random(5))
+        with self.assertRaises(SearchBudgetExceeded):
+            solve(board, max_nodes=100)
+
+    def test_invalid_board(self):
+        """Тест доски с неверным набором чисел"""
+        with self.assertRaises(ValueError):
+            solve([1] * 16)
+
+
+class TestFifteenPuzzleSolve(unittest.TestCase):
+
+    def test_solve_and_replay(self):
+        """Тест решения игры через move()"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        tiles = random_walk(GOAL, 25, random.Random(2))
+        game.board = [tiles[i * 4:(i + 1) * 4] for i in range(4)]
+        for row, col in game.solve():
+            self.assertTrue(game.move(row, col))
+        self.assertTrue(game.is_solved())
+
+    def test_hint(self):
+        """Тест подсказки"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        game.board = [
+            [1, 2, 3, 4],
+            [5, 6, 7, 8],
+            [9, 10, 11, 12],
+            [13, 14, 0, 15]
+        ]
+        self.assertEqual(game.hint(), (4, 4))
+        game.move(4, 4)
+        self.assertIsNone(game.hint())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -1,8 +1,11 @@
 import unittest
 import sys
 import io
+import random
 from unittest.mock import patch
-from tag import FifteenPuzzle
+from collections import Counter
+from tag import FifteenPuzzle, SlidingPuzzle, random_solvable_tiles, generate_boards
+from solver import is_solvable
 
 class TestFifteenPuzzle(unittest.TestCase):
     
@@ -371,6 +374,118 @@ class TestGameInputOutput(unittest.TestCase):
             self.fail("ValueError was raised unexpectedly")
 
 
+class TestUniformScramble(unittest.TestCase):
+    """Тесты равномерного перемешивания"""
+
+    def test_always_solvable(self):
+        """Тест, что сгенерированные доски решаемы"""
+        for tiles in generate_boards(2000, seed=1):
+            self.assertEqual(sorted(tiles), list(range(16)))
+            self.assertTrue(is_solvable(list(tiles)))
+        for tiles in generate_boards(500, seed=2, rows=3, cols=5):
+            self.assertTrue(is_solvable(list(tiles), 3, 5))
+
+    def test_uniform_on_2x2(self):
+        """Тест равномерности на доске 2x2 (12 решаемых позиций)"""
+        counts = Counter(generate_boards(12000, seed=3, rows=2, cols=2))
+        self.assertEqual(len(counts), 12)
+        for count in counts.values():
+            self.assertGreater(count, 800)
+            self.assertLess(count, 1200)
+
+    def test_seed_reproducible(self):
+        """Тест воспроизводимости по зерну"""
+        self.assertEqual(list(generate_boards(10, seed=7)), list(generate_boards(10, seed=7)))
+        first = FifteenPuzzle(scramble_on_init=False, seed=4)
+        second = FifteenPuzzle(scramble_on_init=False, seed=4)
+        first.scramble(uniform=True)
+        second.scramble(uniform=True)
+        self.assertEqual(first.board, second.board)
+        self.assertEqual(FifteenPuzzle(seed=5).board, FifteenPuzzle(seed=5).board)
+
+    def test_scramble_uniform(self):
+        """Тест равномерного перемешивания игры"""
+        game = FifteenPuzzle(scramble_on_init=False, seed=6)
+        game.scramble(uniform=True)
+        tiles = [num for row in game.board for num in row]
+        self.assertEqual(sorted(tiles), list(range(16)))
+        self.assertTrue(is_solvable(tiles))
+        self.assertEqual(tiles, random_solvable_tiles(random.Random(6)))
+
+
+class TestSlidingPuzzle(unittest.TestCase):
+    """Тесты головоломки произвольного размера"""
+
+    def test_dimensions(self):
+        """Тест досок разных размеров"""
+        for rows, cols in ((3, 3), (5, 5), (2, 5), (4, 3)):
+            game = SlidingPuzzle(rows, cols)
+            self.assertEqual(len(game.board), rows)
+            self.assertEqual(len(game.board[0]), cols)
+            self.assertEqual(sorted(game.tiles), list(range(rows * cols)))
+            self.assertEqual(game.find_empty_pos(), divmod(game.tiles.index(0), cols))
+        with self.assertRaises(ValueError):
+            SlidingPuzzle(1, 4)
+
+    def test_fifteen_puzzle_is_4x4(self):
+        """Тест совместимости FifteenPuzzle с доской 4x4"""
+        game = FifteenPuzzle(scramble_on_init=False)
+        self.assertEqual((game.rows, game.cols), (4, 4))
+        self.assertTrue(game.is_solved())
+        self.assertIsInstance(game, SlidingPuzzle)
+
+    def test_moves_on_rectangle(self):
+        """Тест ходов и границ на прямоугольной доске"""
+        game = SlidingPuzzle(2, 3, scramble_on_init=False)
+        self.assertEqual(str(game), " 1  2  3 \n 4  5    \n")
+        self.assertFalse(game.move(3, 1))
+        self.assertFalse(game.move(1, 4))
+        self.assertFalse(game.move(1, 1))
+        self.assertTrue(game.move(1, 3))
+        self.assertEqual(game.board, [[1, 2, 0], [4, 5, 3]])
+        self.assertEqual(game.find_empty_pos(), (0, 2))
+        self.assertTrue(game.move(2, 3))
+        self.assertTrue(game.is_solved())
+
+    def test_board_assignment(self):
+        """Тест присваивания доски и проверки её размера"""
+        game = SlidingPuzzle(3, 3, scramble_on_init=False)
+        game.board = [[1, 2, 3], [4, 0, 6], [7, 5, 8]]
+        self.assertEqual(game.get_item((2, 1)), 5)
+        self.assertEqual(game.find_empty_pos(), (1, 1))
+        with self.assertRaises(ValueError):
+            game.board = [[1, 2], [3, 0]]
+
+    def test_board_item_write(self):
+        """Тест записи в клетку доски через board[r][c]"""
+        game = SlidingPuzzle(3, 3, scramble_on_init=False)
+        board = game.board
+        board[2][1], board[2][2] = board[2][2], board[2][1]
+        self.assertEqual(game.board, [[1, 2, 3], [4, 5, 6], [7, 0, 8]])
+        self.assertEqual(game.find_empty_pos(), (2, 1))
+        game.board[0][-1] = 9
+        self.assertEqual(game.get_item((0, 2)), 9)
+        self.assertEqual(game.board[0][:], [1, 2, 9])
+        with self.assertRaises(IndexError):
+            game.board[0][3] = 1
+        self.assertTrue(game.move(3, 3))
+        self.assertEqual(game.board[2][2], 0)
+
+    def test_str_wide_numbers(self):
+        """Тест вывода доски с трёхзначными номерами"""
+        game = SlidingPuzzle(10, 11, scramble_on_init=False)
+        first_line = str(game).split("\n")[0]
+        self.assertTrue(first_line.startswith("  1   2 "))
+
+    def test_solve_any_size(self):
+        """Тест решения досок 3x3 и 3x4"""
+        for rows, cols in ((3, 3), (3, 4)):
+            game = SlidingPuzzle(rows, cols, seed=rows * cols)
+            for row, col in game.solve():
+                self.assertTrue(game.move(row, col))
+            self.assertTrue(game.is_solved())
+
+
 def run_tests():
     """Запуск всех тестов"""
     loader = unittest.TestLoader()